@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark : deltas de configuration (gen_config_bgp/config_delta.py) après une
+modification typique d'un projet synthétique (liens supprimés et ajoutés,
+relation BGP changée), comparés au remplacement complet des startup-configs.
+
+Chaque delta est vérifié : appliqué à la configuration de l'ancien snapshot
+(simulation simplifiée d'IOS), il doit redonner la nouvelle configuration ;
+le code de sortie est 1 sinon.
+
+Usage : python benchmarks/bench_config_delta.py [nb_routeurs] [nb_liens_modifiés]
+"""
+import io
+import random
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent))
+from get_topology.get_topology import get_topology
+from gen_config_bgp.config_delta import snapshot, topology_deltas, parse_config, render
+from synthetic_gns3 import make_project, write_project
+
+
+def as_sets(sections):
+    return {header: (set(lines), {f: set(l) for f, l in families.items()}) for header, lines, families in sections}
+
+
+def apply_line(lines, command):
+    """Applique une commande à un ensemble de lignes (no X retire X, X retire 'no X')."""
+    if command.startswith("no ") and command[3:] in lines:
+        lines.discard(command[3:])
+    elif f"no {command}" in lines:
+        lines.discard(f"no {command}")
+        lines.add(command)
+    else:
+        lines.add(command)
+
+
+def apply_delta(config, commands):
+    """Simule l'application des commandes d'un delta à une configuration rendue."""
+    sections = as_sets(parse_config(config))
+    header = family = None
+    for raw in commands:
+        command = raw.strip()
+        if not raw.startswith(" "):
+            family = None
+            if command.startswith("default "):
+                sections[command[len("default "):]] = (set(), {})
+                header = None
+            elif command.startswith("no "):
+                sections.pop(command[3:], None)
+                header = None
+            else:
+                header = command
+                sections.setdefault(header, (set(), {}))
+            continue
+        lines, families = sections[header]
+        if command.startswith("address-family "):
+            family = families.setdefault(command, set())
+        elif command == "exit-address-family":
+            family = None
+        elif command.startswith("no address-family "):
+            families.pop(command[3:], None)
+        elif command.startswith("no neighbor ") and len(command.split()) == 3:
+            ip = command.split()[2]
+            for target in (lines, *families.values()):
+                for line in [l for l in target if l.split()[:2] == ["neighbor", ip]]:
+                    target.discard(line)
+        else:
+            apply_line(family if family is not None else lines, command)
+    # Une interface remise à zéro puis éteinte équivaut à une interface absente du rendu
+    return {h: v for h, v in sections.items() if v != ({"shutdown"}, {})}
+
+
+def mutate(project, n_links, rng):
+    """Supprime n_links liens et en ajoute autant entre ports encore libres (même AS ou non)."""
+    links = project["topology"]["links"]
+    for _ in range(n_links):
+        links.pop(rng.randrange(len(links)))
+    used = {(end["node_id"], end["adapter_number"], end["port_number"]) for link in links for end in link["nodes"]}
+    nodes = [n["node_id"] for n in project["topology"]["nodes"]]
+    free = [(node_id, a, 0) for node_id in nodes for a in range(1, 7) if (node_id, a, 0) not in used]
+    rng.shuffle(free)
+    for k in range(n_links):
+        a, b = free[2 * k], free[2 * k + 1]
+        if a[0] == b[0]:
+            continue
+        links.append({"link_id": f"bench-{k}", "nodes": [
+            {"node_id": a[0], "adapter_number": a[1], "port_number": a[2]},
+            {"node_id": b[0], "adapter_number": b[1], "port_number": b[2]},
+        ]})
+
+
+def main():
+    n_routers = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    n_links = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    rng = random.Random(n_routers)
+    project = make_project(n_routers=n_routers, n_as=min(99, max(2, n_routers // 100)), seed=n_routers)
+    old_options = {"secure_redist": True, "policies_enabled": True, "ibgp_mode": "route_reflector"}
+    new_options = dict(old_options, bgp_relations={"100-200": "customer"})
+
+    with tempfile.TemporaryDirectory() as tmp, redirect_stdout(io.StringIO()):
+        old_topo = get_topology(write_project(Path(tmp) / "old", project, node_dirs=False), write_file=False)
+        mutate(project, n_links, rng)
+        new_topo = get_topology(write_project(Path(tmp) / "new", project, node_dirs=False), write_file=False)
+
+        t0 = time.perf_counter()
+        deltas = topology_deltas(old_topo, new_topo, old_options, new_options)
+        t_delta = time.perf_counter() - t0
+        old, new = snapshot(old_topo, old_options), snapshot(new_topo, new_options)
+
+    errors = []
+    delta_commands = full_commands = 0
+    for name, delta in deltas["routers"].items():
+        if delta["action"] != "update":
+            continue
+        new_config = render(*new[name])
+        if apply_delta(render(*old[name]), delta["commands"]) != as_sets(parse_config(new_config)):
+            errors.append(name)
+        delta_commands += len(delta["commands"])
+        full_commands += sum(1 + len(l) + sum(len(f) for f in fam.values()) for _, l, fam in parse_config(new_config))
+
+    if errors:
+        print(f"ERREUR : delta incorrect pour {', '.join(errors)}")
+        sys.exit(1)
+
+    diff = deltas["diff"]
+    print(f"{n_routers} routeurs, {n_links} liens supprimés et ajoutés, relation 100-200 modifiée")
+    print(f"routeurs modifiés : {len(diff['changed'])} (ajoutés {len(diff['added'])}, "
+          f"retirés {len(diff['removed'])}, inchangés {len(diff['unchanged'])})")
+    print(f"commandes : {delta_commands} (delta) vs {full_commands} (configs complètes des mêmes routeurs)")
+    print(f"calcul du delta : {t_delta:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark : passe eBGP de generate_bgp_configs, recherche linéaire des
+interfaces (ancien get_ip + boucle de désactivation) vs index par routeur.
+
+Topologie en étoile : un routeur central avec N sous-interfaces, chacune
+reliée en eBGP à un routeur d'un autre AS.
+
+Usage : python benchmarks/bench_iface_index.py
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from gen_config_bgp.bgp_gen import IGP_BACKENDS, add_ebgp_neighbors, build_interface_index
+from topology_model import LinkTable, router_from_dict
+
+INTERFACE_COUNTS = [10, 100, 1000, 2000]
+
+
+def make_star(n):
+    hub = {"name": "R1", "protocol": "OSPF", "as_number": 100, "interfaces": []}
+    routers = {"R1": hub}
+    links = []
+    for i in range(n):
+        leaf = f"R{i + 2}"
+        hub["interfaces"].append({"name": f"GigabitEthernet1/0.{i + 1}", "ip": f"2000:1:0:100:200:1:{i + 2}:1", "prefix": 112})
+        routers[leaf] = {"name": leaf, "protocol": "RIP", "as_number": 200, "interfaces": [
+            {"name": "GigabitEthernet1/0", "ip": f"2000:1:0:100:200:1:{i + 2}:{i + 2}", "prefix": 112}
+        ]}
+        links.append({"a": "R1", "a_iface": f"GigabitEthernet1/0.{i + 1}", "b": leaf, "b_iface": "GigabitEthernet1/0"})
+    for r in routers.values():
+        r["bgp_neighbors"] = []
+        for iface in r["interfaces"]:
+            iface["ospf_enabled"] = iface["rip_enabled"] = True
+    return routers, links
+
+
+def to_model(routers, links):
+    """Même étoile dans le modèle utilisé par le générateur."""
+    return {name: router_from_dict(r) for name, r in routers.items()}, LinkTable(links)
+
+
+def neighbor_tables(routers):
+    """Tables de voisins et drapeaux IGP, comparables entre dicts et modèle."""
+    def get(obj, key):
+        return obj[key] if isinstance(obj, dict) else getattr(obj, key)
+    return {
+        name: (
+            [(get(n, "name"), get(n, "ip"), get(n, "asn"), get(n, "is_ibgp")) for n in get(r, "bgp_neighbors")],
+            [(get(i, "name"), get(i, "ospf_enabled"), get(i, "rip_enabled")) for i in get(r, "interfaces")],
+        )
+        for name, r in routers.items()
+    }
+
+
+def add_ebgp_neighbors_linear(routers, links, backends):
+    """Ancienne implémentation : get_ip et désactivation IGP par parcours linéaire."""
+    def get_ip(router_data, iface_name):
+        for i in router_data["interfaces"]:
+            if i["name"] == iface_name:
+                return i["ip"]
+        return None
+
+    for link in links:
+        rA, rB = routers[link["a"]], routers[link["b"]]
+        ipA, ipB = get_ip(rA, link["a_iface"]), get_ip(rB, link["b_iface"])
+        if not ipA or not ipB or rA["as_number"] == rB["as_number"]:
+            continue
+        for local, local_iface, remote, remote_ip in ((rA, link["a_iface"], rB, ipB), (rB, link["b_iface"], rA, ipA)):
+            backend = backends.get(local["protocol"])
+            local["bgp_neighbors"].append({"name": remote["name"], "ip": remote_ip, "asn": remote["as_number"], "is_ibgp": False})
+            for iface in local["interfaces"]:
+                if iface["name"] == local_iface:
+                    iface[backend["enabled_flag"]] = False
+
+
+def main():
+    print(f"{'interfaces':>10} {'linéaire (s)':>13} {'index (s)':>10} {'gain':>7}")
+    for n in INTERFACE_COUNTS:
+        routers, links = make_star(n)
+        t0 = time.perf_counter()
+        add_ebgp_neighbors_linear(routers, links, IGP_BACKENDS)
+        t_linear = time.perf_counter() - t0
+        expected = neighbor_tables(routers)
+
+        routers, links = to_model(*make_star(n))
+        t0 = time.perf_counter()
+        add_ebgp_neighbors(routers, links, IGP_BACKENDS, build_interface_index(routers))
+        t_index = time.perf_counter() - t0
+
+        if neighbor_tables(routers) != expected:
+            print("ERREUR : les tables de voisins diffèrent !")
+            sys.exit(1)
+        print(f"{n:>10} {t_linear:>13.4f} {t_index:>10.4f} {t_linear / t_index:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
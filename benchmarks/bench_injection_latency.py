@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark : injection_cfg séquentielle et concurrente (threads d'E/S) sur un
+système de fichiers lent, comme un projet GNS3 monté en NFS/SMB.
+
+Chaque appel système de métadonnées ou d'ouverture (stat, scandir, open,
+replace, fsync) est précédé d'un délai fixe, qui libère le GIL comme une vraie
+attente réseau. Deux passes par nombre de threads : copie de toutes les
+configurations, puis nouvelle injection sans changement (comparaisons seules).
+
+Chaque passe est vérifiée : toutes les startup-configs égales aux .cfg
+générés, aucun fichier temporaire laissé par atomic_copy ; le code de sortie
+est 1 sinon.
+
+Usage : python benchmarks/bench_injection_latency.py [nb_routeurs] [latence_s] [threads...]
+        python benchmarks/bench_injection_latency.py 500 0.002 1 4 16 64
+"""
+import builtins
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent))
+from get_topology.get_topology import get_topology
+from gen_config_bgp.bgp_gen import generate_bgp_configs
+from injection_cfgs import injection_cfgs
+from injection_cfgs.injection_cfgs import injection_cfg
+from gns3_project import load_project, startup_config_index, clear_node_index_cache
+from synthetic_gns3 import generate_project
+
+SLOW_OS_CALLS = ("stat", "scandir", "open", "replace", "fsync")
+
+
+@contextlib.contextmanager
+def slow_filesystem(latency):
+    """Ajoute `latency` secondes à chaque appel de SLOW_OS_CALLS et à open()."""
+    def slowed(func):
+        def wrapper(*args, **kwargs):
+            time.sleep(latency)
+            return func(*args, **kwargs)
+        return wrapper
+
+    originals = {name: getattr(os, name) for name in SLOW_OS_CALLS}
+    for name, func in originals.items():
+        setattr(os, name, slowed(func))
+    injection_cfgs.open = slowed(builtins.open)
+    try:
+        yield
+    finally:
+        for name, func in originals.items():
+            setattr(os, name, func)
+        del injection_cfgs.open
+
+
+def reset_startup_configs(startup_configs):
+    for path in startup_configs.values():
+        Path(path).write_text("!\nend\n")
+
+
+def check(project_dir, configs_dir, name_to_path, summary, expected_status):
+    """Liste des anomalies d'une passe (vide si tout est correct)."""
+    problems = []
+    if summary["errors"] or summary["missing"]:
+        problems.append(f"{len(summary['errors'])} erreurs, {len(summary['missing'])} configurations absentes")
+    if len(summary[expected_status]) != len(name_to_path):
+        problems.append(f"{len(summary[expected_status])}/{len(name_to_path)} routeurs '{expected_status}'")
+    wrong = [
+        name for name, path in name_to_path.items()
+        if Path(path).read_bytes() != (configs_dir / f"{name}.cfg").read_bytes()
+    ]
+    if wrong:
+        problems.append(f"startup-configs incorrectes : {', '.join(wrong[:5])}")
+    leftovers = list(Path(project_dir, "project-files").rglob("*.tmp"))
+    if leftovers:
+        problems.append(f"{len(leftovers)} fichiers temporaires restants")
+    return problems
+
+
+def main():
+    n_routers = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.002
+    thread_counts = [int(t) for t in sys.argv[3:]] or [1, 4, 16, 64]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        configs_dir = Path(tmp) / "configs"
+        with redirect_stdout(io.StringIO()):
+            gns3_file = generate_project(tmp, n_routers=n_routers, n_as=min(99, max(2, n_routers // 100)))
+            topo = get_topology(gns3_file, loopback_format="with_as", write_file=False)
+            generate_bgp_configs(topo, output_dir=configs_dir, options={"ibgp_mode": "route_reflector"})
+        project_dir = str(Path(gns3_file).parent)
+        startup_configs = startup_config_index(project_dir, use_cache=False)
+        name_to_path = {
+            n["name"]: startup_configs[n["node_id"]]
+            for n in load_project(gns3_file)["topology"]["nodes"] if n.get("node_type") == "dynamips"
+        }
+
+        print(f"{n_routers} routeurs, latence {latency * 1000:.1f} ms par appel système")
+        print(f"{'threads':>8} {'copie (s)':>10} {'inchangé (s)':>13} {'accélération':>13}")
+        reference = None
+        for threads in thread_counts:
+            reset_startup_configs(startup_configs)
+            timings = []
+            for expected_status in ("copied", "skipped"):
+                clear_node_index_cache()  # parcours complet à chaque passe (voir bench_node_index.py)
+                with slow_filesystem(latency), redirect_stdout(io.StringIO()):
+                    t0 = time.perf_counter()
+                    summary = injection_cfg(project_dir=project_dir, configs_dir=str(configs_dir), threads=threads)
+                    timings.append(time.perf_counter() - t0)
+                problems = check(project_dir, configs_dir, name_to_path, summary, expected_status)
+                if problems:
+                    print(f"ERREUR ({threads} threads, passe '{expected_status}') : {'; '.join(problems)}")
+                    sys.exit(1)
+            if reference is None:
+                reference = timings[0]
+            print(f"{threads:>8} {timings[0]:>10.2f} {timings[1]:>13.2f} {reference / timings[0]:>12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark : adressage IPv6 des liens, ancienne boucle (f-strings + objets
+ipaddress par lien) vs allocateur entier (get_topology/ip_allocator.py).
+Vérifie aussi que les deux donnent exactement les mêmes adresses.
+
+Usage : python benchmarks/bench_ip_allocator.py [nb_liens]
+"""
+import contextlib
+import io
+import ipaddress
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from get_topology.ip_allocator import allocate_links
+
+IP_BASES = ["2000:1::/64", "2001:db8::/32", "2000:1:2::/48", "fd00:1:2:3::/64"]
+
+
+def allocate_links_legacy(links, node_to_id, router_to_as, ip_base):
+    """Ancienne implémentation de get_topology (une chaîne et des objets ipaddress par lien)."""
+    base_net_obj = ipaddress.ip_network(ip_base, strict=False)
+    base_parts = str(base_net_obj.network_address).split('::')[0]
+    result = []
+    for link in links:
+        a, b = link["a"], link["b"]
+        id_a_int, id_b_int = node_to_id[a], node_to_id[b]
+        info_a, info_b = router_to_as.get(a), router_to_as.get(b)
+        as_a = int(info_a['as_number']) if info_a and info_a.get('as_number') else 0
+        as_b = int(info_b['as_number']) if info_b and info_b.get('as_number') else 0
+        if as_a == as_b and as_a != 0:
+            low_id, high_id = sorted((id_a_int, id_b_int))
+            subnet_cidr = f"{base_parts}:{as_a}:{low_id}:{high_id}::/80"
+            net = ipaddress.IPv6Network(f"{base_parts}:{as_a}:{low_id}:{high_id}::/80", strict=False)
+            ip_a_str = str(net.network_address + id_a_int)
+            ip_b_str = str(net.network_address + id_b_int)
+            prefix_len = 80
+        else:
+            low_as, high_as = sorted((as_a, as_b))
+            low_id, high_id = sorted((id_a_int, id_b_int))
+            subnet_str = f"{base_parts}:0:{low_as}:{high_as}:{low_id}:{high_id}:0"
+            try:
+                base_ip_int = int(ipaddress.IPv6Address(subnet_str))
+                ip_a_str = str(ipaddress.IPv6Address(base_ip_int + id_a_int))
+                ip_b_str = str(ipaddress.IPv6Address(base_ip_int + id_b_int))
+                subnet_cidr = f"{base_parts}:0:{low_as}:{high_as}:{low_id}:{high_id}::/112"
+            except Exception:
+                ip_a_str = f"2001:FFFF:{low_as}:{high_as}::{id_a_int}"
+                ip_b_str = f"2001:FFFF:{low_as}:{high_as}::{id_b_int}"
+                subnet_cidr = f"2001:FFFF:{low_as}:{high_as}::/64"
+            prefix_len = 112
+        result.append((ip_a_str, ip_b_str, prefix_len, subnet_cidr))
+    return result
+
+
+def make_links(n_links, rng):
+    # IDs et AS restent <= 9999 : au-delà l'ancienne boucle lève une exception
+    n_routers = max(2, min(9999, n_links // 2))
+    node_to_id = {f"R{i}": i for i in range(1, n_routers + 1)}
+    router_to_as = {f"R{i}": {"as_number": 10 * (1 + (i - 1) // 50)} for i in range(1, n_routers + 1)}
+    # Environ 1 lien sur 10 est inter-AS
+    links = []
+    for i in range(n_links):
+        a = rng.randint(1, n_routers)
+        b = a + 1 if (i % 10 and a < n_routers) else rng.randint(1, n_routers)
+        links.append({"a": f"R{a}", "a_iface": "GigabitEthernet1/0", "b": f"R{b}", "b_iface": "GigabitEthernet2/0"})
+    return links, node_to_id, router_to_as
+
+
+def main():
+    n_links = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rng = random.Random(7)
+    links, node_to_id, router_to_as = make_links(n_links, rng)
+
+    # Fidélité sur plusieurs préfixes de base (dont des cas de repli inter-AS)
+    sample = links[:2000]
+    for ip_base in IP_BASES:
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected = allocate_links_legacy(sample, node_to_id, router_to_as, ip_base)
+            got, _, _ = allocate_links(sample, node_to_id, router_to_as, ip_base)
+        if got != expected:
+            print(f"ERREUR : adresses différentes pour la base {ip_base}")
+            sys.exit(1)
+
+    t0 = time.perf_counter()
+    allocate_links_legacy(links, node_to_id, router_to_as, "2000:1::/64")
+    t_legacy = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    _, collisions, overflows = allocate_links(links, node_to_id, router_to_as, "2000:1::/64")
+    t_new = time.perf_counter() - t0
+
+    print(f"{n_links} liens")
+    print(f"  ancienne boucle ipaddress : {t_legacy:.3f} s")
+    print(f"  allocateur entier         : {t_new:.3f} s ({t_legacy / t_new:.1f}x)")
+    print(f"  collisions détectées      : {len(collisions)}")
+    print(f"  liens hors plan           : {len(overflows)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark : envoi en direct des configurations (live_push) à des consoles
+factices (fake_console.py), selon le nombre de consoles ouvertes en parallèle.
+
+Le projet synthétique (un port console par routeur) est généré, ses
+configurations rendues, puis chaque routeur simulé doit avoir reçu exactement
+les commandes de sa configuration et l'avoir sauvegardée ; le code de sortie
+est 1 sinon.
+
+Usage : python benchmarks/bench_live_push.py [nb_routeurs] [latence_s] [concurrences...]
+        python benchmarks/bench_live_push.py 2000 0.002 64 256 1024
+"""
+import io
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent))
+from get_topology.get_topology import get_topology
+from gen_config_bgp.bgp_gen import generate_bgp_configs
+from live_push.live_push import push_configs, console_targets, config_commands
+from fake_console import new_state, run_in_thread
+from synthetic_gns3 import generate_project
+
+
+def main():
+    n_routers = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.002
+    concurrencies = [int(c) for c in sys.argv[3:]] or [16, 64, 256]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        configs_dir = Path(tmp) / "configs"
+        with redirect_stdout(io.StringIO()):
+            gns3_file = generate_project(tmp, node_dirs=False, n_routers=n_routers, n_as=min(99, max(2, n_routers // 100)))
+            topo = get_topology(gns3_file, loopback_format="with_as", write_file=False)
+            generate_bgp_configs(topo, output_dir=configs_dir, options={"ibgp_mode": "route_reflector"})
+        targets = console_targets(gns3_file)
+        expected = {name: config_commands((configs_dir / f"{name}.cfg").read_text()) for name in targets}
+        n_commands = sum(len(c) for c in expected.values())
+
+        print(f"{n_routers} routeurs, {n_commands} commandes, latence {latency * 1000:.1f} ms par commande")
+        print(f"{'consoles':>9} {'temps (s)':>10} {'routeurs/s':>11} {'erreurs':>8}")
+        for concurrency in concurrencies:
+            states = {port: new_state(latency=latency) for _, port in targets.values()}
+            stop = run_in_thread(states)
+            try:
+                t0 = time.perf_counter()
+                with redirect_stdout(io.StringIO()):
+                    summary = push_configs(gns3_file, configs_dir, concurrency=concurrency, timeout=30)
+                elapsed = time.perf_counter() - t0
+            finally:
+                stop()
+
+            wrong = [
+                name for name, (_, port) in targets.items()
+                if states[port]["received"] != expected[name] or not states[port]["saved"]
+            ]
+            if summary["errors"] or wrong:
+                print(f"ERREUR : {len(summary['errors'])} routeurs en erreur, "
+                      f"{len(wrong)} configurations reçues incorrectes ({', '.join(wrong[:5])})")
+                sys.exit(1)
+            print(f"{concurrency:>9} {elapsed:>10.2f} {n_routers / elapsed:>11.0f} {len(summary['errors']):>8}")
+
+
+if __name__ == "__main__":
+    main()
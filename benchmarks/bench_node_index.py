@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark : index des startup-configs (gns3_project.startup_config_index),
+parcours complet contre index en cache, sur un projet synthétique dont les
+dossiers de nœuds ont été créés il y a longtemps.
+
+Après chaque modification typique (startup-config remplacée par injection,
+fichier renommé, nœud ajouté, nœud supprimé), l'index en cache doit être
+identique à un parcours complet ; le code de sortie est 1 sinon. Les appels à
+os.scandir sont comptés pour montrer ce qui est relu.
+
+Usage : python benchmarks/bench_node_index.py [nb_routeurs] [latence_s]
+        python benchmarks/bench_node_index.py 5000 0.001
+"""
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent))
+from gns3_project import startup_config_index, clear_node_index_cache, dynamips_dir
+from bench_injection_latency import slow_filesystem
+from synthetic_gns3 import generate_project
+
+# Dates de modification reculées d'une heure (projet existant, pas en cours d'écriture)
+AGE_S = 3600
+
+
+def backdate(root):
+    past = time.time() - AGE_S
+    for path in [root, *(p for p in Path(root).rglob("*") if p.is_dir())]:
+        os.utime(path, (past, past))
+
+
+def timed_index(project_dir, latency, use_cache=True):
+    """(index, durée, nombre d'appels à os.scandir)."""
+    calls = [0]
+    scandir = os.scandir
+
+    def counting_scandir(*args):
+        calls[0] += 1
+        return scandir(*args)
+
+    os.scandir = counting_scandir
+    try:
+        with slow_filesystem(latency):
+            t0 = time.perf_counter()
+            index = startup_config_index(project_dir, use_cache=use_cache)
+            elapsed = time.perf_counter() - t0
+    finally:
+        os.scandir = scandir
+    return index, elapsed, calls[0]
+
+
+def main():
+    n_routers = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with redirect_stdout(io.StringIO()):
+            gns3_file = generate_project(tmp, n_routers=n_routers, n_as=min(99, max(2, n_routers // 100)))
+        project_dir = str(Path(gns3_file).parent)
+        root = Path(dynamips_dir(project_dir))
+        node_dirs = sorted(p for p in root.iterdir() if p.is_dir())
+
+        def modify_startup():
+            # Remplacement atomique (comme atomic_copy) : nouveau fichier dans configs/
+            target = next((node_dirs[0] / "configs").glob("i*_startup-config.cfg"))
+            tmp_path = target.with_name(".x.tmp")
+            tmp_path.write_text("!\nend\n")
+            os.replace(tmp_path, target)
+            os.utime(target.parent, (time.time() - AGE_S + 1,) * 2)
+
+        def rename_startup():
+            target = next((node_dirs[1] / "configs").glob("i*_startup-config.cfg"))
+            target.rename(target.with_name("i99_startup-config.cfg"))
+            os.utime(target.parent, (time.time() - AGE_S + 2,) * 2)
+
+        def add_node():
+            configs = root / "bench-new-node" / "configs"
+            configs.mkdir(parents=True)
+            (configs / "i1_startup-config.cfg").write_text("!\nend\n")
+            backdate(root / "bench-new-node")
+            os.utime(root, (time.time() - AGE_S + 3,) * 2)
+
+        def remove_node():
+            shutil.rmtree(node_dirs[2])
+            os.utime(root, (time.time() - AGE_S + 4,) * 2)
+
+        backdate(root)
+        clear_node_index_cache()
+        print(f"{len(node_dirs)} dossiers de nœuds, latence {latency * 1000:.1f} ms par appel système")
+        print(f"{'situation':<30} {'complet (s)':>12} {'scandir':>8} {'cache (s)':>10} {'scandir':>8}")
+
+        steps = [
+            ("premier appel", None),
+            ("aucun changement", lambda: None),
+            ("startup-config remplacée", modify_startup),
+            ("startup-config renommée", rename_startup),
+            ("nœud ajouté", add_node),
+            ("nœud supprimé", remove_node),
+        ]
+        for label, change in steps:
+            if change is not None:
+                change()
+            cached, t_cached, n_cached = timed_index(project_dir, latency)
+            full, t_full, n_full = timed_index(project_dir, latency, use_cache=False)
+            if cached != full:
+                print(f"ERREUR ({label}) : index en cache différent du parcours complet")
+                sys.exit(1)
+            print(f"{label:<30} {t_full:>12.3f} {n_full:>8} {t_cached:>10.3f} {n_cached:>8}")
+
+
+if __name__ == "__main__":
+    main()
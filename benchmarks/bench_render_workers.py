@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark : rendu et écriture des configurations avec 1, 2, 4 et 8 processus.
+
+La topologie synthétique comporte des AS de 10 routeurs (full mesh iBGP),
+reliés en chaîne à l'intérieur d'un AS et en eBGP entre AS voisins.
+
+Le nombre de CPU utilisables est affiché : render_configs ne démarre pas plus
+de processus qu'il n'y a de CPU (et aucun sous PARALLEL_MIN_JOBS configurations),
+chaque ligne donne le nombre demandé et le nombre réellement utilisé. Un nombre
+effectif déjà mesuré n'est pas remesuré (la ligne renvoie à la mesure
+d'origine) : sur une machine à un seul CPU, seule la ligne 1 -> 1 est mesurée,
+les écarts entre lignes identiques n'étant que du bruit.
+
+Usage : python benchmarks/bench_render_workers.py [nb_routeurs]
+"""
+import io
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from gen_config_bgp.bgp_gen import generate_bgp_configs, effective_workers, usable_cpus
+
+WORKER_COUNTS = [1, 2, 4, 8]
+AS_SIZE = 10
+# Meilleur temps sur REPEATS exécutions
+REPEATS = 3
+
+
+def make_topology(n_routers):
+    routers, links = [], []
+    for i in range(1, n_routers + 1):
+        as_idx = (i - 1) // AS_SIZE
+        routers.append({
+            "name": f"R{i}",
+            "protocol": "OSPF" if as_idx % 2 else "RIP",
+            "as_number": 100 * (as_idx + 1),
+            "interfaces": [],
+            "networks": [],
+        })
+    for i in range(1, n_routers):
+        a, b = routers[i - 1], routers[i]
+        prefix = f"2000:1:{i:x}:{i + 1:x}::"
+        a["interfaces"].append({"name": "GigabitEthernet2/0", "ip": f"{prefix}{i:x}", "prefix": 80})
+        b["interfaces"].append({"name": "GigabitEthernet1/0", "ip": f"{prefix}{i + 1:x}", "prefix": 80})
+        a["networks"].append(f"{prefix}/80")
+        b["networks"].append(f"{prefix}/80")
+        links.append({"a": a["name"], "a_iface": "GigabitEthernet2/0", "b": b["name"], "b_iface": "GigabitEthernet1/0"})
+    return {"ip_base": "2000:1::/64", "loopback_format": "simple", "routers": routers, "links": links}
+
+
+def main():
+    n_routers = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    topo = make_topology(n_routers)
+    options = {"secure_redist": True, "policies_enabled": True}
+
+    cpus = usable_cpus()
+    print(f"{n_routers} routeurs, {cpus} CPU utilisable(s) (os.cpu_count() = {os.cpu_count()})")
+    if cpus == 1:
+        print("ATTENTION : un seul CPU, aucun rendu parallèle possible (seul le rendu dans le processus courant est mesuré)")
+    print(f"{'workers (effectifs)':>20} {'temps (s)':>10} {'accélération':>13}")
+    # Tour de chauffe : compilation des templates hors mesure
+    with tempfile.TemporaryDirectory() as out_dir, redirect_stdout(io.StringIO()):
+        generate_bgp_configs(topo, output_dir=out_dir, options=options)
+    reference = None
+    measured = {}  # nombre effectif -> nombre demandé de la ligne mesurée
+    for workers in WORKER_COUNTS:
+        used = effective_workers(workers, n_routers)
+        label = f"{workers} ({used})"
+        if used in measured:
+            print(f"{label:>20} {'-':>10} {'-':>13}  même rendu que workers={measured[used]}, non remesuré")
+            continue
+        measured[used] = workers
+        timings = []
+        for _ in range(REPEATS):
+            with tempfile.TemporaryDirectory() as out_dir:
+                t0 = time.perf_counter()
+                with redirect_stdout(io.StringIO()):
+                    generate_bgp_configs(topo, output_dir=out_dir, options=options, workers=workers)
+                timings.append(time.perf_counter() - t0)
+        elapsed = min(timings)
+        if reference is None:
+            reference = elapsed
+        print(f"{label:>20} {elapsed:>10.3f} {reference / elapsed:>12.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Benchmark de passage à l'échelle : get_topology, generate_bgp_configs (RIP puis
+OSPF, comme les deux générateurs historiques) et injection_cfg, sur des projets
+synthétiques de 10 à 50 000 routeurs (voir synthetic_gns3.py).
+
+Pour chaque taille et chaque étape : temps réel, puis pic mémoire Python
+(tracemalloc, mesuré dans une seconde passe pour ne pas fausser les temps).
+Les résultats sont comparés à une référence enregistrée (baseline_scaling.json) ;
+le code de sortie est 1 si une étape dépasse la référence de plus de --tolerance.
+
+Usage :
+    python benchmarks/bench_scaling.py                         # 10, 100, 1000, 5000
+    python benchmarks/bench_scaling.py --sizes 10 1000 50000
+    python benchmarks/bench_scaling.py --update-baseline       # enregistre la référence
+"""
+import argparse
+import io
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent))
+from get_topology.get_topology import get_topology, clear_structure_cache
+from gen_config_bgp.bgp_gen import generate_bgp_configs
+from injection_cfgs.injection_cfgs import injection_cfg
+from gns3_project import clear_project_cache
+from synthetic_gns3 import make_project, write_project
+
+DEFAULT_SIZES = [10, 100, 1000, 5000]
+BASELINE_FILE = Path(__file__).parent / "baseline_scaling.json"
+STAGES = ["get_topology", "generate_rip", "generate_ospf", "injection_cfg"]
+
+# En dessous de ces valeurs, les écarts relèvent du bruit de mesure et ne sont pas signalés
+MIN_TIME_S = 0.05
+MIN_PEAK_MB = 1.0
+
+
+def as_count_for(n_routers):
+    """~100 routeurs par AS, entre 2 et 99 AS."""
+    return min(99, max(2, n_routers // 100))
+
+
+def make_stages(gns3_file, configs_dir, options):
+    """Étapes du pipeline, dans l'ordre ; chacune dépend de la précédente (topologie partagée)."""
+    state = {}
+
+    def topology():
+        clear_project_cache()
+        clear_structure_cache()
+        state["topo"] = get_topology(gns3_file, loopback_format="with_as", write_file=False)
+
+    def rip():
+        generate_bgp_configs(state["topo"], output_dir=configs_dir, options=options, protocols=["RIP"])
+
+    def ospf():
+        generate_bgp_configs(state["topo"], output_dir=configs_dir, options=options, protocols=["OSPF"])
+
+    def inject():
+        injection_cfg(project_dir=str(gns3_file.parent), configs_dir=str(configs_dir))
+
+    return dict(zip(STAGES, [topology, rip, ospf, inject]))
+
+
+def run_size(n_routers, options, measure_memory):
+    project = make_project(n_routers=n_routers, n_as=as_count_for(n_routers), seed=n_routers)
+    results = {stage: {} for stage in STAGES}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Passe 1 : temps
+        gns3_file = write_project(Path(tmp) / "timing", project)
+        stages = make_stages(gns3_file, Path(tmp) / "timing" / "configs", options)
+        for name, fn in stages.items():
+            t0 = time.perf_counter()
+            with redirect_stdout(io.StringIO()):
+                fn()
+            results[name]["time_s"] = time.perf_counter() - t0
+
+        # Passe 2 : pic mémoire, sur une copie neuve (l'injection ne doit pas tout trouver à jour)
+        if measure_memory:
+            gns3_file = write_project(Path(tmp) / "memory", project)
+            stages = make_stages(gns3_file, Path(tmp) / "memory" / "configs", options)
+            tracemalloc.start()
+            for name, fn in stages.items():
+                tracemalloc.reset_peak()
+                base, _ = tracemalloc.get_traced_memory()
+                with redirect_stdout(io.StringIO()):
+                    fn()
+                _, peak = tracemalloc.get_traced_memory()
+                results[name]["peak_mb"] = (peak - base) / 2**20
+            tracemalloc.stop()
+
+    return len(project["topology"]["links"]), results
+
+
+def compare(value, reference, tolerance, floor):
+    if reference is None or value is None:
+        return "", False
+    ratio = value / reference if reference else float("inf")
+    regression = ratio > tolerance and max(value, reference) >= floor
+    return f"{ratio:5.2f}x{' !' if regression else '  '}", regression
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de passage à l'échelle du pipeline.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="nombres de routeurs")
+    parser.add_argument("--ibgp-mode", choices=["full_mesh", "route_reflector"], default="route_reflector",
+                        help="topologie iBGP (défaut : route_reflector, le full mesh est quadratique)")
+    parser.add_argument("--no-memory", action="store_true", help="ne pas mesurer le pic mémoire")
+    parser.add_argument("--baseline", default=str(BASELINE_FILE), help="fichier de référence")
+    parser.add_argument("--update-baseline", action="store_true", help="enregistrer ces résultats comme référence")
+    parser.add_argument("--tolerance", type=float, default=1.5,
+                        help="ratio au-delà duquel une étape est signalée en régression (défaut : 1.5)")
+    args = parser.parse_args()
+
+    options = {"secure_redist": True, "policies_enabled": True, "ibgp_mode": args.ibgp_mode}
+    baseline_path = Path(args.baseline)
+    baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+
+    measured = {}
+    regressions = []
+    print(f"{'routeurs':>8} {'liens':>7}  {'étape':<14} {'temps (s)':>10} {'vs réf':>8} {'pic (Mo)':>9} {'vs réf':>8}")
+    for n_routers in args.sizes:
+        n_links, results = run_size(n_routers, options, not args.no_memory)
+        measured[str(n_routers)] = results
+        reference = baseline.get(str(n_routers), {})
+        for stage in STAGES:
+            r = results[stage]
+            ref = reference.get(stage, {})
+            t_cmp, t_reg = compare(r["time_s"], ref.get("time_s"), args.tolerance, MIN_TIME_S)
+            m_cmp, m_reg = compare(r.get("peak_mb"), ref.get("peak_mb"), args.tolerance, MIN_PEAK_MB)
+            if t_reg or m_reg:
+                regressions.append(f"{n_routers} routeurs / {stage}")
+            peak = f"{r['peak_mb']:9.1f}" if "peak_mb" in r else f"{'-':>9}"
+            print(f"{n_routers:>8} {n_links:>7}  {stage:<14} {r['time_s']:>10.3f} {t_cmp:>8} {peak} {m_cmp:>8}")
+
+    if args.update_baseline:
+        baseline.update(measured)
+        baseline_path.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"Référence enregistrée : {baseline_path}")
+    elif regressions:
+        print(f"\nRégressions (> {args.tolerance}x la référence) : {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark : écriture et relecture de topology.json selon le backend (json
+standard, orjson, msgspec) et le format (pretty, compact, msgpack).
+
+Vérifie d'abord la fidélité de l'aller-retour pour chaque combinaison
+disponible (dict -> octets -> dict, et Topology -> fichier -> Topology), puis
+que tous les backends JSON produisent les mêmes octets ; le code de sortie est
+1 en cas d'écart. Les backends non installés sont ignorés.
+
+Usage : python benchmarks/bench_serialization.py [nb_routeurs] [répétitions]
+"""
+import io
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent))
+import serialization
+from serialization import dumps, loads, dump_file, EXTENSIONS
+from get_topology.get_topology import get_topology
+from topology_model import topology_to_dict
+from utils import load_topology
+from synthetic_gns3 import generate_project
+
+
+def json_backends():
+    backends = ["json"]
+    if serialization.orjson is not None:
+        backends.append("orjson")
+    if serialization.msgspec is not None:
+        backends.append("msgspec")
+    return backends
+
+
+def combinations():
+    """(backend, format) disponibles ; msgpack a son propre backend (MSGPACK_BACKEND)."""
+    combos = [(backend, fmt) for fmt in ("pretty", "compact") for backend in json_backends()]
+    if serialization.MSGPACK_BACKEND is not None:
+        combos.append((serialization.MSGPACK_BACKEND, "msgpack"))
+    return combos
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def check_round_trips(data, model, tmp):
+    errors = []
+    for backend, fmt in combinations():
+        read_fmt = "msgpack" if fmt == "msgpack" else "json"
+        json_backend = None if fmt == "msgpack" else backend
+        raw = dumps(data, fmt, backend=json_backend)
+        if loads(raw, read_fmt, backend=json_backend) != data:
+            errors.append(f"{backend}/{fmt} : dict -> octets -> dict")
+
+    # Topology -> fichier -> Topology, par le chemin du pipeline (backend par défaut)
+    for fmt in {fmt for _, fmt in combinations()}:
+        path = Path(tmp) / f"topology_{fmt}{EXTENSIONS[fmt]}"
+        dump_file(topology_to_dict(model), path, fmt)
+        with redirect_stdout(io.StringIO()):
+            reloaded = load_topology(str(path))
+        if topology_to_dict(reloaded) != data:
+            errors.append(f"{fmt} : Topology -> fichier -> Topology")
+
+    for fmt in ("pretty", "compact"):
+        outputs = {backend: dumps(data, fmt, backend=backend) for backend in json_backends()}
+        if len(set(outputs.values())) > 1:
+            errors.append(f"{fmt} : octets différents selon le backend ({', '.join(outputs)})")
+    return errors
+
+
+def main():
+    n_routers = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    with tempfile.TemporaryDirectory() as tmp:
+        gns3_file = generate_project(tmp, node_dirs=False, n_routers=n_routers, n_as=min(99, max(2, n_routers // 100)))
+        with redirect_stdout(io.StringIO()):
+            model = get_topology(gns3_file, loopback_format="with_as", write_file=False)
+        data = topology_to_dict(model)
+
+        errors = check_round_trips(data, model, tmp)
+        if errors:
+            print("ERREUR : aller-retour non fidèle :")
+            for error in errors:
+                print(f"  - {error}")
+            sys.exit(1)
+
+    print(f"{n_routers} routeurs, {len(data['links'])} liens (meilleur de {repeat})")
+    print(f"{'backend':<8} {'format':<8} {'taille (Ko)':>12} {'écriture (s)':>13} {'lecture (s)':>12}")
+    reference = None
+    for backend, fmt in combinations():
+        read_fmt = "msgpack" if fmt == "msgpack" else "json"
+        json_backend = None if fmt == "msgpack" else backend
+        raw = dumps(data, fmt, backend=json_backend)
+        t_dump = best_of(lambda: dumps(data, fmt, backend=json_backend), repeat)
+        t_load = best_of(lambda: loads(raw, read_fmt, backend=json_backend), repeat)
+        if reference is None:
+            reference = t_dump + t_load
+        speedup = reference / (t_dump + t_load)
+        print(f"{backend:<8} {fmt:<8} {len(raw) / 1024:>12.0f} {t_dump:>13.4f} {t_load:>12.4f}  ({speedup:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark : attribution routeurs -> AS, parcours linéaire vs index spatial.
+Balaye le nombre de routeurs et de rectangles, et vérifie que les deux
+méthodes donnent exactement la même attribution.
+
+Usage : python benchmarks/bench_spatial_index.py
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from get_topology.get_topology import assign_routers_to_as, is_point_in_rectangle
+
+NODE_COUNTS = [100, 1000, 5000]
+RECT_COUNTS = [10, 100, 500]
+CANVAS = 20000
+
+
+def make_rectangles(count, rng):
+    rects = []
+    for i in range(count):
+        w = rng.randint(200, 3000)
+        h = rng.randint(200, 3000)
+        rects.append({
+            "x": rng.randint(-CANVAS // 2, CANVAS // 2 - w),
+            "y": rng.randint(-CANVAS // 2, CANVAS // 2 - h),
+            "width": w,
+            "height": h,
+            "color": "ff0000" if i % 2 else "00ff00",
+            "protocol": "RIP" if i % 2 else "OSPF",
+            "as_number": 100 * (i + 1),
+        })
+    return rects
+
+
+def make_nodes(count, rng):
+    return [{
+        "name": f"R{i + 1}",
+        "node_type": "dynamips",
+        "x": rng.randint(-CANVAS // 2, CANVAS // 2),
+        "y": rng.randint(-CANVAS // 2, CANVAS // 2),
+    } for i in range(count)]
+
+
+def assign_linear(nodes_data, rectangles):
+    """Ancienne implémentation : chaque routeur testé contre chaque rectangle."""
+    router_to_as = {}
+    for node in nodes_data:
+        protocol, as_number = "UNKNOWN", None
+        for rect in rectangles:
+            if is_point_in_rectangle(node["x"], node["y"], rect) and rect["protocol"] in ["RIP", "OSPF"]:
+                protocol, as_number = rect["protocol"], rect["as_number"]
+                break
+        router_to_as[node["name"]] = {"protocol": protocol, "as_number": as_number, "ebgp": False}
+    return router_to_as
+
+
+def main():
+    rng = random.Random(42)
+    print(f"{'routeurs':>9} {'rects':>6} {'linéaire (s)':>13} {'index (s)':>10} {'gain':>6}")
+    for n_rects in RECT_COUNTS:
+        rects = make_rectangles(n_rects, rng)
+        for n_nodes in NODE_COUNTS:
+            nodes = make_nodes(n_nodes, rng)
+
+            t0 = time.perf_counter()
+            expected = assign_linear(nodes, rects)
+            t_linear = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            result = assign_routers_to_as(nodes, rects)
+            t_index = time.perf_counter() - t0
+
+            if result != expected:
+                print("ERREUR : les attributions diffèrent !")
+                sys.exit(1)
+            print(f"{n_nodes:>9} {n_rects:>6} {t_linear:>13.4f} {t_index:>10.4f} {t_linear / t_index:>5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark : mémoire et temps d'accès de la topologie, dicts imbriqués
+(schéma topology.json) vs modèle à __slots__ (topology_model).
+
+La topologie est extraite d'un projet synthétique (synthetic_gns3.py) ; la
+forme dict est celle que l'on relit depuis topology.json.
+
+Usage : python benchmarks/bench_topology_model.py [nb_routeurs]
+"""
+import gc
+import io
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent))
+from get_topology.get_topology import get_topology
+from topology_model import topology_from_dict, topology_to_dict
+from synthetic_gns3 import generate_project
+
+
+def traced_size(build):
+    """Mémoire retenue par l'objet construit par build() (octets)."""
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, size
+
+
+def scan_dicts(topo):
+    n = 0
+    for r in topo["routers"]:
+        for iface in r["interfaces"]:
+            if iface["prefix"] == 80 and r["as_number"]:
+                n += 1
+    for link in topo["links"]:
+        if link["a"] != link["b"]:
+            n += 1
+    return n
+
+
+def scan_model(topo):
+    n = 0
+    for r in topo.routers:
+        for iface in r.interfaces:
+            if iface.prefix == 80 and r.as_number:
+                n += 1
+    for a, _, b, _ in topo.links.rows():
+        if a != b:
+            n += 1
+    return n
+
+
+def main():
+    n_routers = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    with tempfile.TemporaryDirectory() as tmp:
+        gns3_file = generate_project(tmp, node_dirs=False, n_routers=n_routers, n_as=min(99, max(2, n_routers // 100)))
+        with redirect_stdout(io.StringIO()):
+            model = get_topology(gns3_file, loopback_format="with_as", write_file=False)
+    text = json.dumps(topology_to_dict(model))
+    del model
+
+    as_dicts, dict_bytes = traced_size(lambda: json.loads(text))
+    # Construit depuis le texte : les chaînes du modèle ne sont pas partagées avec as_dicts
+    as_model, model_bytes = traced_size(lambda: topology_from_dict(json.loads(text)))
+
+    t0 = time.perf_counter()
+    expected = scan_dicts(as_dicts)
+    t_dicts = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    found = scan_model(as_model)
+    t_model = time.perf_counter() - t0
+    if found != expected:
+        print("ERREUR : les deux formes ne donnent pas le même résultat !")
+        sys.exit(1)
+
+    if topology_to_dict(as_model) != as_dicts:
+        print("ERREUR : l'aller-retour topology.json -> modèle -> dict n'est pas fidèle !")
+        sys.exit(1)
+
+    print(f"{n_routers} routeurs, {len(as_model.links)} liens")
+    print(f"{'forme':<8} {'mémoire (Mo)':>13} {'parcours (s)':>13}")
+    print(f"{'dicts':<8} {dict_bytes / 2**20:>13.1f} {t_dicts:>13.4f}")
+    print(f"{'modèle':<8} {model_bytes / 2**20:>13.1f} {t_model:>13.4f}")
+    print(f"gain mémoire : {dict_bytes / model_bytes:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Consoles telnet factices de routeurs IOS, pour tester live_push sans GNS3.
+
+Chaque port simule un routeur : négociation telnet, "Press RETURN", dialogue de
+configuration initiale, modes exec / enable / configuration (prompts
+Router>, R1#, R1(config-if)#...), hostname, write memory. Les commandes reçues
+en mode configuration sont conservées par port (state["received"]).
+
+Options de simulation : latence par commande, commandes refusées
+("% Invalid input"), premières connexions coupées ou muettes (pour tester les
+reprises), console muette après N commandes de configuration (envoi partiel).
+
+Usage : python benchmarks/fake_console.py projet.gns3 [--latency 0.01]
+        (une console par nœud dynamips du projet, jusqu'à Ctrl+C)
+"""
+import argparse
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+IAC, DONT, DO, WONT, WILL = 255, 254, 253, 252, 251
+ECHO, SGA = 1, 3
+
+# Mode de configuration ouvert par une commande de premier niveau
+SECTION_MODES = {
+    "interface": "config-if",
+    "router": "config-router",
+    "ipv6 router": "config-rtr",
+    "route-map": "config-route-map",
+}
+
+
+def new_state(hostname="Router", latency=0.0, invalid=(), drop_connections=0, initial_dialog=False,
+              silent_connections=0, stall_after=None):
+    """État d'un routeur simulé (partagé entre ses connexions successives)."""
+    return {
+        "hostname": hostname,
+        "latency": latency,
+        "invalid": tuple(invalid),           # sous-chaînes des commandes refusées
+        "drop_connections": drop_connections,  # connexions coupées avant le prompt
+        "initial_dialog": initial_dialog,
+        "silent_connections": silent_connections,  # connexions suivantes acceptées, jamais de réponse
+        "stall_after": stall_after,          # plus de réponse après N commandes reçues (une fois)
+        "received": [],
+        "saved": False,
+        "connections": 0,
+    }
+
+
+def _section_mode(command):
+    for prefix in sorted(SECTION_MODES, key=len, reverse=True):
+        if command.startswith(prefix + " "):
+            return SECTION_MODES[prefix]
+    return "config"
+
+
+def _strip_telnet(data):
+    if IAC not in data:
+        return data
+    out = bytearray()
+    i = 0
+    while i < len(data):
+        if data[i] == IAC and i + 1 < len(data):
+            i += 3 if data[i + 1] in (DO, DONT, WILL, WONT) else 2
+            continue
+        out.append(data[i])
+        i += 1
+    return bytes(out)
+
+
+async def _swallow(reader, writer):
+    """Console muette : lit sans jamais répondre jusqu'à la fermeture par le client."""
+    try:
+        while await reader.read(4096):
+            pass
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def _handle(state, reader, writer):
+    state["connections"] += 1
+    if state["connections"] <= state["drop_connections"]:
+        writer.close()
+        return
+    if state["connections"] <= state["drop_connections"] + state["silent_connections"]:
+        await _swallow(reader, writer)
+        return
+
+    writer.write(bytes((IAC, WILL, ECHO, IAC, WILL, SGA)))
+    writer.write(b"\r\n\r\nPress RETURN to get started!\r\n")
+    mode = None  # None = pas encore réveillé, "exec", "enable", "config...", "dialog"
+
+    def prompt():
+        if mode == "exec":
+            return f"{state['hostname']}>"
+        if mode == "enable":
+            return f"{state['hostname']}#"
+        return f"{state['hostname']}({mode})#"
+
+    buffer = b""
+    try:
+        while True:
+            data = await reader.read(4096)
+            if not data:
+                break
+            buffer += _strip_telnet(data)
+            while b"\r" in buffer:
+                raw, buffer = buffer.split(b"\r", 1)
+                buffer = buffer.lstrip(b"\n\x00")
+                line = raw.decode("ascii", "replace")
+                command = line.strip()
+                writer.write(line.encode("ascii") + b"\r\n")  # écho
+                if state["latency"]:
+                    await asyncio.sleep(state["latency"])
+
+                if mode is None:
+                    if state["initial_dialog"]:
+                        state["initial_dialog"] = False
+                        mode = "dialog"
+                        writer.write(b"Would you like to enter the initial configuration dialog? [yes/no]: ")
+                        continue
+                    mode = "exec"
+                elif mode == "dialog":
+                    mode = "exec"
+                elif not command:
+                    pass
+                elif mode == "exec":
+                    if command == "enable":
+                        mode = "enable"
+                    else:
+                        writer.write(b"% Unknown command\r\n")
+                elif mode == "enable":
+                    if command in ("configure terminal", "conf t"):
+                        mode = "config"
+                    elif command == "write memory":
+                        writer.write(b"Building configuration...\r\n[OK]\r\n")
+                        state["saved"] = True
+                    elif command != "end":
+                        writer.write(b"% Unknown command\r\n")
+                else:
+                    if command == "end":
+                        mode = "enable"
+                    elif any(bad in command for bad in state["invalid"]):
+                        writer.write(b"                ^\r\n% Invalid input detected at '^' marker.\r\n")
+                    else:
+                        state["received"].append(line)
+                        if state["stall_after"] is not None and len(state["received"]) >= state["stall_after"]:
+                            state["stall_after"] = None
+                            await writer.drain()
+                            await _swallow(reader, writer)
+                            return
+                        parts = command.split()
+                        if not line[:1].isspace():
+                            if parts[0] == "hostname" and len(parts) == 2:
+                                state["hostname"] = parts[1]
+                            mode = _section_mode(command)
+                        elif command.startswith("address-family "):
+                            mode = "config-router-af"
+                        elif command == "exit-address-family":
+                            mode = "config-router"
+                writer.write(f"\r\n{prompt()}".encode("ascii"))
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def start_servers(states, host="127.0.0.1"):
+    """Ouvre un serveur par port de states {port: état} ; renvoie la liste des serveurs."""
+    servers = []
+    for port, state in states.items():
+        servers.append(await asyncio.start_server(
+            lambda r, w, state=state: _handle(state, r, w), host, port, backlog=16
+        ))
+    return servers
+
+
+def run_in_thread(states, host="127.0.0.1"):
+    """
+    Lance les consoles dans une boucle asyncio dédiée (thread démon), pour que
+    le code testé puisse utiliser asyncio.run. Renvoie une fonction d'arrêt.
+    """
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    holder = {}
+
+    def target():
+        asyncio.set_event_loop(loop)
+        holder["servers"] = loop.run_until_complete(start_servers(states, host))
+        ready.set()
+        loop.run_forever()
+
+    thread = threading.Thread(target=target, name="fake-consoles", daemon=True)
+    thread.start()
+    ready.wait()
+
+    def stop():
+        async def close():
+            for server in holder["servers"]:
+                server.close()
+                await server.wait_closed()
+        asyncio.run_coroutine_threadsafe(close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+
+    return stop
+
+
+def main():
+    from live_push.live_push import console_targets
+
+    parser = argparse.ArgumentParser(description="Consoles IOS factices pour les nœuds d'un projet GNS3.")
+    parser.add_argument("project", help="fichier .gns3")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--latency", type=float, default=0.0, help="délai par commande, en secondes")
+    args = parser.parse_args()
+
+    targets = console_targets(args.project, args.host)
+    states = {port: new_state(latency=args.latency) for _, port in targets.values()}
+
+    async def serve():
+        await start_servers(states, args.host)
+        print(f"{len(states)} consoles factices ({', '.join(f'{n}:{p}' for n, (_, p) in targets.items())})")
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
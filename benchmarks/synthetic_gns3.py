@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Générateur de projets GNS3 synthétiques (.gns3 + project-files/dynamips).
+
+Les AS sont dessinés en grille (rectangles rouges = RIP, verts = OSPF), les
+routeurs sont placés en grille à l'intérieur de leur rectangle. Chaque AS est
+connexe (arbre aléatoire), des liens intra-AS supplémentaires sont ajoutés
+selon la densité demandée, et les AS voisins dans la grille sont reliés par
+quelques liens eBGP.
+
+Les routeurs sont nommés R1..RN. L'adressage "décimal dans l'hexadécimal"
+limite les identifiants à 9999 : au-delà, ils sont nommés AS<asn>_R<n>
+(n local à l'AS, router-id partagés entre AS) pour dépasser 10 000 routeurs.
+
+Usage : python benchmarks/synthetic_gns3.py dossier_sortie --routers 1000 --as-count 10
+"""
+import argparse
+import json
+import math
+import os
+import random
+import uuid
+from pathlib import Path
+
+RECT_COLORS = {"RIP": "#ff0000", "OSPF": "#00ff00"}
+
+# Espacement des routeurs dans un rectangle et marge entre rectangles (pixels)
+ROUTER_SPACING = 100
+RECT_MARGIN = 200
+
+# c7200 : adaptateur 0 = FastEthernet intégré (2 ports), 1..n = modules GigabitEthernet
+FAST_ETHERNET_PORTS = 2
+
+# Plus grand identifiant de routeur adressable (un bloc IPv6 en décimal)
+MAX_ROUTER_ID = 9999
+
+
+def _node(name, x, y, console, rng):
+    return {
+        "compute_id": "local",
+        "console": console,
+        "console_type": "telnet",
+        "name": name,
+        "node_id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+        "node_type": "dynamips",
+        "properties": {"platform": "c7200", "image": "c7200-synthetic.image", "ram": 512},
+        "symbol": ":/symbols/router.svg",
+        "x": x,
+        "y": y,
+        "z": 1,
+    }
+
+
+def _drawing(x, y, width, height, protocol, rng):
+    color = RECT_COLORS[protocol]
+    svg = (f'<svg width="{width}" height="{height}"><rect width="{width}" height="{height}" '
+           f'fill="#ffffff" fill-opacity="1.0" stroke-width="2" stroke="{color}" /></svg>')
+    return {
+        "drawing_id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+        "locked": False,
+        "rotation": 0,
+        "svg": svg,
+        "x": x,
+        "y": y,
+        "z": 0,
+    }
+
+
+def make_project(n_routers=100, n_as=4, rip_ratio=0.5, link_density=1.5, inter_links=2,
+                 adapters=6, ports_per_adapter=1, seed=0):
+    """
+    Construit le dictionnaire d'un projet .gns3 synthétique.
+
+    Args:
+        n_routers (int): Nombre total de routeurs
+        n_as (int): Nombre d'AS (au plus 99, les AS sont numérotés 100, 200... 9900)
+        rip_ratio (float): Proportion d'AS RIP (rectangles rouges), le reste en OSPF
+        link_density (float): Liens intra-AS par routeur (>= 1 : arbre couvrant + extras)
+        inter_links (int): Liens eBGP entre deux AS voisins dans la grille
+        adapters (int): Modules GigabitEthernet par routeur (adaptateurs 1..adapters)
+        ports_per_adapter (int): Ports par module GigabitEthernet
+        seed (int): Graine (même graine -> même projet)
+
+    Returns:
+        dict: Projet au format .gns3
+    """
+    if not 1 <= n_as <= 99:
+        raise ValueError("n_as doit être compris entre 1 et 99 (AS 100 à 9900)")
+    rng = random.Random(seed)
+
+    # Répartition des routeurs et des IGP par AS
+    sizes = [n_routers // n_as + (1 if i < n_routers % n_as else 0) for i in range(n_as)]
+    n_rip = round(n_as * rip_ratio)
+    protocols = ["RIP" if i < n_rip else "OSPF" for i in range(n_as)]
+    rng.shuffle(protocols)
+
+    # Grille d'AS, rectangles tous de la même taille (le plus grand AS)
+    grid_cols = math.ceil(math.sqrt(n_as))
+    side = math.ceil(math.sqrt(max(sizes))) if sizes else 1
+    rect_size = side * ROUTER_SPACING + ROUTER_SPACING
+
+    nodes, drawings = [], []
+    members = []  # par AS : liste des index de nœuds
+    for as_idx, size in enumerate(sizes):
+        row, col = divmod(as_idx, grid_cols)
+        rx = col * (rect_size + RECT_MARGIN)
+        ry = row * (rect_size + RECT_MARGIN)
+        drawings.append(_drawing(rx, ry, rect_size, rect_size, protocols[as_idx], rng))
+        asn = 100 * (as_idx + 1)
+        as_members = []
+        for n in range(size):
+            r_row, r_col = divmod(n, side)
+            x = rx + ROUTER_SPACING // 2 + r_col * ROUTER_SPACING
+            y = ry + ROUTER_SPACING // 2 + r_row * ROUTER_SPACING
+            as_members.append(len(nodes))
+            name = f"R{len(nodes) + 1}" if n_routers <= MAX_ROUTER_ID else f"AS{asn}_R{n + 1}"
+            nodes.append(_node(name, x, y, 5000 + len(nodes) + 1, rng))
+        members.append(as_members)
+
+    # Ports libres par nœud : GigabitEthernet d'abord, puis FastEthernet0/x
+    free_ports = [
+        [(a, p) for a in range(1, adapters + 1) for p in range(ports_per_adapter)]
+        + [(0, p) for p in range(FAST_ETHERNET_PORTS)]
+        for _ in nodes
+    ]
+    for ports in free_ports:
+        ports.reverse()  # pop() renvoie le premier port
+
+    links = []
+    seen_pairs = set()
+
+    def connect(i, j):
+        pair = (min(i, j), max(i, j))
+        if i == j or pair in seen_pairs or not free_ports[i] or not free_ports[j]:
+            return False
+        seen_pairs.add(pair)
+        ends = []
+        for k in (i, j):
+            adapter, port = free_ports[k].pop()
+            ends.append({"adapter_number": adapter, "node_id": nodes[k]["node_id"], "port_number": port})
+        links.append({
+            "filters": {},
+            "link_id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            "link_style": {},
+            "nodes": ends,
+            "suspend": False,
+        })
+        return True
+
+    # Intra-AS : arbre couvrant aléatoire puis liens supplémentaires
+    for as_members in members:
+        for pos in range(1, len(as_members)):
+            # Parent choisi parmi les routeurs précédents qui ont encore un port libre
+            for _ in range(8):
+                if connect(as_members[pos], as_members[rng.randrange(pos)]):
+                    break
+        extra = int(len(as_members) * (link_density - 1))
+        for _ in range(extra):
+            if len(as_members) < 2:
+                break
+            connect(rng.choice(as_members), rng.choice(as_members))
+
+    # Inter-AS : AS voisins dans la grille (droite et bas)
+    for as_idx in range(n_as):
+        row, col = divmod(as_idx, grid_cols)
+        neighbours = []
+        if col + 1 < grid_cols and as_idx + 1 < n_as:
+            neighbours.append(as_idx + 1)
+        if as_idx + grid_cols < n_as:
+            neighbours.append(as_idx + grid_cols)
+        for other in neighbours:
+            for _ in range(inter_links):
+                if members[as_idx] and members[other]:
+                    connect(rng.choice(members[as_idx]), rng.choice(members[other]))
+
+    return {
+        "auto_close": True,
+        "auto_open": False,
+        "auto_start": False,
+        "name": f"synthetic_{n_routers}",
+        "project_id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+        "revision": 9,
+        "scene_height": 1000,
+        "scene_width": 2000,
+        "topology": {"computes": [], "drawings": drawings, "links": links, "nodes": nodes},
+        "type": "topology",
+        "version": "2.2.0",
+    }
+
+
+def write_project(out_dir, project, node_dirs=True):
+    """
+    Écrit <out_dir>/<nom>.gns3 et, avec node_dirs, l'arborescence
+    project-files/dynamips/<node_id>/configs/i<k>_startup-config.cfg attendue par injection_cfg.
+
+    Returns:
+        Path: Chemin du fichier .gns3
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    gns3_file = out_dir / f"{project['name']}.gns3"
+    with open(gns3_file, "w", encoding="utf-8") as f:
+        json.dump(project, f)
+
+    if node_dirs:
+        dynamips_dir = out_dir / "project-files" / "dynamips"
+        for k, node in enumerate(project["topology"]["nodes"], start=1):
+            configs_dir = dynamips_dir / node["node_id"] / "configs"
+            os.makedirs(configs_dir, exist_ok=True)
+            (configs_dir / f"i{k}_startup-config.cfg").write_text("!\nend\n")
+    return gns3_file
+
+
+def generate_project(out_dir, node_dirs=True, **params):
+    """make_project(**params) puis write_project ; renvoie le chemin du .gns3."""
+    return write_project(out_dir, make_project(**params), node_dirs=node_dirs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Génère un projet GNS3 synthétique.")
+    parser.add_argument("output_dir", help="dossier du projet généré")
+    parser.add_argument("--routers", type=int, default=100, help="nombre de routeurs (défaut : 100)")
+    parser.add_argument("--as-count", type=int, default=4, help="nombre d'AS, 1 à 99 (défaut : 4)")
+    parser.add_argument("--rip-ratio", type=float, default=0.5, help="proportion d'AS RIP (défaut : 0.5)")
+    parser.add_argument("--link-density", type=float, default=1.5, help="liens intra-AS par routeur (défaut : 1.5)")
+    parser.add_argument("--inter-links", type=int, default=2, help="liens eBGP entre AS voisins (défaut : 2)")
+    parser.add_argument("--adapters", type=int, default=6, help="modules GigabitEthernet par routeur (défaut : 6)")
+    parser.add_argument("--ports-per-adapter", type=int, default=1, help="ports par module (défaut : 1)")
+    parser.add_argument("--seed", type=int, default=0, help="graine aléatoire (défaut : 0)")
+    parser.add_argument("--no-node-dirs", action="store_true", help="ne pas créer project-files/dynamips")
+    args = parser.parse_args()
+
+    gns3_file = generate_project(
+        args.output_dir, node_dirs=not args.no_node_dirs,
+        n_routers=args.routers, n_as=args.as_count, rip_ratio=args.rip_ratio,
+        link_density=args.link_density, inter_links=args.inter_links,
+        adapters=args.adapters, ports_per_adapter=args.ports_per_adapter, seed=args.seed
+    )
+    print(f"Projet généré : {gns3_file}")
+
+
+if __name__ == "__main__":
+    main()
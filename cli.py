@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Ligne de commande (sans interface graphique) :
+
+    python -m gns3auto build projet.gns3 --ip-base 2000:1::/64 --loopback with_as \\
+        --policies relations.json --workers 8
+    python -m gns3auto watch projet.gns3 --policies relations.json
+    python -m gns3auto diff ancien/topology.json build/projet/topology.json -o deltas
+    python -m gns3auto push projet.gns3 --deltas deltas --concurrency 64
+
+Accepte un ou plusieurs fichiers .gns3, dossiers (recherche récursive) ou
+motifs glob. Plusieurs projets sont traités en parallèle (--jobs), chacun
+dans son propre dossier de sortie : <output-dir>/<projet>/{configs,topology.json,build.log}.
+watch reconstruit un projet à chaque sauvegarde (voir watch.py) ; diff calcule
+les commandes à appliquer aux routeurs entre deux topologies (voir config_delta.py) ;
+push les envoie aux routeurs démarrés par leur console telnet (voir live_push.py).
+"""
+
+import argparse
+import contextlib
+import glob
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+from pipeline import run_automation
+from instrumentation import PROFILE_MODES
+from serialization import FORMATS as TOPOLOGY_FORMATS
+from watch import watch_project, DEBOUNCE_S, POLL_INTERVAL_S
+from gen_config_bgp.config_delta import topology_deltas, write_deltas, print_summary
+from injection_cfgs.injection_cfgs import DEFAULT_IO_THREADS
+from live_push.live_push import push_configs, DEFAULT_HOST, DEFAULT_CONCURRENCY, DEFAULT_TIMEOUT_S, DEFAULT_RETRIES
+
+
+def find_projects(inputs):
+    """Résout les arguments (fichiers, dossiers, globs) en une liste triée de fichiers .gns3."""
+    projects = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            projects.extend(p for p in path.rglob("*.gns3") if "project-files" not in p.parts)
+        elif path.is_file():
+            projects.append(path)
+        else:
+            projects.extend(Path(p) for p in glob.glob(item, recursive=True) if p.endswith(".gns3"))
+
+    unique = []
+    seen = set()
+    for p in projects:
+        resolved = p.resolve()
+        if resolved not in seen:
+            seen.add(resolved)
+            unique.append(resolved)
+    return sorted(unique)
+
+
+def assign_output_dirs(projects, output_root):
+    """Un dossier de sortie par projet (nom du projet, suffixé en cas de doublon)."""
+    output_dirs = {}
+    used = set()
+    for project in projects:
+        name = project.stem
+        n = 2
+        while name in used:
+            name = f"{project.stem}_{n}"
+            n += 1
+        used.add(name)
+        output_dirs[project] = Path(output_root).resolve() / name
+    return output_dirs
+
+
+def load_json_option(path):
+    if not path:
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def build_options(args):
+    """Options avancées, au même format que celles construites par la GUI."""
+    relations = load_json_option(args.policies)
+    return {
+        "secure_redist": not args.no_secure_redist,
+        "ibgp_mode": args.ibgp_mode,
+        "rr_count": args.rr_count,
+        "rr_clusters": args.rr_clusters,
+        "rr_cluster_size": args.rr_cluster_size,
+        "policies_enabled": bool(relations),
+        "bgp_relations": relations,
+        "ospf_costs": load_json_option(args.ospf_costs),
+    }
+
+
+def build_project(gns3_file, output_dir, ip_base, loopback_format, options, workers, inject, log_to_file, profile=None,
+                  topology_format="pretty", inject_threads=1, write_topology=True):
+    """
+    Traite un projet. Avec log_to_file, la sortie est écrite dans <output_dir>/build.log
+    (indispensable quand plusieurs projets tournent en parallèle).
+
+    Returns:
+        tuple: (gns3_file, succès, message)
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    with contextlib.ExitStack() as stack:
+        if log_to_file:
+            log = stack.enter_context(open(output_dir / "build.log", "w", encoding="utf-8"))
+            stack.enter_context(contextlib.redirect_stdout(log))
+            stack.enter_context(contextlib.redirect_stderr(log))
+        try:
+            success, message = run_automation(
+                gns3_file, ip_base, loopback_format, options,
+                workers=workers, output_dir=output_dir, inject=inject, profile=profile,
+                topology_format=topology_format, inject_threads=inject_threads, write_topology=write_topology
+            )
+        except (Exception, SystemExit) as e:  # get_topology peut appeler exit()
+            print(f"[ERREUR] {type(e).__name__}: {e}")
+            success, message = False, f"Échec : {type(e).__name__}: {e}"
+    return str(gns3_file), success, message
+
+
+def cmd_build(args):
+    projects = find_projects(args.projects)
+    if not projects:
+        print("[ERREUR] Aucun fichier .gns3 trouvé.")
+        return 1
+
+    options = build_options(args)
+    output_dirs = assign_output_dirs(projects, args.output_dir)
+    log_to_file = len(projects) > 1
+    print(f"{len(projects)} projet(s) à traiter, {args.jobs} en parallèle.")
+
+    build_args = [
+        (str(p), str(output_dirs[p]), args.ip_base, args.loopback, options, args.workers, not args.no_inject, log_to_file, args.profile, args.topology_format,
+         args.inject_threads, not args.no_topology_file)
+        for p in projects
+    ]
+    if args.jobs > 1 and len(projects) > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+            results = list(executor.map(build_project, *zip(*build_args)))
+    else:
+        results = [build_project(*a) for a in build_args]
+
+    failures = 0
+    for gns3_file, success, message in results:
+        status = "OK" if success else "ECHEC"
+        failures += 0 if success else 1
+        print(f"[{status}] {gns3_file} -> {output_dirs[Path(gns3_file)]} : {message}")
+    print(f"[DONE] {len(results) - failures}/{len(results)} projet(s) réussi(s).")
+    return 1 if failures else 0
+
+
+def cmd_watch(args):
+    projects = find_projects([args.project])
+    if len(projects) != 1:
+        print(f"[ERREUR] Un seul projet .gns3 attendu, {len(projects)} trouvé(s).")
+        return 1
+
+    project = projects[0]
+    output_dir = assign_output_dirs(projects, args.output_dir)[project]
+    watch_project(
+        project, args.ip_base, args.loopback, build_options(args), output_dir=output_dir,
+        workers=args.workers, inject=not args.no_inject, topology_format=args.topology_format,
+        debounce=args.debounce, poll_interval=args.poll_interval, use_inotify=not args.poll,
+        inject_threads=args.inject_threads, write_topology=not args.no_topology_file
+    )
+    return 0
+
+
+def cmd_diff(args):
+    options = build_options(args)
+    old_options = options
+    if args.old_policies:
+        relations = load_json_option(args.old_policies)
+        old_options = dict(options, policies_enabled=bool(relations), bgp_relations=relations)
+
+    deltas = topology_deltas(args.old, args.new, old_options, options)
+    write_deltas(deltas, args.output_dir)
+    print(f"\nDeltas IOS ({Path(args.output_dir) / '<routeur>.delta.cfg'}) :")
+    print_summary(deltas)
+    return 0
+
+
+def cmd_push(args):
+    projects = find_projects([args.project])
+    if len(projects) != 1:
+        print(f"[ERREUR] Un seul projet .gns3 attendu, {len(projects)} trouvé(s).")
+        return 1
+
+    project = projects[0]
+    if args.deltas:
+        configs_dir = Path(args.deltas)
+    elif args.configs:
+        configs_dir = Path(args.configs)
+    else:
+        configs_dir = assign_output_dirs(projects, "build")[project] / "configs"
+    if not configs_dir.is_dir():
+        print(f"[ERREUR] Dossier introuvable : {configs_dir}")
+        return 1
+
+    summary = push_configs(
+        project, configs_dir, routers=args.routers, deltas=bool(args.deltas), host=args.host,
+        concurrency=args.concurrency, timeout=args.timeout, retries=args.retries
+    )
+    return 1 if summary["errors"] or summary["partial"] else 0
+
+
+def add_generation_arguments(parser):
+    """Options de génération des configurations (politiques, coûts, iBGP)."""
+    parser.add_argument("--policies", metavar="RELATIONS.json", help='relations BGP {"100-200": "customer", ...} (active Gao-Rexford)')
+    parser.add_argument("--ospf-costs", metavar="COSTS.json", help='coûts OSPF {"R1": {"GigabitEthernet1/0": 20}, ...}')
+    parser.add_argument("--no-secure-redist", action="store_true", help="désactiver la redistribution sécurisée (route-maps)")
+    parser.add_argument("--ibgp-mode", choices=["full_mesh", "route_reflector"], default="full_mesh", help="topologie iBGP (défaut : full_mesh)")
+    parser.add_argument("--rr-count", type=int, default=1, help="nombre de route reflectors élus par AS (défaut : 1)")
+    parser.add_argument("--rr-clusters", action="store_true",
+                        help="répartir les route reflectors en plusieurs clusters (voir --rr-cluster-size)")
+    parser.add_argument("--rr-cluster-size", type=int, default=2, metavar="N",
+                        help="route reflectors par cluster, chaque client les a tous pour voisins (défaut : 2)")
+
+
+def add_pipeline_arguments(parser):
+    """Options communes à build et watch (adressage, génération, injection)."""
+    parser.add_argument("--ip-base", default="2000:1::/64", help="préfixe des adresses physiques (défaut : 2000:1::/64)")
+    parser.add_argument("--loopback", choices=["with_as", "simple"], default="with_as", help="format des loopbacks (défaut : with_as)")
+    add_generation_arguments(parser)
+    parser.add_argument("-o", "--output-dir", default="build", help="dossier racine des sorties par projet (défaut : build)")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="processus de rendu par projet (défaut : 1)")
+    parser.add_argument("--no-inject", action="store_true", help="générer les configurations sans les injecter dans GNS3")
+    parser.add_argument("--inject-threads", type=int, default=1, metavar="N",
+                        help=f"threads d'E/S de l'injection, utile sur un projet monté en NFS/SMB "
+                             f"(défaut : 1, séquentiel ; p. ex. {DEFAULT_IO_THREADS})")
+    parser.add_argument("--topology-format", choices=TOPOLOGY_FORMATS, default="pretty",
+                        help="format de topology.json : pretty (défaut), compact, ou msgpack (topology.msgpack)")
+    parser.add_argument("--no-topology-file", action="store_true",
+                        help="ne pas écrire topology.json (la topologie reste en mémoire)")
+
+
+def make_parser():
+    parser = argparse.ArgumentParser(prog="gns3auto", description="Automatisation des configurations GNS3 (RIP/OSPF/BGP).")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="extraire, générer et injecter les configurations d'un ou plusieurs projets")
+    build.add_argument("projects", nargs="+", help="fichiers .gns3, dossiers ou motifs glob")
+    add_pipeline_arguments(build)
+    build.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="projets traités en parallèle (défaut : nb de CPU)")
+    build.add_argument("--profile", choices=PROFILE_MODES,
+                       help="profilage : cprofile (pipeline.pstats) ou chrome (pipeline_trace.json, chrome://tracing)")
+    build.set_defaults(func=cmd_build)
+
+    watch = sub.add_parser("watch", help="reconstruire un projet à chaque sauvegarde du .gns3")
+    watch.add_argument("project", help="fichier .gns3 ou dossier contenant un seul projet")
+    add_pipeline_arguments(watch)
+    watch.add_argument("--debounce", type=float, default=DEBOUNCE_S,
+                       help=f"attente après la dernière sauvegarde d'une rafale, en secondes (défaut : {DEBOUNCE_S})")
+    watch.add_argument("--poll", action="store_true", help="scruter le fichier même si inotify est disponible")
+    watch.add_argument("--poll-interval", type=float, default=POLL_INTERVAL_S,
+                       help=f"intervalle de scrutation, en secondes (défaut : {POLL_INTERVAL_S})")
+    watch.set_defaults(func=cmd_watch)
+
+    diff = sub.add_parser("diff", help="commandes IOS minimales entre deux snapshots topology.json")
+    diff.add_argument("old", help="topology.json (ou .msgpack) de référence")
+    diff.add_argument("new", help="nouveau topology.json (ou .msgpack)")
+    add_generation_arguments(diff)
+    diff.add_argument("--old-policies", metavar="RELATIONS.json",
+                      help="relations BGP de l'ancien snapshot (défaut : celles de --policies)")
+    diff.add_argument("-o", "--output-dir", default="deltas",
+                      help="dossier des <routeur>.delta.cfg et de deltas.json (défaut : deltas)")
+    diff.set_defaults(func=cmd_diff)
+
+    push = sub.add_parser("push", help="envoyer configurations ou deltas aux routeurs démarrés (console telnet)")
+    push.add_argument("project", help="fichier .gns3 ou dossier contenant un seul projet (ports console)")
+    source = push.add_mutually_exclusive_group()
+    source.add_argument("--configs", metavar="DIR", help="dossier des <routeur>.cfg (défaut : build/<projet>/configs)")
+    source.add_argument("--deltas", metavar="DIR", help="dossier des <routeur>.delta.cfg produits par diff")
+    push.add_argument("--routers", nargs="+", metavar="NOM", help="routeurs à configurer (défaut : tous)")
+    push.add_argument("--host", default=DEFAULT_HOST, help=f"hôte du serveur GNS3 (défaut : {DEFAULT_HOST})")
+    push.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                      help=f"consoles ouvertes simultanément (défaut : {DEFAULT_CONCURRENCY})")
+    push.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT_S,
+                      help=f"attente maximale d'un prompt, en secondes (défaut : {DEFAULT_TIMEOUT_S})")
+    push.add_argument("--retries", type=int, default=DEFAULT_RETRIES,
+                      help=f"nouvelles tentatives par routeur injoignable (défaut : {DEFAULT_RETRIES})")
+    push.set_defaults(func=cmd_push)
+    return parser
+
+
+def main(argv=None):
+    args = make_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
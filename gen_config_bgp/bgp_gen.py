@@ -0,0 +1,677 @@
+#!/usr/bin/env python3
+"""
+IPv6 BGP Config Generator - unified engine for every IGP (RIP, OSPF).
+
+Routers are classified once, the eBGP and iBGP neighbor tables are built in a
+single pass over the whole topology, and each router is then rendered with the
+template of its IGP backend.
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+# Add root directory to sys.path to allow importing utils
+sys.path.append(str(Path(__file__).parent.parent))
+from utils import get_router_id, get_loopback_ip, load_topology, find_identity_collisions
+from topology_model import BgpNeighbor, slots_dict
+
+ROOT_DIR = Path(__file__).parent.parent
+
+# Per-router render hashes, stored next to the generated configs
+MANIFEST_NAME = ".manifest.json"
+_HASH_EXCLUDED_OPTIONS = ("ospf_costs", "bgp_relations", "route_reflectors", "rr_cluster_size")
+
+# Below this many configs, starting a process pool costs more than it saves
+PARALLEL_MIN_JOBS = 500
+# Upper bound on the jobs sent to a worker at once, so progress and cancel
+# are noticed at least every MAX_CHUNK_SIZE configs
+MAX_CHUNK_SIZE = 64
+
+# Compiled templates are cached on disk so they survive across processes/runs
+# (override the location with the GNS3AUTO_TEMPLATE_CACHE environment variable)
+TEMPLATE_CACHE_DIR = Path(os.environ.get("GNS3AUTO_TEMPLATE_CACHE", ROOT_DIR / ".jinja_cache"))
+
+
+def _apply_ospf_costs(name, iface, options):
+    # Apply OSPF Costs if defined in options
+    cost_map = options.get("ospf_costs", {}).get(name, {})
+    if iface.name in cost_map:
+        iface.ospf_cost = cost_map[iface.name]
+
+
+# IGP backends: one entry per protocol found in topology.json
+#  - template: Jinja2 template used to render the router config
+#  - enabled_flag: interface flag telling the template to run the IGP on it
+#    (disabled on eBGP links)
+#  - prepare_interface: optional hook called on each interface before linking
+IGP_BACKENDS = {
+    "RIP": {
+        "template": ROOT_DIR / "gen_config_bgp_rip" / "router_bgp_rip.j2",
+        "enabled_flag": "rip_enabled",
+        "prepare_interface": None,
+    },
+    "OSPF": {
+        "template": ROOT_DIR / "gen_config_bgp_ospf" / "router_bgp_ospf.j2",
+        "enabled_flag": "ospf_enabled",
+        "prepare_interface": _apply_ospf_costs,
+    },
+}
+
+
+_template_envs = {}
+
+
+def get_template_env(auto_reload=False):
+    """
+    Returns the shared Jinja2 Environment used to render router configs.
+    Templates are loaded through a FileSystemLoader over the backend template
+    directories and compiled once per process; the bytecode is also cached in
+    TEMPLATE_CACHE_DIR. auto_reload=False (batch mode) skips the per-render
+    check of the template file modification time.
+    """
+    env = _template_envs.get(auto_reload)
+    if env is None:
+        search_path = []
+        for backend in IGP_BACKENDS.values():
+            template_dir = str(Path(backend["template"]).parent)
+            if template_dir not in search_path:
+                search_path.append(template_dir)
+
+        bytecode_cache = None
+        try:
+            TEMPLATE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(str(TEMPLATE_CACHE_DIR))
+        except OSError as e:
+            print(f"Warning: template bytecode cache disabled ({e})")
+
+        env = Environment(
+            loader=FileSystemLoader(search_path),
+            auto_reload=auto_reload,
+            bytecode_cache=bytecode_cache,
+        )
+        _template_envs[auto_reload] = env
+    return env
+
+
+def resolve_relationship(local_as, remote_as, relations):
+    """
+    Returns the relationship of the remote AS seen from the local AS
+    ('customer', 'provider' or 'peer').
+    Relations are stored as "A-B": rel, meaning "AS A is REL of AS B".
+    """
+    rel_type = "peer"  # Default
+
+    # Check direct key "local-remote"
+    key1 = f"{local_as}-{remote_as}"
+    if key1 in relations:
+        # If config says "100-200": "customer" -> 100 IS CUSTOMER OF 200
+        # So for us (100), the remote (200) is our PROVIDER
+        val = relations[key1]
+        if val == "customer": rel_type = "provider"
+        elif val == "provider": rel_type = "customer"
+        else: rel_type = "peer"
+
+    # Check reverse key "remote-local"
+    key2 = f"{remote_as}-{local_as}"
+    if key2 in relations:
+        # If config says "200-100": "customer" -> 200 IS CUSTOMER OF 100
+        # So for us (100), the remote (200) is our CUSTOMER
+        rel_type = relations[key2]  # Direct mapping in this direction
+
+    return rel_type
+
+
+def build_interface_index(routers):
+    """
+    Precomputes {router_name: {iface_name: iface}} once, so that every
+    link-processing pass finds an interface in O(1) instead of scanning
+    router.interfaces for each link endpoint.
+    The index references the same Interface objects (flags set through it are
+    visible to the templates). The first interface wins on duplicate names.
+    """
+    index = {}
+    for name, r in routers.items():
+        by_name = {}
+        for iface in r.interfaces:
+            by_name.setdefault(iface.name, iface)
+        index[name] = by_name
+    return index
+
+
+def prepare_routers(topo, backends, options):
+    """
+    Builds the routers dict and enriches each router with its deduced fields
+    (router_id, loopback_ip, default ASN, empty neighbor table, IGP flags).
+    """
+    routers = {r.name: r for r in topo.routers}
+    loopback_fmt = topo.loopback_format
+
+    for name, r in routers.items():
+        r.router_id = get_router_id(name)
+        r.loopback_ip = get_loopback_ip(name, fmt=loopback_fmt, as_number=r.as_number)
+        # Default ASN if missing (fallback for safety)
+        if r.as_number is None:
+            r.as_number = 65000
+        r.bgp_neighbors = []
+
+        # Classify the router once: its backend (None if its IGP is not generated)
+        backend = backends.get(r.protocol)
+        if backend is None:
+            continue
+        # IGP enabled on all interfaces by default (will be disabled for eBGP links)
+        flag = backend["enabled_flag"]
+        for iface in r.interfaces:
+            setattr(iface, flag, True)
+            if backend["prepare_interface"]:
+                backend["prepare_interface"](name, iface, options)
+
+    return routers
+
+
+def add_ebgp_neighbors(routers, links, backends, iface_index):
+    """
+    Process Links for eBGP (Direct Physical Peering) and IGP disabling.
+    """
+    for a_name, a_iface, b_name, b_iface in links.rows():
+        if a_name not in routers or b_name not in routers:
+            continue
+
+        rA = routers[a_name]
+        rB = routers[b_name]
+
+        asA = rA.as_number
+        asB = rB.as_number
+
+        # Get interfaces (and their IPs) for the link
+        ifaceA = iface_index[a_name].get(a_iface)
+        ifaceB = iface_index[b_name].get(b_iface)
+        ipA = ifaceA.ip if ifaceA else None
+        ipB = ifaceB.ip if ifaceB else None
+
+        if not ipA or not ipB:
+            print(f"Warning: Could not find IP for link {a_name}<->{b_name}")
+            continue
+
+        # eBGP Logic: Different AS -> Peer physically
+        if asA == asB:
+            continue
+
+        for local, local_iface, remote_name, remote_ip, remote_as in (
+            (rA, ifaceA, b_name, ipB, asB),
+            (rB, ifaceB, a_name, ipA, asA),
+        ):
+            # We only care about configuring the side handled by a backend
+            backend = backends.get(local.protocol)
+            if backend is None:
+                continue
+            local.bgp_neighbors.append(BgpNeighbor(remote_name, remote_ip, remote_as, is_ibgp=False))
+            # Disable the IGP on this interface (eBGP link)
+            setattr(local_iface, backend["enabled_flag"], False)
+
+
+def _add_ibgp_session(rA, rB, client=False):
+    """
+    iBGP Peering A <-> B on loopbacks.
+    client=True: A is a route reflector and B one of its clients.
+    """
+    # iBGP Peering A -> B
+    rA.bgp_neighbors.append(BgpNeighbor(rB.name, rB.loopback_ip, rB.as_number, is_ibgp=True, rr_client=client))
+    # iBGP Peering B -> A
+    rB.bgp_neighbors.append(BgpNeighbor(rA.name, rA.loopback_ip, rA.as_number, is_ibgp=True))
+
+
+def _intra_as_adjacency(routers, links):
+    """{router_name: set of directly linked routers of the same AS}"""
+    adjacency = {name: set() for name in routers}
+    for a, _, b, _ in links.rows():
+        if a in routers and b in routers and routers[a].as_number == routers[b].as_number:
+            adjacency[a].add(b)
+            adjacency[b].add(a)
+    return adjacency
+
+
+def elect_route_reflectors(asn, members, adjacency, options):
+    """
+    Returns the route reflectors of an AS.
+    Uses options["route_reflectors"][str(asn)] when configured (a list of
+    names, or a list of clusters, see rr_clusters_of), otherwise elects the
+    options["rr_count"] (default 1) routers with the highest intra-AS degree
+    (ties broken by topology order).
+    """
+    configured = _flatten_clusters(options.get("route_reflectors", {}).get(str(asn)))
+    if configured:
+        rrs = [n for n in configured if n in members]
+        unknown = [n for n in configured if n not in members]
+        if unknown:
+            print(f"Warning: route reflectors {', '.join(unknown)} are not in AS{asn}, ignored")
+        if rrs:
+            return rrs
+
+    count = max(1, min(int(options.get("rr_count", 1)), len(members)))
+    ranked = sorted(members, key=lambda n: -len(adjacency[n]))
+    return ranked[:count]
+
+
+def _flatten_clusters(configured):
+    if not configured:
+        return configured
+    return [name for item in configured for name in (item if isinstance(item, list) else [item])]
+
+
+def rr_clusters_of(asn, rrs, options):
+    """
+    Splits the route reflectors of an AS into clusters: lists of RRs sharing
+    one bgp cluster-id, each client peering with every RR of its cluster.
+    Uses options["route_reflectors"][str(asn)] when it is a list of lists,
+    otherwise groups the RRs in election order by options["rr_cluster_size"]
+    (default 2); a trailing single RR joins the previous cluster so that no
+    cluster is left with a single point of failure.
+    """
+    configured = options.get("route_reflectors", {}).get(str(asn))
+    if configured and all(isinstance(item, list) for item in configured):
+        clusters = [[n for n in cluster if n in rrs] for cluster in configured]
+        clusters = [cluster for cluster in clusters if cluster]
+        if clusters:
+            return clusters
+
+    size = max(1, int(options.get("rr_cluster_size", 2)))
+    clusters = [rrs[i:i + size] for i in range(0, len(rrs), size)]
+    if size > 1 and len(clusters) > 1 and len(clusters[-1]) == 1:
+        last = clusters.pop()
+        clusters[-1].extend(last)
+    return clusters
+
+
+def add_ibgp_neighbors(routers, links, igp_router_names, options):
+    """
+    Builds the iBGP sessions, iterating per-AS buckets.
+      - options["ibgp_mode"] == "full_mesh" (default): every pair of the AS peers.
+      - options["ibgp_mode"] == "route_reflector": route reflectors are fully
+        meshed together and each other router is a client.
+        With options["rr_clusters"], the RRs are grouped into clusters (see
+        rr_clusters_of, cluster-id = router-id of the first RR of the cluster)
+        and clients are split between the clusters, preferring one with a
+        directly linked RR; a client peers with every RR of its cluster.
+        Otherwise every client peers with every RR and all RRs share a
+        single cluster.
+    """
+    # Per-AS buckets (topology order is kept inside a bucket)
+    as_buckets = {}
+    for name in igp_router_names:
+        as_buckets.setdefault(routers[name].as_number, []).append(name)
+
+    rr_mode = options.get("ibgp_mode", "full_mesh") == "route_reflector"
+    adjacency = _intra_as_adjacency(routers, links) if rr_mode else None
+
+    for asn, members in as_buckets.items():
+        # Full mesh (also used for tiny ASes where RRs bring nothing)
+        if not rr_mode or len(members) < 3:
+            for i in range(len(members)):
+                for j in range(i + 1, len(members)):
+                    _add_ibgp_session(routers[members[i]], routers[members[j]])
+            continue
+
+        rrs = elect_route_reflectors(asn, members, adjacency, options)
+        clients = [n for n in members if n not in rrs]
+
+        # Route reflectors are fully meshed together (non-client sessions)
+        for i in range(len(rrs)):
+            for j in range(i + 1, len(rrs)):
+                _add_ibgp_session(routers[rrs[i]], routers[rrs[j]])
+
+        clusters = rr_clusters_of(asn, rrs, options) if options.get("rr_clusters") and len(rrs) > 1 else None
+        if clusters is not None and len(clusters) > 1:
+            # Several clusters: each client is served by all the RRs of one cluster
+            load = [0] * len(clusters)
+            for client in clients:
+                linked = [i for i, cluster in enumerate(clusters) if any(rr in adjacency[client] for rr in cluster)]
+                index = min(linked or range(len(clusters)), key=lambda i: load[i])
+                load[index] += 1
+                for rr in clusters[index]:
+                    _add_ibgp_session(routers[rr], routers[client], client=True)
+            for cluster in clusters:
+                for rr in cluster:
+                    routers[rr].rr_cluster_id = routers[cluster[0]].router_id
+            described = "; ".join(f"{'/'.join(cluster)}: {n} clients" for cluster, n in zip(clusters, load))
+            print(f"  AS{asn}: {len(clusters)} route reflector clusters ({described})")
+        else:
+            # Single cluster, every client peers with every route reflector
+            for client in clients:
+                for rr in rrs:
+                    _add_ibgp_session(routers[rr], routers[client], client=True)
+            if len(rrs) > 1:
+                for rr in rrs:
+                    routers[rr].rr_cluster_id = routers[rrs[0]].router_id
+            print(f"  AS{asn}: route reflectors {', '.join(rrs)} ({len(clients)} clients)")
+
+
+def build_render_jobs(topology, options, backends):
+    """
+    Builds the neighbor tables of the whole topology and the render job of
+    every router handled by one of the backends.
+    topology: Topology, topology.json dict or path (see load_topology; never modified).
+    Returns (routers, jobs, collisions): {name: Router}, a list of
+    (name, template_name, context) and the duplicated router IDs / loopbacks
+    (see utils.find_identity_collisions).
+    """
+    topo = load_topology(topology)
+
+    # Duplicate router IDs / loopbacks break BGP sessions: warn before generating
+    collisions = find_identity_collisions(topo.routers, loopback_format=topo.loopback_format)
+    for router_id, names in collisions["router_id"].items():
+        print(f"Warning: router-id {router_id} shared by {', '.join(names)}")
+    for loopback, names in collisions["loopback"].items():
+        print(f"Warning: loopback {loopback} shared by {', '.join(names)}")
+
+    # Prepare data structures
+    routers = prepare_routers(topo, backends, options)
+    links = topo.links
+    iface_index = build_interface_index(routers)
+
+    # 1. Process Links for eBGP (Direct Physical Peering) and IGP disabling
+    add_ebgp_neighbors(routers, links, backends, iface_index)
+
+    # 2. Process iBGP (Loopback Peering) within same AS: full mesh or route reflectors
+    igp_router_names = [n for n, r in routers.items() if r.protocol in backends]
+    add_ibgp_neighbors(routers, links, igp_router_names, options)
+
+    relations = options.get("bgp_relations", {})
+
+    jobs = []
+    for name in igp_router_names:
+        r = routers[name]
+
+        # Enrich neighbors with relationship data
+        # Default relationship is 'peer'
+        neighbors_list = []
+        # Unique-ification logic first
+        seen_ips = set()
+        for n in r.bgp_neighbors:
+            if n.ip in seen_ips:
+                continue
+            seen_ips.add(n.ip)
+
+            rel_type = "peer"
+            if not n.is_ibgp:
+                rel_type = resolve_relationship(str(r.as_number), str(n.asn), relations)
+
+            n.relationship = rel_type
+            neighbors_list.append(n)
+
+        # Determine if router is a Border Router (has eBGP neighbors)
+        is_border = any(not n.is_ibgp for n in neighbors_list)
+
+        context = dict(
+            router_name=name,
+            router_id=r.router_id,
+            loopback_ip=r.loopback_ip,
+            asn=r.as_number,
+            interfaces=r.interfaces,
+            neighbors=neighbors_list,
+            networks=r.networks,
+            is_border=is_border,
+            cluster_id=r.rr_cluster_id,
+            options=options
+        )
+        template_name = Path(backends[r.protocol]["template"]).name
+        jobs.append((name, template_name, context))
+
+    return routers, jobs, collisions
+
+
+def generate_bgp_configs(topology, output_dir="configs", options=None, protocols=None, workers=1, incremental=False,
+                         progress=None, cancel=None):
+    """
+    topology: dict returned by get_topology (in-memory pipeline) or path to a topology.json file.
+    protocols: IGP backends to generate (default: all of IGP_BACKENDS).
+    workers: number of processes used to render and write the configs.
+    incremental: only re-render routers whose render inputs changed since the
+        last run (hashes kept in <output_dir>/.manifest.json). A non-incremental
+        run deletes the manifest, since the configs it rewrites no longer match it.
+    progress: optional callable progress(done, total), called as configs are written.
+    cancel: optional threading.Event; when set, rendering stops and the manifest
+        is left untouched (interrupted routers are re-rendered on the next run).
+    Returns a summary {"added", "changed", "unchanged", "removed"} of router names,
+    plus "cancelled", "neighbors" ({"ibgp", "ebgp"} session counts, all routers),
+    "bytes_written" (size of the configs rendered by this run; IOS configs are ASCII)
+    and "identity_collisions" ({"router_id": {id: [names]}, "loopback": {ip: [names]}},
+    duplicated values only).
+    """
+    if options is None:
+        options = {}
+    if protocols is None:
+        protocols = list(IGP_BACKENDS)
+    backends = {p: IGP_BACKENDS[p] for p in protocols}
+
+    routers, jobs, collisions = build_render_jobs(topology, options, backends)
+
+    # Generate Configs
+    out_path = Path(output_dir)
+    os.makedirs(out_path, exist_ok=True)
+
+    print(f"Generating BGP+{'/'.join(backends)} configs in {out_path}...")
+
+    summary = {"added": [], "changed": [], "unchanged": [], "removed": [], "cancelled": False,
+               "neighbors": {"ibgp": 0, "ebgp": 0}, "bytes_written": 0, "identity_collisions": collisions}
+    for _, _, context in jobs:
+        for n in context["neighbors"]:
+            summary["neighbors"]["ibgp" if n.is_ibgp else "ebgp"] += 1
+    if incremental:
+        manifest = load_manifest(out_path)
+    else:
+        manifest = {}
+        (out_path / MANIFEST_NAME).unlink(missing_ok=True)
+    new_manifest = {}
+
+    # Incremental mode: only render routers whose render inputs changed
+    template_hashes = {}
+    to_render = []
+    for job in jobs:
+        name, template_name, context = job
+        protocol = routers[name].protocol
+        if template_name not in template_hashes:
+            template_hashes[template_name] = _file_hash(backends[protocol]["template"])
+        digest = render_hash(template_hashes[template_name], context)
+        new_manifest[name] = {"protocol": protocol, "hash": digest}
+
+        previous = manifest.get(name)
+        if previous is None:
+            summary["added"].append(name)
+        elif previous["hash"] == digest and _config_matches(out_path / f"{name}.cfg", previous.get("file_hash")):
+            new_manifest[name]["file_hash"] = previous["file_hash"]
+            summary["unchanged"].append(name)
+            continue
+        else:
+            summary["changed"].append(name)
+        to_render.append(job)
+
+    auto_reload = options.get("template_auto_reload", False)
+    results = render_configs(to_render, out_path, workers=workers, auto_reload=auto_reload,
+                             progress=progress, cancel=cancel)
+
+    # Logs are printed in topology order, whatever the number of workers
+    for (name, _, context), (size, file_hash) in zip(to_render, results):
+        new_manifest[name]["file_hash"] = file_hash
+        neighbors_list = context["neighbors"]
+        print(f"  Saved {name}.cfg [{routers[name].protocol}] ({'iBGP' if any(n.is_ibgp for n in neighbors_list) else ''}{' eBGP' if context['is_border'] else ''})")
+    summary["bytes_written"] = sum(size for size, _ in results)
+
+    if len(results) < len(to_render):
+        print(f"  Cancelled: {len(results)}/{len(to_render)} configs written, manifest not updated")
+        summary["cancelled"] = True
+        return summary
+
+    if incremental:
+        # Routers that disappeared (or changed to an IGP we still generate but are
+        # no longer rendered): drop their config. Entries of other backends are kept.
+        for name, entry in manifest.items():
+            if name in new_manifest:
+                continue
+            if name in routers and entry.get("protocol") not in backends:
+                new_manifest[name] = entry
+                continue
+            cfg = out_path / f"{name}.cfg"
+            if cfg.exists():
+                cfg.unlink()
+            summary["removed"].append(name)
+
+        save_manifest(out_path, new_manifest)
+        print(f"  {len(summary['added'])} added, {len(summary['changed'])} changed, "
+              f"{len(summary['unchanged'])} unchanged, {len(summary['removed'])} removed")
+        for key in ("added", "changed", "removed"):
+            if summary[key]:
+                print(f"    {key}: {', '.join(summary[key])}")
+
+    return summary
+
+
+def _file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _config_matches(cfg_path, file_hash):
+    """True if cfg_path still holds the bytes written by the run recorded in the manifest."""
+    if file_hash is None:
+        return False
+    try:
+        return _file_hash(cfg_path) == file_hash
+    except OSError:
+        return False
+
+
+def render_hash(template_hash, context):
+    """
+    Content hash of everything a router config depends on: the template and
+    the render context (interfaces, neighbors, networks, options...).
+    Options already folded into the per-router context (costs, relations,
+    route reflectors) are left out so that editing one router's entry does
+    not invalidate every other router.
+    """
+    options = {k: v for k, v in context["options"].items() if k not in _HASH_EXCLUDED_OPTIONS}
+    payload = json.dumps(
+        {"template": template_hash, "context": dict(context, options=options)},
+        sort_keys=True, default=slots_dict
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def load_manifest(out_path):
+    """Returns {router_name: {"protocol", "hash", "file_hash"}} from the manifest of out_path ({} if none)."""
+    manifest_file = Path(out_path) / MANIFEST_NAME
+    if not manifest_file.exists():
+        return {}
+    try:
+        with open(manifest_file, "r") as f:
+            return json.load(f).get("routers", {})
+    except (OSError, ValueError) as e:
+        print(f"Warning: ignoring unreadable manifest {manifest_file} ({e})")
+        return {}
+
+
+def save_manifest(out_path, routers_manifest):
+    """Writes the manifest atomically (temp file + rename)."""
+    manifest_file = Path(out_path) / MANIFEST_NAME
+    tmp_file = manifest_file.with_name(manifest_file.name + ".tmp")
+    with open(tmp_file, "w") as f:
+        json.dump({"version": 1, "routers": routers_manifest}, f, indent=2, sort_keys=True)
+    os.replace(tmp_file, manifest_file)
+
+
+def _render_chunk(jobs, out_path, auto_reload, progress=None, cancel=None):
+    """
+    Renders and writes a chunk of router configs.
+    Runs in the parent process (workers=1) or in a pool worker, where the
+    Jinja2 Environment is built once per process (bytecode cache shared on disk).
+    progress/cancel are only used in the parent process (they cannot be pickled).
+    Returns (bytes written, sha256 of those bytes) for each router.
+    """
+    env = get_template_env(auto_reload=auto_reload)
+    sizes = []
+    for name, template_name, context in jobs:
+        if cancel is not None and cancel.is_set():
+            break
+        data = env.get_template(template_name).render(**context).encode("utf-8")
+        with open(Path(out_path) / f"{name}.cfg", "wb") as f:
+            f.write(data)
+        sizes.append((len(data), hashlib.sha256(data).hexdigest()))
+        if progress is not None:
+            progress(len(sizes), len(jobs))
+    return sizes
+
+
+def usable_cpus():
+    """CPUs this process may run on (affinity mask when the platform exposes it)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def effective_workers(workers, n_jobs):
+    """
+    Number of render processes actually used for n_jobs configs: capped by the
+    usable CPUs, and 1 (in-process) below PARALLEL_MIN_JOBS, so asking for
+    workers never makes a run slower than the default.
+    """
+    if n_jobs < PARALLEL_MIN_JOBS:
+        return 1
+    return max(1, min(workers, usable_cpus()))
+
+
+def render_configs(jobs, out_path, workers=1, auto_reload=False, progress=None, cancel=None):
+    """
+    Renders the (name, template_name, context) jobs into out_path/<name>.cfg.
+    workers > 1 spreads the jobs in chunks across a ProcessPoolExecutor (see
+    effective_workers for when it falls back to in-process rendering).
+    Results are returned in the order of the jobs; if cancel is set, only the
+    results of the jobs written before the cancellation are returned.
+    """
+    used = effective_workers(workers, len(jobs))
+    if used < workers and jobs:
+        print(f"  Rendering in {used} process(es) instead of {workers} "
+              f"({len(jobs)} configs, {usable_cpus()} usable CPU(s))")
+    workers = used
+    if workers <= 1:
+        return _render_chunk(jobs, out_path, auto_reload, progress, cancel)
+
+    # A few chunks per worker: balances the load while keeping pickling overhead low
+    chunk_size = max(1, min(MAX_CHUNK_SIZE, math.ceil(len(jobs) / (workers * 4))))
+    chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_render_chunk, chunk, str(out_path), auto_reload) for chunk in chunks]
+        for future in futures:
+            if cancel is not None and cancel.is_set():
+                for pending in futures:
+                    pending.cancel()
+                break
+            results.extend(future.result())
+            if progress is not None:
+                progress(len(results), len(jobs))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate BGP+IGP router configs from a topology.json file.")
+    parser.add_argument("topology", nargs="?", default=str(Path(__file__).parent / "topology.json"),
+                        help="topology.json file (default: next to this script)")
+    parser.add_argument("-o", "--output-dir", default="configs", help="output directory (default: configs)")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="number of processes used to render the configs (default: 1)")
+    parser.add_argument("-i", "--incremental", action="store_true",
+                        help="only re-render routers whose inputs changed since the last run")
+    args = parser.parse_args()
+
+    topo_file = Path(args.topology)
+    if not topo_file.exists():
+        print("Error: topology.json not found in requested directory.")
+        sys.exit(1)
+
+    generate_bgp_configs(topo_file, output_dir=args.output_dir, workers=args.workers, incremental=args.incremental)
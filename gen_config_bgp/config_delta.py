@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Topology diff engine and minimal IOS config deltas.
+
+Two topology.json snapshots (with their generation options) are expanded into
+the render contexts of bgp_gen, so the diff covers everything a config depends
+on: routers, interfaces, BGP neighbors (including the relationship coming from
+bgp_relations), networks and route reflector clusters.
+
+For each changed router, the old and new configs are rendered and compared
+section by section (interface, router bgp and its address-family, route-map
+entries...). The result is the list of commands that turns the running config
+of the old snapshot into the new one, e.g.:
+
+    router bgp 100
+     no neighbor 2000:1:0:100:200:1:7::1
+    interface GigabitEthernet3/0
+     no ipv6 address 2000:1:100:1:2::1/80
+     ipv6 address 2000:1:100:1:3::1/80
+
+Added routers get their full config; removed routers get none.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add root directory to sys.path to allow importing utils
+sys.path.append(str(Path(__file__).parent.parent))
+from gen_config_bgp.bgp_gen import (
+    IGP_BACKENDS, build_render_jobs, get_template_env, render_hash, _HASH_EXCLUDED_OPTIONS
+)
+from serialization import dump_file
+
+# Lines of a rendered config that are not configuration commands
+_IGNORED_LINES = ("end", "write memory")
+# Top-level sections removed by resetting them instead of "no <header>"
+_PHYSICAL_INTERFACE_PREFIXES = ("interface FastEthernet", "interface GigabitEthernet")
+
+
+def snapshot(topology, options=None, protocols=None):
+    """
+    Expands a topology into {router_name: (template_name, context)} (see build_render_jobs).
+    topology: Topology, topology.json dict or path.
+    """
+    if options is None:
+        options = {}
+    if protocols is None:
+        protocols = list(IGP_BACKENDS)
+    backends = {p: IGP_BACKENDS[p] for p in protocols}
+    _, jobs, _ = build_render_jobs(topology, options, backends)
+    return {name: (template_name, context) for name, template_name, context in jobs}
+
+
+def _keyed(items, key):
+    return {getattr(item, key): item for item in items}
+
+
+def _diff_keyed(old, new):
+    """added / removed / changed keys of two {key: object} dicts (new order, then old order)."""
+    return {
+        "added": [k for k in new if k not in old],
+        "removed": [k for k in old if k not in new],
+        "changed": [k for k in new if k in old and old[k] != new[k]],
+    }
+
+
+def diff_router(old_context, new_context):
+    """
+    Structured diff of the render contexts of one router.
+    Returns {"fields": [...], "interfaces": {...}, "neighbors": {...}, "networks": {...}}
+    with only the non-empty parts; interfaces are keyed by name, neighbors by IP.
+    """
+    changes = {}
+    fields = [
+        key for key in ("asn", "router_id", "loopback_ip", "cluster_id", "is_border")
+        if old_context[key] != new_context[key]
+    ]
+    # Options already folded into the context (relations, costs...) show up as neighbor/interface changes
+    old_options, new_options = (
+        {k: v for k, v in context["options"].items() if k not in _HASH_EXCLUDED_OPTIONS}
+        for context in (old_context, new_context)
+    )
+    if old_options != new_options:
+        fields.append("options")
+    if fields:
+        changes["fields"] = fields
+
+    interfaces = _diff_keyed(_keyed(old_context["interfaces"], "name"), _keyed(new_context["interfaces"], "name"))
+    neighbors = _diff_keyed(_keyed(old_context["neighbors"], "ip"), _keyed(new_context["neighbors"], "ip"))
+    old_networks, new_networks = set(old_context["networks"]), set(new_context["networks"])
+    networks = {
+        "added": [n for n in new_context["networks"] if n not in old_networks],
+        "removed": [n for n in old_context["networks"] if n not in new_networks],
+    }
+    for key, delta in (("interfaces", interfaces), ("neighbors", neighbors), ("networks", networks)):
+        if any(delta.values()):
+            changes[key] = {k: v for k, v in delta.items() if v}
+    return changes
+
+
+def diff_snapshots(old, new):
+    """
+    Compares two snapshots router by router.
+    Routers whose template or context changed are listed in "changed" with their
+    structured diff (an empty diff means only the template changed).
+    Returns {"added": [...], "removed": [...], "changed": {name: diff}, "unchanged": [...]}.
+    """
+    result = {"added": [], "removed": [], "changed": {}, "unchanged": []}
+    for name, (template_name, context) in new.items():
+        if name not in old:
+            result["added"].append(name)
+            continue
+        old_template, old_context = old[name]
+        # render_hash ignores the template file content: same template name, same hash input
+        if old_template == template_name and render_hash(template_name, old_context) == render_hash(template_name, context):
+            result["unchanged"].append(name)
+        else:
+            result["changed"][name] = diff_router(old_context, context)
+    result["removed"] = [name for name in old if name not in new]
+    return result
+
+
+def parse_config(text):
+    """
+    Splits a rendered IOS config into sections:
+    [(header, [child lines], {address-family header: [lines]})], in order.
+    Comments, blank lines and the final "end" / "write memory" are dropped.
+    Indentation only separates a section's commands from the next top-level
+    command: inside "router bgp", every line up to "exit-address-family" belongs
+    to the open address-family.
+    """
+    sections = []
+    index = {}
+    current = None
+    family = None
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line or line.startswith("!") or line in _IGNORED_LINES:
+            continue
+        if not raw[0].isspace():
+            current = index.get(line)
+            if current is None:
+                current = index[line] = (line, [], {})
+                sections.append(current)
+            family = None
+        elif current is None:
+            continue
+        elif line.startswith("address-family "):
+            family = current[2].setdefault(line, [])
+        elif line == "exit-address-family":
+            family = None
+        elif family is not None:
+            family.append(line)
+        else:
+            current[1].append(line)
+    return sections
+
+
+def _removed_neighbors(old_lines, new_lines):
+    """IPs whose "neighbor <ip> remote-as" line disappears (the whole neighbor is removed)."""
+    removed = set()
+    for line in set(old_lines) - set(new_lines):
+        parts = line.split()
+        if len(parts) == 4 and parts[0] == "neighbor" and parts[2] == "remote-as":
+            removed.add(parts[1])
+    return removed
+
+
+def _is_neighbor_line(line, ips):
+    parts = line.split()
+    return len(parts) > 1 and parts[0] == "neighbor" and parts[1] in ips
+
+
+def _negate(line):
+    """'no X' for X, and X for 'no X' (e.g. removing "no bgp default ipv4-unicast")."""
+    return line[3:] if line.startswith("no ") else f"no {line}"
+
+
+def _lines_delta(old_lines, new_lines, indent, dropped_neighbors=()):
+    """Negation of removed lines, then added lines, in config order."""
+    new_set, old_set = set(new_lines), set(old_lines)
+    commands = [
+        f"{indent}{_negate(line)}" for line in old_lines
+        if line not in new_set and not _is_neighbor_line(line, dropped_neighbors)
+    ]
+    # A re-created neighbor (e.g. new remote-as) gets all its lines back
+    commands += [
+        f"{indent}{line}" for line in new_lines
+        if line not in old_set or _is_neighbor_line(line, dropped_neighbors)
+    ]
+    return commands
+
+
+def _section_removal(header):
+    if header.startswith(_PHYSICAL_INTERFACE_PREFIXES):
+        # A physical interface cannot be deleted: reset it and shut it down
+        return [f"default {header}", header, " shutdown"]
+    return [_negate(header)]
+
+
+def _section_lines(header, lines, families):
+    commands = [header] + [f" {line}" for line in lines]
+    for family, family_lines in families.items():
+        commands += [f" {family}"] + [f"  {line}" for line in family_lines] + [" exit-address-family"]
+    return commands
+
+
+def config_delta(old_config, new_config):
+    """
+    IOS commands turning old_config into new_config (both rendered configs),
+    to be entered in "configure terminal". Removed top-level sections come first
+    (e.g. "no router bgp <old asn>" before the new BGP process), then the
+    changed and added sections in the order of new_config.
+    A removed BGP neighbor is deleted with a single "no neighbor <ip>".
+    """
+    old_sections = {header: (lines, families) for header, lines, families in parse_config(old_config)}
+    new_sections = parse_config(new_config)
+    new_headers = {header for header, _, _ in new_sections}
+
+    commands = []
+    for header in old_sections:
+        if header not in new_headers:
+            commands += _section_removal(header)
+
+    for header, lines, families in new_sections:
+        if header not in old_sections:
+            commands += _section_lines(header, lines, families)
+            continue
+        old_lines, old_families = old_sections[header]
+        dropped = _removed_neighbors(old_lines, lines)
+        body = [f" no neighbor {ip}" for ip in sorted(dropped)]
+        body += _lines_delta(old_lines, lines, " ", dropped)
+        for family in old_families:
+            if family not in families:
+                body.append(f" {_negate(family)}")
+        for family, family_lines in families.items():
+            family_delta = _lines_delta(old_families.get(family, []), family_lines, "  ", dropped)
+            if family_delta or family not in old_families:
+                body += [f" {family}"] + family_delta + [" exit-address-family"]
+        if body:
+            commands += [header] + body
+    return commands
+
+
+def parse_config_commands(config):
+    """Every command of a rendered config, without comments or the final end / write memory."""
+    commands = []
+    for header, lines, families in parse_config(config):
+        commands += _section_lines(header, lines, families)
+    return commands
+
+
+def render(template_name, context, auto_reload=False):
+    return get_template_env(auto_reload=auto_reload).get_template(template_name).render(**context)
+
+
+def topology_deltas(old_topology, new_topology, old_options=None, new_options=None, protocols=None):
+    """
+    Per-router deltas between two topology snapshots.
+
+    Args:
+        old_topology / new_topology: Topology, topology.json dict or path
+        old_options / new_options: generation options of each snapshot
+            (new_options defaults to old_options, e.g. only the topology changed)
+
+    Returns:
+        dict: {"diff": diff_snapshots result,
+               "routers": {name: {"action": "add" | "update" | "remove", "commands": [...]}}}
+        (unchanged routers are left out)
+    """
+    if new_options is None:
+        new_options = old_options
+    old = snapshot(old_topology, old_options, protocols)
+    new = snapshot(new_topology, new_options, protocols)
+    diff = diff_snapshots(old, new)
+
+    routers = {}
+    for name in diff["added"]:
+        config = render(*new[name])
+        routers[name] = {"action": "add", "commands": parse_config_commands(config)}
+    for name in diff["changed"]:
+        commands = config_delta(render(*old[name]), render(*new[name]))
+        if commands:
+            routers[name] = {"action": "update", "commands": commands}
+    for name in diff["removed"]:
+        routers[name] = {"action": "remove", "commands": []}
+    return {"diff": diff, "routers": routers}
+
+
+def format_delta(commands):
+    """Text of a delta file: the commands wrapped in configure terminal / end / write memory."""
+    return "\n".join(["configure terminal", *commands, "end", "write memory"]) + "\n"
+
+
+def write_deltas(deltas, output_dir):
+    """
+    Writes <output_dir>/<router>.delta.cfg for each added or updated router and
+    <output_dir>/deltas.json (structured diff and commands of every router).
+    Delta files left by a previous run are removed.
+    """
+    out_path = Path(output_dir)
+    out_path.mkdir(parents=True, exist_ok=True)
+    for stale in out_path.glob("*.delta.cfg"):
+        stale.unlink()
+    for name, delta in deltas["routers"].items():
+        if delta["commands"]:
+            with open(out_path / f"{name}.delta.cfg", "w") as f:
+                f.write(format_delta(delta["commands"]))
+    dump_file(deltas, out_path / "deltas.json")
+
+
+def print_summary(deltas):
+    diff = deltas["diff"]
+    print(f"  {len(diff['added'])} added, {len(diff['changed'])} changed, "
+          f"{len(diff['unchanged'])} unchanged, {len(diff['removed'])} removed")
+    for name, delta in deltas["routers"].items():
+        details = diff["changed"].get(name, {})
+        parts = [f"{key} ({', '.join(f'{len(v)} {k}' for k, v in value.items())})"
+                 for key, value in details.items() if key != "fields"]
+        if details.get("fields"):
+            parts.insert(0, ", ".join(details["fields"]))
+        suffix = f": {'; '.join(parts)}" if parts else ""
+        print(f"    {name} [{delta['action']}] {len(delta['commands'])} commands{suffix}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="IOS config deltas between two topology.json snapshots.")
+    parser.add_argument("old", help="previous topology.json")
+    parser.add_argument("new", help="new topology.json")
+    parser.add_argument("-o", "--output-dir", default="deltas", help="output directory (default: deltas)")
+    args = parser.parse_args()
+
+    deltas = topology_deltas(args.old, args.new)
+    write_deltas(deltas, args.output_dir)
+    print_summary(deltas)
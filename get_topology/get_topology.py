@@ -1,14 +1,18 @@
-import json
-import ipaddress
 from pathlib import Path
 from collections import defaultdict
 from utils import get_router_number
 import re
 import sys
 import os
+import threading
 
 # Add parent directory to path to allow importing utils
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from get_topology.spatial_index import build_rectangle_index, find_containing_rectangles
+from gns3_project import load_project
+from get_topology.ip_allocator import allocate_links
+from topology_model import Interface, Router, LinkTable, Topology, topology_to_dict
+from serialization import dump_file
 
 
 # --- MAPPING COULEUR -> PROTOCOLE/AS ---
@@ -95,8 +99,11 @@ def assign_routers_to_as(nodes_data, rectangles):
     """
     Associe chaque routeur à un AS et un protocole selon les zones dessinées dans GNS3.
     Les rectangles colorés (Rouge=RIP, Vert=OSPF) définissent le protocole IGP et l'AS.
+    Les rectangles sont indexés une seule fois (grille uniforme) pour éviter
+    un test de chaque routeur contre chaque rectangle.
     """
     router_to_as = {}
+    rect_index = build_rectangle_index(rectangles)
     
     for node in nodes_data:
         # On ne traite que les routeurs (type "dynamips")
@@ -107,7 +114,7 @@ def assign_routers_to_as(nodes_data, rectangles):
         x, y = node["x"], node["y"]
         
         # Trouver les rectangles contenant ce routeur
-        containing_rects = [r for r in rectangles if is_point_in_rectangle(x, y, r)]
+        containing_rects = find_containing_rectangles(rect_index, x, y)
         
         # Valeurs par défaut
         protocol = "UNKNOWN"
@@ -133,36 +140,72 @@ def assign_routers_to_as(nodes_data, rectangles):
     return router_to_as
 
 
-# --- FONCTION PRINCIPALE ---
-def get_topology(gns3_file, ip_base="2000:1::/64", output_dir=None, output_name="topology.json", loopback_format="simple"):
+def save_topology(topology_data, topology_file, background=False, fmt="pretty"):
     """
-    Extrait la topologie d'un fichier .gns3 et génère un fichier topology.json
-    
+    Sauvegarde la topologie au format JSON (ou MessagePack).
+
+    Args:
+        topology_data (Topology | dict): Topologie retournée par get_topology
+        topology_file (str): Chemin du fichier à écrire
+        background (bool): Si True, l'écriture se fait dans un thread séparé
+        fmt (str): "pretty" (défaut), "compact" ou "msgpack" (voir serialization)
+
+    Returns:
+        threading.Thread | None: Le thread d'écriture (à joindre) si background=True
+    """
+    def _write():
+        data = topology_to_dict(topology_data) if isinstance(topology_data, Topology) else topology_data
+        dump_file(data, topology_file, fmt)
+        print(f"Topologie exportée : {topology_file}")
+
+    if not background:
+        _write()
+        return None
+
+    writer = threading.Thread(target=_write, name="topology-json-writer")
+    writer.start()
+    return writer
+
+
+# --- STRUCTURE (indépendante du préfixe IP) ---
+# Cache de la structure par fichier, invalidé par (mtime_ns, taille) :
+# changer ip_base ou le format de loopback ne relance que l'adressage.
+_STRUCTURE_CACHE = {}
+
+
+def extract_structure(gns3_file, use_cache=True):
+    """
+    Extrait la structure AS/liens d'un fichier .gns3 : lecture, rectangles,
+    appartenance des routeurs aux AS, liens et détection eBGP.
+    Ne dépend ni de ip_base ni du format de loopback.
+
     Args:
         gns3_file (str): Chemin vers le fichier .gns3
-        ip_base (str): Base pour l'adressage IPv6 (défaut: "2000:1::/64")
-        output_dir (str): Répertoire de sortie (défaut: répertoire du script)
-        output_name (str): Nom du fichier de sortie (défaut: "topology.json")
-    
+        use_cache (bool): Réutiliser le résultat si le fichier n'a pas changé
+
     Returns:
-        dict: Les données de topologie extraites
+        dict: {"routers": [{"name", "protocol", "as_number", "ebgp"}], "links": [...]}
+        (partagé via le cache : ne pas modifier)
     """
-    
-    # Configuration des chemins
-    if output_dir is None:
-        output_dir = Path(__file__).parent.absolute()
-    else:
-        output_dir = Path(output_dir)
-    
     gns3_path = Path(gns3_file)
-    
+
     print(f"Chemin GNS3 utilisé : {gns3_path}")
     print(f"Fichier existe ? {gns3_path.exists()}")
 
+    cache_key = None
+    if use_cache and gns3_path.exists():
+        st = gns3_path.stat()
+        cache_key = (str(gns3_path.resolve()), st.st_mtime_ns, st.st_size)
+        cached = _STRUCTURE_CACHE.get(cache_key[0])
+        if cached is not None and cached[0] == cache_key:
+            structure = cached[1]
+            print(f"Structure inchangée (cache) : {len(structure['routers'])} routeurs, {len(structure['links'])} liens.")
+            return structure
+
     # --- 1. CHARGEMENT DE LA TOPOLOGIE DEPUIS GNS3 ---
+    # Lecture en flux des seules sections utiles (partagée avec injection_cfg)
     try:
-        with open(gns3_path, "r") as f:
-            gns3_data = json.load(f)
+        gns3_data = load_project(gns3_path)
     except FileNotFoundError:
         print(f"Erreur : Le fichier '{gns3_path}' est introuvable.")
         exit(1)
@@ -239,137 +282,125 @@ def get_topology(gns3_file, ip_base="2000:1::/64", output_dir=None, output_name=
             router_to_as[a] = a_info
             router_to_as[b] = b_info
 
+    routers = []
+    for router_name in routers_list:
+        as_info = router_to_as.get(router_name, {"protocol": "UNKNOWN", "as_number": None, "ebgp": False})
+        routers.append({
+            "name": router_name,
+            "protocol": as_info.get("protocol"),
+            "as_number": as_info.get("as_number"),
+            "ebgp": as_info.get("ebgp", False)
+        })
+
+    structure = {"routers": routers, "links": links}
+    if cache_key is not None:
+        _STRUCTURE_CACHE[cache_key[0]] = (cache_key, structure)
+    return structure
+
+
+def clear_structure_cache():
+    """Vide le cache des structures (ex : après modification manuelle d'un projet)."""
+    _STRUCTURE_CACHE.clear()
+
+
+# --- ADRESSAGE (dépend du préfixe IP) ---
+def assign_addresses(structure, ip_base="2000:1::/64", loopback_format="simple"):
+    """
+    Calcule l'adressage IPv6 des liens à partir d'une structure (extract_structure).
+    La structure n'est pas modifiée.
+
+    Returns:
+        Topology: Les données de topologie (modèle topology_model, voir
+        topology_to_dict pour le schéma topology.json)
+    """
     # --- 3. LOGIQUE D'ADRESSAGE MNÉMOTECHNIQUE AVEC AS ---
-    # format: 2000:1:<AS>:<ID1>:<ID2>::<ID_LOCAL>
-    
-    base_net_obj = ipaddress.ip_network(ip_base, strict=False)
-    base_parts = str(base_net_obj.network_address).split('::')[0]
+    # Intra-AS : 2000:1:<AS>:<ID1>:<ID2>::<ID_LOCAL>/80
+    # Inter-AS : 2000:1:0:<AS1>:<AS2>:<ID1>:<ID2>:<ID_LOCAL>/112
+    # (calcul entier sur 128 bits, voir ip_allocator)
+    links = structure["links"]
+    router_to_as = {r["name"]: r for r in structure["routers"]}
     
     interfaces_cfg = defaultdict(list)
     networks = defaultdict(set)
 
     # 3a. IDs
     node_to_id = {}
-    for name in routers_list:
+    for name in router_to_as:
         node_to_id[name] = get_router_number(name)
 
-    # 3b. Links
-    for link in links:
+    # 3b. Links (allocation de tous les liens en une passe)
+    allocations, collisions, overflows = allocate_links(links, node_to_id, router_to_as, ip_base)
+    for ip, users in collisions:
+        owners = ", ".join(f"{r} {iface}" for r, iface in users)
+        print(f"[ATTENTION] Collision d'adresse {ip} : {owners}")
+    for link, reason, fallback in overflows:
+        ends = f"{link['a']} {link['a_iface']} - {link['b']} {link['b_iface']}"
+        outcome = f"repli sur {fallback}" if fallback else "lien non adressé"
+        print(f"[ATTENTION] Lien hors plan d'adressage {ends} : {reason} ({outcome})")
+
+    for link, allocation in zip(links, allocations):
+        if allocation is None:
+            continue
+        ip_a_str, ip_b_str, prefix_len, subnet_cidr = allocation
         a, a_iface_name = link["a"], link["a_iface"]
         b, b_iface_name = link["b"], link["b_iface"]
 
-        id_a_int = node_to_id[a]
-        id_b_int = node_to_id[b]
-        
-        info_a = router_to_as.get(a)
-        info_b = router_to_as.get(b)
-        
-        as_a = int(info_a['as_number']) if info_a and info_a.get('as_number') else 0
-        as_b = int(info_b['as_number']) if info_b and info_b.get('as_number') else 0
-
-        if as_a == as_b and as_a != 0:
-            # Cas 1 : Intra-AS (Même AS et AS != 0)
-            # Format attendu : 2000:1:AS:ID1:ID2::X/80
-            # 2000:1::/64 -> base_parts = "2000:1"
-            # base_parts (2 blocs) + AS (1 bloc) + ID1 (1 bloc) + ID2 (1 bloc) = 5 blocs
-            # Reste 3 blocs pour l'hôte.
-            low_id, high_id = sorted((id_a_int, id_b_int))
-            # Construction propre sans double "::"
-            subnet_prefix_str = f"{base_parts}:{as_a}:{low_id}:{high_id}::"
-            subnet_prefix_no_colons = f"{base_parts}:{as_a}:{low_id}:{high_id}:0:0:0"
-            subnet_cidr = f"{subnet_prefix_str}/80"
-            
-            # On utilise ipaddress pour faire l'addition propre
-            net = ipaddress.IPv6Network(f"{base_parts}:{as_a}:{low_id}:{high_id}::/80", strict=False)
-            ip_a_str = str(net.network_address + id_a_int)
-            ip_b_str = str(net.network_address + id_b_int)
-            prefix_len = 80
-
-        else:
-            # Cas 2 : Inter-AS
-            # Format attendu : 2000:1:0:AS1:AS2:ID1:ID2:X/112
-            # base_parts (2 blocs) + 0 (1 bloc) + AS1 (1 bloc) + AS2 (1 bloc) + ID1 (1 bloc) + ID2 (1 bloc) = 7 blocs 
-            # Il ne reste que 1 bloc pour l'hôte. (Total 8 blocs)
-            # DANGER: Si base_parts a déjà "::", il faut faire attention.
-            # Supposons base_parts = "2000:1".
-            
-            low_as, high_as = sorted((as_a, as_b))
-            low_id, high_id = sorted((id_a_int, id_b_int))
-            
-            # On construit explicitement les 7 premiers blocs
-            # 2000:1:0:AS1:AS2:ID1:ID2:0
-            subnet_str = f"{base_parts}:0:{low_as}:{high_as}:{low_id}:{high_id}:0"
-            
-            try:
-                # On valide que c'est une IP correcte
-                base_ip_int = int(ipaddress.IPv6Address(subnet_str))
-                ip_a_str = str(ipaddress.IPv6Address(base_ip_int + id_a_int))
-                ip_b_str = str(ipaddress.IPv6Address(base_ip_int + id_b_int))
-                
-                # Pour le CIDR d'affichage qui finit par :: (optionnel mais propre)
-                subnet_cidr = f"{base_parts}:0:{low_as}:{high_as}:{low_id}:{high_id}::/112"
-            except Exception as e:
-                print(f"Erreur génération IP Inter-AS: {e}")
-                # Fallback simple
-                ip_a_str = f"2001:FFFF:{low_as}:{high_as}::{id_a_int}"
-                ip_b_str = f"2001:FFFF:{low_as}:{high_as}::{id_b_int}"
-                subnet_cidr = f"2001:FFFF:{low_as}:{high_as}::/64"
-            
-            prefix_len = 112
-
         # Configuration pour le routeur A
-        interfaces_cfg[a].append({
-            "name": a_iface_name,
-            "ip": ip_a_str,
-            "prefix": prefix_len
-        })
+        interfaces_cfg[a].append(Interface(sys.intern(a_iface_name), ip_a_str, prefix_len))
         networks[a].add(subnet_cidr)
 
         # Configuration pour le routeur B
-        interfaces_cfg[b].append({
-            "name": b_iface_name,
-            "ip": ip_b_str,
-            "prefix": prefix_len
-        })
+        interfaces_cfg[b].append(Interface(sys.intern(b_iface_name), ip_b_str, prefix_len))
         networks[b].add(subnet_cidr)
 
-    # --- 3b. EXPORT TOPOLOGY.JSON ---
-    topology_data = {
-        "ip_base": ip_base,
-        "loopback_format": loopback_format,
-        "routers": [],
-        "links": []
-    }
+    # --- 3b. MODELE DE TOPOLOGIE (exporté par save_topology) ---
+    topology_data = Topology(ip_base=ip_base, loopback_format=loopback_format, links=LinkTable(links))
 
     # Ajouter les routeurs avec leur protocole et AS assignés
-    for router_name in routers_list:
-        as_info = router_to_as.get(router_name, {"protocol": "UNKNOWN", "as_number": None, "ebgp": False})
-        router_entry = {
-            "name": router_name,
-            "protocol": as_info.get("protocol"),
-            "as_number": as_info.get("as_number"),
-            "ebgp": as_info.get("ebgp", False),
-            "interfaces": interfaces_cfg.get(router_name, []),
-            "networks": sorted(networks.get(router_name, []))
-        }
-        topology_data["routers"].append(router_entry)
+    for router in structure["routers"]:
+        router_name = router["name"]
+        topology_data.routers.append(Router(
+            name=sys.intern(router_name),
+            protocol=router["protocol"],
+            as_number=router["as_number"],
+            ebgp=router["ebgp"],
+            interfaces=interfaces_cfg.get(router_name, []),
+            networks=sorted(networks.get(router_name, []))
+        ))
 
-    # Ajouter les liens
-    for link in links:
-        topology_data["links"].append({
-            "a": link["a"],
-            "a_iface": link["a_iface"],
-            "b": link["b"],
-            "b_iface": link["b_iface"]
-        })
+    return topology_data
 
-    # Sauvegarder topology.json
-    topology_file = output_dir / output_name
-    with open(topology_file, "w", encoding="utf-8") as f:
-        json.dump(topology_data, f, indent=2, ensure_ascii=False)
-    print(f"Topologie exportée : {topology_file}")
 
-    print(f"\nTerminé ! La topologie a été extraite depuis {gns3_path}")
-    return topology_data
+# --- FONCTION PRINCIPALE ---
+def get_topology(gns3_file, ip_base="2000:1::/64", output_dir=None, output_name="topology.json", loopback_format="simple", write_file=True):
+    """
+    Extrait la topologie d'un fichier .gns3 et génère un fichier topology.json
+    (extract_structure, en cache, puis assign_addresses)
+    
+    Args:
+        gns3_file (str): Chemin vers le fichier .gns3
+        ip_base (str): Base pour l'adressage IPv6 (défaut: "2000:1::/64")
+        output_dir (str): Répertoire de sortie (défaut: répertoire du script)
+        output_name (str): Nom du fichier de sortie (défaut: "topology.json")
+        write_file (bool): Si False, la topologie n'est pas écrite sur disque
+            (voir save_topology pour une écriture différée)
+    
+    Returns:
+        Topology: Les données de topologie extraites
+    """
+    
+    # Configuration des chemins
+    if output_dir is None:
+        output_dir = Path(__file__).parent.absolute()
+    else:
+        output_dir = Path(output_dir)
 
+    structure = extract_structure(gns3_file)
+    topology_data = assign_addresses(structure, ip_base, loopback_format)
 
+    # Sauvegarder topology.json
+    if write_file:
+        save_topology(topology_data, output_dir / output_name)
+
+    print(f"\nTerminé ! La topologie a été extraite depuis {Path(gns3_file)}")
+    return topology_data
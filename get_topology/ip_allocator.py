@@ -0,0 +1,206 @@
+"""
+Allocation des adresses IPv6 des liens, en arithmétique entière sur 128 bits.
+
+Plan d'adressage mnémotechnique (les valeurs décimales sont écrites telles
+quelles dans les blocs hexadécimaux, ex: AS 100 -> bloc "100") :
+  - Intra-AS : <base>:<AS>:<ID1>:<ID2>::<ID_local>/80
+  - Inter-AS : <base>:0:<AS1>:<AS2>:<ID1>:<ID2>:<ID_local>/112
+
+La base est analysée une seule fois ; les adresses ne sont converties en
+texte qu'au moment de la sortie (format_ipv6).
+"""
+import ipaddress
+
+INTRA_AS_PREFIX = 80
+INTER_AS_PREFIX = 112
+_MASK_80 = ((1 << INTRA_AS_PREFIX) - 1) << (128 - INTRA_AS_PREFIX)
+
+
+def parse_base(ip_base):
+    """
+    Analyse le préfixe de base (ex: "2000:1::/64").
+
+    Returns:
+        dict: {"parts": "2000:1", "hextets": [0x2000, 0x1]}
+              "hextets" vaut None si la base ne peut pas servir de préfixe de blocs.
+    """
+    base_net_obj = ipaddress.ip_network(ip_base, strict=False)
+    base_parts = str(base_net_obj.network_address).split('::')[0]
+    try:
+        hextets = [_parse_hextet(h) for h in base_parts.split(':')]
+    except ValueError:
+        hextets = None
+    return {"parts": base_parts, "hextets": hextets}
+
+
+def _parse_hextet(text):
+    if not 1 <= len(text) <= 4:
+        raise ValueError(f"bloc IPv6 invalide : '{text}'")
+    return int(text, 16)
+
+
+_decimal_hextets = {}
+
+
+def decimal_hextet(value):
+    """
+    Valeur du bloc IPv6 qui s'écrit comme le nombre décimal `value`
+    (ex: 100 -> 0x100). Lève ValueError si le nombre ne tient pas dans
+    un bloc (plus de 4 chiffres, soit > 9999).
+    """
+    h = _decimal_hextets.get(value)
+    if h is None:
+        h = _decimal_hextets[value] = _parse_hextet(str(value))
+    return h
+
+
+def _pack(hextets):
+    """Place les blocs en tête d'une adresse 128 bits (le reste à zéro)."""
+    value = 0
+    for h in hextets:
+        value = (value << 16) | h
+    return value << (16 * (8 - len(hextets)))
+
+
+# Séquences de blocs nuls, de la plus longue à la plus courte (au moins 2 blocs)
+_ZERO_RUNS = [":" + "0:" * n for n in range(8, 1, -1)]
+_HEXTETS_FMT = ":%x:%x:%x:%x:%x:%x:%x:%x:"
+
+
+def format_ipv6(value):
+    """Forme textuelle compressée (RFC 5952, identique à ipaddress) d'une adresse entière."""
+    text = _HEXTETS_FMT % (
+        value >> 112, (value >> 96) & 0xFFFF, (value >> 80) & 0xFFFF, (value >> 64) & 0xFFFF,
+        (value >> 48) & 0xFFFF, (value >> 32) & 0xFFFF, (value >> 16) & 0xFFFF, value & 0xFFFF,
+    )
+
+    # La plus longue suite de blocs nuls (la première en cas d'égalité) devient "::"
+    for run in _ZERO_RUNS:
+        i = text.find(run)
+        if i >= 0:
+            text = text[:i] + "::" + text[i + len(run):]
+            break
+
+    if not text.startswith("::"):
+        text = text[1:]
+    if not text.endswith("::"):
+        text = text[:-1]
+    return text
+
+
+def allocate_link(base, as_a, as_b, id_a, id_b):
+    """
+    Calcule l'adressage d'un lien.
+
+    Args:
+        base (dict): Résultat de parse_base
+        as_a, as_b (int): AS des deux routeurs (0 si inconnu)
+        id_a, id_b (int): Numéros des deux routeurs
+
+    Returns:
+        tuple: (ip_a_int, ip_b_int, prefix_len, subnet_cidr)
+
+    Raises:
+        ValueError: si la base, un AS ou un ID ne tient pas dans le plan
+            d'adressage (voir fallback_link pour le repli inter-AS)
+    """
+    base_parts, base_hextets = base["parts"], base["hextets"]
+
+    if as_a == as_b and as_a != 0:
+        # Cas 1 : Intra-AS -> <base>:AS:ID1:ID2::X/80
+        low_id, high_id = sorted((id_a, id_b))
+        subnet_cidr = f"{base_parts}:{as_a}:{low_id}:{high_id}::/{INTRA_AS_PREFIX}"
+        if base_hextets is None or len(base_hextets) + 3 > 7:
+            raise ValueError(f"Préfixe de base '{base_parts}' trop long pour l'adressage intra-AS ({subnet_cidr})")
+        try:
+            groups = base_hextets + [decimal_hextet(as_a), decimal_hextet(low_id), decimal_hextet(high_id)]
+        except ValueError:
+            raise ValueError(f"AS{as_a} ou ID de routeur ({low_id}, {high_id}) hors bloc IPv6 (max 9999) : {subnet_cidr}")
+        net = _pack(groups) & _MASK_80
+        return net + id_a, net + id_b, INTRA_AS_PREFIX, subnet_cidr
+
+    # Cas 2 : Inter-AS -> <base>:0:AS1:AS2:ID1:ID2:X/112 (base sur exactement 2 blocs)
+    low_as, high_as = sorted((as_a, as_b))
+    low_id, high_id = sorted((id_a, id_b))
+    if base_hextets is None or len(base_hextets) != 2:
+        raise ValueError(f"'{base_parts}' doit compter 2 blocs pour l'adressage inter-AS")
+    try:
+        groups = base_hextets + [0, decimal_hextet(low_as), decimal_hextet(high_as),
+                                 decimal_hextet(low_id), decimal_hextet(high_id)]
+    except ValueError:
+        raise ValueError(f"AS ({low_as}, {high_as}) ou ID de routeur ({low_id}, {high_id}) hors bloc IPv6 (max 9999)")
+    net = _pack(groups)
+    return net + id_a, net + id_b, INTER_AS_PREFIX, f"{base_parts}:0:{low_as}:{high_as}:{low_id}:{high_id}::/{INTER_AS_PREFIX}"
+
+
+def fallback_link(as_a, as_b, id_a, id_b):
+    """
+    Adressage de repli d'un lien inter-AS hors plan (préfixe 2001:FFFF:, texte).
+    Aucun repli n'existe pour l'intra-AS.
+    """
+    low_as, high_as = sorted((as_a, as_b))
+    return (f"2001:FFFF:{low_as}:{high_as}::{id_a}",
+            f"2001:FFFF:{low_as}:{high_as}::{id_b}",
+            INTER_AS_PREFIX,
+            f"2001:FFFF:{low_as}:{high_as}::/64")
+
+
+def allocate_links(links, node_to_id, router_to_as, ip_base):
+    """
+    Adressage de tous les liens en une passe.
+
+    Args:
+        links (list): [{"a", "a_iface", "b", "b_iface"}, ...]
+        node_to_id (dict): {routeur: numéro}
+        router_to_as (dict): {routeur: {"as_number": ...}}
+        ip_base (str): Préfixe de base (ex: "2000:1::/64")
+
+    Returns:
+        tuple: (allocations, collisions, overflows)
+            allocations : [(ip_a, ip_b, prefix_len, subnet_cidr), ...] dans l'ordre
+                          des liens, adresses au format texte ; None pour un lien
+                          intra-AS hors plan (non adressé)
+            collisions  : [(ip, [(routeur, interface), ...]), ...] adresses
+                          attribuées à plusieurs interfaces
+            overflows   : [(lien, raison, subnet_cidr | None), ...] liens hors plan
+                          d'adressage, avec le sous-réseau de repli inter-AS
+    """
+    base = parse_base(ip_base)
+
+    allocations = []
+    owners = {}
+    overflows = []
+    for link in links:
+        a, b = link["a"], link["b"]
+        info_a = router_to_as.get(a)
+        info_b = router_to_as.get(b)
+        as_a = int(info_a['as_number']) if info_a and info_a.get('as_number') else 0
+        as_b = int(info_b['as_number']) if info_b and info_b.get('as_number') else 0
+
+        try:
+            allocation = allocate_link(base, as_a, as_b, node_to_id[a], node_to_id[b])
+        except ValueError as e:
+            if as_a == as_b and as_a != 0:
+                overflows.append((link, str(e), None))
+                allocations.append(None)
+                continue
+            allocation = fallback_link(as_a, as_b, node_to_id[a], node_to_id[b])
+            overflows.append((link, str(e), allocation[3]))
+        ip_a, ip_b, prefix_len, subnet_cidr = allocation
+        owners.setdefault(ip_a, []).append((a, link["a_iface"]))
+        owners.setdefault(ip_b, []).append((b, link["b_iface"]))
+        allocations.append(allocation)
+
+    # Formatage texte uniquement en sortie
+    allocations = [
+        None if allocation is None else
+        (allocation[0] if isinstance(allocation[0], str) else format_ipv6(allocation[0]),
+         allocation[1] if isinstance(allocation[1], str) else format_ipv6(allocation[1]),
+         allocation[2], allocation[3])
+        for allocation in allocations
+    ]
+    collisions = [
+        (ip if isinstance(ip, str) else format_ipv6(ip), users)
+        for ip, users in owners.items() if len(users) > 1
+    ]
+    return allocations, collisions, overflows
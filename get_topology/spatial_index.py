@@ -0,0 +1,84 @@
+"""
+Index spatial (grille uniforme) sur les rectangles de dessin GNS3.
+
+Permet de répondre à la question "quels rectangles contiennent (x, y) ?"
+sans tester chaque rectangle pour chaque routeur.
+"""
+import math
+
+
+def _cell_coord(value, origin, cell_size, max_cell):
+    """Numéro de cellule (borné) pour une coordonnée."""
+    c = int(math.floor((value - origin) / cell_size))
+    if c < 0:
+        return 0
+    if c > max_cell:
+        return max_cell
+    return c
+
+
+def build_rectangle_index(rectangles):
+    """
+    Construit une grille uniforme sur la boîte englobante des rectangles.
+    Chaque cellule référence les indices des rectangles qui la recouvrent,
+    dans l'ordre d'origine (ce qui conserve la règle "premier trouvé").
+
+    Returns:
+        dict: L'index, à passer à find_containing_rectangles()
+    """
+    index = {
+        "rectangles": rectangles,
+        "cells": {},
+        "x_min": 0, "y_min": 0, "x_max": -1, "y_max": -1,
+        "cell_w": 1, "cell_h": 1, "nx": 0, "ny": 0,
+    }
+    if not rectangles:
+        return index
+
+    x_min = min(r["x"] for r in rectangles)
+    y_min = min(r["y"] for r in rectangles)
+    x_max = max(r["x"] + r["width"] for r in rectangles)
+    y_max = max(r["y"] + r["height"] for r in rectangles)
+
+    # ~sqrt(n) cellules par axe : assez fin pour filtrer, assez grossier
+    # pour que les grands rectangles (AS englobants) ne couvrent pas trop de cellules
+    n = max(1, int(math.ceil(math.sqrt(len(rectangles)))))
+    cell_w = max((x_max - x_min) / n, 1)
+    cell_h = max((y_max - y_min) / n, 1)
+
+    cells = {}
+    for i, rect in enumerate(rectangles):
+        cx0 = _cell_coord(rect["x"], x_min, cell_w, n - 1)
+        cx1 = _cell_coord(rect["x"] + rect["width"], x_min, cell_w, n - 1)
+        cy0 = _cell_coord(rect["y"], y_min, cell_h, n - 1)
+        cy1 = _cell_coord(rect["y"] + rect["height"], y_min, cell_h, n - 1)
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                cells.setdefault((cx, cy), []).append(i)
+
+    index.update({
+        "cells": cells,
+        "x_min": x_min, "y_min": y_min, "x_max": x_max, "y_max": y_max,
+        "cell_w": cell_w, "cell_h": cell_h, "nx": n, "ny": n,
+    })
+    return index
+
+
+def find_containing_rectangles(index, px, py):
+    """
+    Retourne les rectangles contenant le point (px, py), dans l'ordre
+    d'origine de extract_drawings (même résultat que le parcours linéaire).
+    """
+    if not (index["x_min"] <= px <= index["x_max"] and index["y_min"] <= py <= index["y_max"]):
+        return []
+
+    cx = _cell_coord(px, index["x_min"], index["cell_w"], index["nx"] - 1)
+    cy = _cell_coord(py, index["y_min"], index["cell_h"], index["ny"] - 1)
+
+    rectangles = index["rectangles"]
+    result = []
+    for i in index["cells"].get((cx, cy), ()):
+        r = rectangles[i]
+        if r["x"] <= px <= r["x"] + r["width"] and r["y"] <= py <= r["y"] + r["height"]:
+            result.append(r)
+    return result
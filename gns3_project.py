@@ -0,0 +1,258 @@
+"""
+Lecture des fichiers projet .gns3.
+
+Seules les sections utiles à l'automatisation sont extraites
+(topology.nodes, topology.links, topology.drawings) et les propriétés
+lourdes des nœuds (images, slots, etc.) sont ignorées.
+Avec ijson installé, le fichier est lu en flux (la totalité du JSON n'est
+jamais en mémoire) ; sinon on retombe sur le module json standard.
+
+Un cache partagé, invalidé sur la date de modification et la taille du
+fichier, permet à get_topology et à injection_cfg de réutiliser la même lecture.
+
+L'index des startup-configs (node_id -> project-files/dynamips/<node_id>/configs/
+iX_startup-config.cfg) est lui aussi mis en cache, par date de modification des
+dossiers : seuls les nœuds dont le dossier configs a changé sont relus.
+"""
+import fnmatch
+import json
+import os
+import time
+
+try:
+    import ijson
+except ImportError:  # Dépendance optionnelle
+    ijson = None
+
+# Sections extraites (GNS3 les range sous "topology", certains exports à la racine)
+SECTIONS = ("nodes", "links", "drawings")
+
+# Champs des nœuds ignorés à la lecture (les plus volumineux, inutiles ici)
+SKIPPED_NODE_KEYS = {"properties"}
+
+_project_cache = {}
+
+STARTUP_CONFIG_PATTERN = "i*_startup-config.cfg"
+
+# Une date de modification plus récente que cette fenêtre n'est pas mise en cache :
+# un second changement dans la même unité de temps du système de fichiers
+# (2 s en FAT/SMB) ne la modifierait pas.
+_RACY_WINDOW_NS = 2_000_000_000
+
+# dossier dynamips -> {"mtime": date du dossier, "nodes": {node_id: (date de configs/, chemin)}}
+_node_index_cache = {}
+
+
+def _strip_nodes(nodes):
+    return [{k: v for k, v in n.items() if k not in SKIPPED_NODE_KEYS} for n in nodes]
+
+
+def _load_stdlib(gns3_file):
+    """Repli sans ijson : lecture complète puis filtrage des sections utiles."""
+    with open(gns3_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    project = {"topology": {}}
+    topology = data.get("topology", {})
+    for section in SECTIONS:
+        if section in topology:
+            project["topology"][section] = topology[section]
+        if section in data:
+            project[section] = data[section]
+
+    for container in (project, project["topology"]):
+        if "nodes" in container:
+            container["nodes"] = _strip_nodes(container["nodes"])
+    return project
+
+
+def _load_streaming(gns3_file):
+    """Lecture en flux avec ijson : seuls les éléments des sections utiles sont construits."""
+    # "topology.nodes" -> (conteneur, section), idem à la racine
+    section_prefixes = {}
+    for section in SECTIONS:
+        section_prefixes[f"topology.{section}"] = ("topology", section)
+        section_prefixes[section] = (None, section)
+
+    project = {"topology": {}}
+
+    def _section_list(section_prefix):
+        container_key, section = section_prefixes[section_prefix]
+        container = project["topology"] if container_key else project
+        return container.setdefault(section, [])
+
+    builder = None
+    current = None      # préfixe de l'élément en cours de construction
+    skip_prefix = None  # sous-arbre ignoré (ex: topology.nodes.item.properties)
+
+    with open(gns3_file, "rb") as f:
+        for prefix, event, value in ijson.parse(f, use_float=True):
+            if builder is None:
+                if event == "start_array" and prefix in section_prefixes:
+                    # Section présente (éventuellement vide)
+                    _section_list(prefix)
+                elif event == "start_map" and prefix.endswith(".item") and prefix[:-5] in section_prefixes:
+                    builder = ijson.ObjectBuilder()
+                    current = prefix
+                    builder.event(event, value)
+                continue
+
+            if skip_prefix is not None:
+                if prefix == skip_prefix or prefix.startswith(skip_prefix + "."):
+                    continue
+                skip_prefix = None
+
+            if (event == "map_key" and prefix == current
+                    and current.endswith("nodes.item") and value in SKIPPED_NODE_KEYS):
+                skip_prefix = f"{current}.{value}"
+                continue
+
+            builder.event(event, value)
+            if event == "end_map" and prefix == current:
+                _section_list(current[:-5]).append(builder.value)
+                builder = None
+                current = None
+
+    return project
+
+
+def load_project(gns3_file, use_cache=True):
+    """
+    Charge les sections utiles d'un projet .gns3.
+
+    Args:
+        gns3_file (str): Chemin vers le fichier .gns3
+        use_cache (bool): Réutiliser la lecture précédente si le fichier n'a pas changé
+
+    Returns:
+        dict: {"topology": {"nodes": [...], "links": [...], "drawings": [...]}}
+              (plus les mêmes sections à la racine si le fichier les y place).
+              Le résultat est partagé via le cache : ne pas le modifier.
+
+    Raises:
+        FileNotFoundError: si le fichier n'existe pas
+    """
+    path = os.path.abspath(gns3_file)
+    st = os.stat(path)
+    key = (st.st_mtime_ns, st.st_size)
+
+    if use_cache:
+        cached = _project_cache.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+    project = _load_streaming(path) if ijson is not None else _load_stdlib(path)
+    _project_cache[path] = (key, project)
+    return project
+
+
+def clear_project_cache():
+    """Vide le cache des projets lus."""
+    _project_cache.clear()
+
+
+def find_gns3_files(project_dir):
+    """Fichiers .gns3 du dossier projet (un seul scandir, ordre alphabétique)."""
+    with os.scandir(project_dir) as entries:
+        return sorted(e.path for e in entries if e.name.endswith(".gns3") and e.is_file())
+
+
+def dynamips_dir(project_dir):
+    return os.path.join(project_dir, "project-files", "dynamips")
+
+
+def _node_startup_config(configs_dir):
+    """Premier iX_startup-config.cfg de configs_dir, ou None."""
+    try:
+        with os.scandir(configs_dir) as cfg_entries:
+            candidates = sorted(
+                e.path for e in cfg_entries
+                if e.is_file() and fnmatch.fnmatch(e.name, STARTUP_CONFIG_PATTERN)
+            )
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    return candidates[0] if candidates else None
+
+
+def startup_config_index(project_dir, executor=None, use_cache=True):
+    """
+    Index { node_id: chemin du iX_startup-config.cfg } du projet (un seul fichier
+    attendu par nœud) ; les nœuds sans dossier configs ou sans fichier startup
+    sont absents.
+
+    Le dossier dynamips n'est relu que si sa date de modification a changé (nœud
+    ajouté ou supprimé), et le dossier configs d'un nœud que si la sienne a changé
+    (fichier créé, renommé ou remplacé) : un appel suivant ne coûte qu'un stat par
+    nœud. Avec executor (ThreadPoolExecutor), ces stat et parcours sont faits en
+    parallèle.
+
+    Args:
+        project_dir (str): Dossier du projet GNS3 (contenant project-files/)
+        executor: ThreadPoolExecutor optionnel
+        use_cache (bool): Réutiliser les dossiers inchangés depuis l'appel précédent
+    """
+    root = os.path.abspath(dynamips_dir(project_dir))
+    try:
+        root_mtime = os.stat(root).st_mtime_ns
+    except (FileNotFoundError, NotADirectoryError):
+        _node_index_cache.pop(root, None)
+        return {}
+
+    cached = _node_index_cache.get(root) if use_cache else None
+    if cached is not None and cached["mtime"] == root_mtime:
+        node_ids = list(cached["nodes"])
+    else:
+        with os.scandir(root) as node_entries:
+            node_ids = [e.name for e in node_entries if e.is_dir()]
+    previous = cached["nodes"] if cached is not None else {}
+
+    def refresh(node_id):
+        configs_dir = os.path.join(root, node_id, "configs")
+        try:
+            mtime = os.stat(configs_dir).st_mtime_ns
+        except (FileNotFoundError, NotADirectoryError):
+            return None, None
+        entry = previous.get(node_id)
+        if entry is not None and entry[0] == mtime:
+            return entry
+        return mtime, _node_startup_config(configs_dir)
+
+    entries = map(refresh, node_ids) if executor is None else executor.map(refresh, node_ids)
+    now = time.time_ns()
+    nodes = {}
+    for node_id, (mtime, path) in zip(node_ids, entries):
+        if mtime is not None and now - mtime < _RACY_WINDOW_NS:
+            mtime = None  # relu au prochain appel
+        nodes[node_id] = (mtime, path)
+    _node_index_cache[root] = {
+        "mtime": root_mtime if now - root_mtime >= _RACY_WINDOW_NS else None,
+        "nodes": nodes,
+    }
+    return {node_id: path for node_id, (_, path) in nodes.items() if path is not None}
+
+
+def dynamips_nodes(gns3_file):
+    """{ nom du routeur: node_id } des nœuds dynamips du projet (lecture en cache)."""
+    project = load_project(gns3_file)
+    return {
+        n["name"]: n["node_id"]
+        for n in project.get("topology", {}).get("nodes", [])
+        if n.get("node_type") == "dynamips"
+    }
+
+
+def missing_startup_configs(gns3_file, routers=None):
+    """
+    Routeurs dynamips (parmi routers, défaut : tous) dont le nœud n'a pas encore
+    de iX_startup-config.cfg, d'après startup_config_index.
+    """
+    index = startup_config_index(os.path.dirname(os.path.abspath(gns3_file)))
+    return [
+        name for name, node_id in dynamips_nodes(gns3_file).items()
+        if (routers is None or name in routers) and node_id not in index
+    ]
+
+
+def clear_node_index_cache():
+    """Vide le cache des index de startup-configs."""
+    _node_index_cache.clear()
@@ -0,0 +1,8 @@
+"""Point d'entrée : python -m gns3auto build projet.gns3 ..."""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from cli import main
+
+sys.exit(main())
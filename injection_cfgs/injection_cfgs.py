@@ -1,9 +1,114 @@
-import json
+import contextlib
+import hashlib
 import os
+import sys
 import shutil
-import glob
-
-def injection_cfg(project_dir=None, configs_dir=None):
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add root directory to sys.path to allow importing gns3_project
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from gns3_project import load_project, find_gns3_files, dynamips_dir, startup_config_index
+
+# Threads d'E/S par défaut en mode concurrent (stat, parcours, copies : attente disque/réseau)
+DEFAULT_IO_THREADS = 16
+
+
+def _file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(65536), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def files_identical(src, dst):
+    """Compare d'abord les tailles (un stat), puis le contenu (hash) si nécessaire."""
+    try:
+        if os.path.getsize(src) != os.path.getsize(dst):
+            return False
+    except OSError:
+        return False
+    return _file_hash(src) == _file_hash(dst)
+
+
+def atomic_copy(src, dst):
+    """
+    Copie src vers dst de façon atomique : écriture dans un fichier temporaire
+    du même dossier puis renommage. GNS3 ne voit jamais de fichier à moitié écrit.
+    """
+    dst_dir = os.path.dirname(dst)
+    fd, tmp_path = tempfile.mkstemp(dir=dst_dir, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp, open(src, "rb") as f:
+            shutil.copyfileobj(f, tmp)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        shutil.copymode(src, tmp_path)
+        os.replace(tmp_path, dst)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _inject_router(router, node_id, cfg_dir, dynamips_root, project_dir, startup_configs, cancel=None):
+    """
+    Injecte la configuration d'un routeur ; sans effet de bord sur les autres
+    routeurs (chaque nœud a son propre fichier, écrit par atomic_copy).
+
+    Returns:
+        tuple: (routeur, statut, message), statut parmi "copied", "skipped",
+        "missing" (pas de <routeur>.cfg), "error" et "cancelled"
+    """
+    if cancel is not None and cancel.is_set():
+        return router, "cancelled", None
+
+    src = os.path.join(cfg_dir, f"{router}.cfg")
+    node_dir = os.path.join(dynamips_root, node_id, "configs")
+
+    if not os.path.exists(src):
+        return router, "missing", f"[SKIP] {router}: fichier source absent ({src})"
+
+    # GNS3 utilise iX_startup-config.cfg (un seul fichier cfg attendu)
+    dst = startup_configs.get(node_id)
+    if dst is None:
+        if not os.path.isdir(node_dir):
+            return router, "error", f"[ERREUR] {router}: dossier configs introuvable ({node_dir})"
+        return router, "error", f"[ERREUR] {router}: aucun i*_startup-config.cfg trouvé dans {node_dir}"
+
+    try:
+        if files_identical(src, dst):
+            return router, "skipped", f"[IDENTIQUE] {router}: {os.path.relpath(dst, project_dir)} déjà à jour"
+        atomic_copy(src, dst)
+    except OSError as e:
+        return router, "error", f"[ERREUR] {router}: copie impossible ({e})"
+    return router, "copied", f"[OK] {router}: {os.path.basename(src)} -> {os.path.relpath(dst, project_dir)}"
+
+
+def injection_cfg(project_dir=None, configs_dir=None, progress=None, cancel=None, routers=None, threads=1,
+                  gns3_file=None):
+    """
+    Injecte les <routeur>.cfg dans les iX_startup-config.cfg des nœuds GNS3.
+    Les fichiers déjà identiques ne sont pas recopiés.
+
+    Args:
+        progress: callable progress(fait, total) optionnel, appelé après chaque routeur
+        cancel: threading.Event optionnel ; s'il est levé, l'injection s'arrête
+            entre deux routeurs (chaque copie reste atomique)
+        routers: ensemble optionnel de noms ; si fourni, seuls ces routeurs sont injectés
+        threads: nombre de threads d'E/S (1 = séquentiel). Au-delà, le parcours du
+            dossier dynamips, les comparaisons et les copies de plusieurs nœuds se
+            recouvrent (utile sur un projet monté en NFS/SMB, où chaque stat est un
+            aller-retour réseau). Les messages, la progression et le résumé restent
+            produits par le thread appelant.
+        gns3_file: fichier .gns3 du projet (défaut : cherché dans project_dir)
+
+    Returns:
+        dict | None: {"copied": [...], "skipped": [...], "missing": [...], "errors": [...]}
+        (noms de routeurs)
+    """
     if not project_dir or not os.path.exists(project_dir):
         print(f"[ERREUR] Répertoire projet invalide ou non fourni : {project_dir}")
         return
@@ -11,16 +116,19 @@ def injection_cfg(project_dir=None, configs_dir=None):
     PROJECT_DIR = project_dir
 
     # Find the .gns3 file dynamically if specific name not guaranteed
-    gns3_files = glob.glob(os.path.join(PROJECT_DIR, "*.gns3"))
-    if not gns3_files:
-        print(f"[ERREUR] Aucun fichier .gns3 trouvé dans le dossier : {PROJECT_DIR}")
-        return
-    
-    GNS3_FILE = gns3_files[0]
-    if len(gns3_files) > 1:
-        print(f"[ATTENTION] Plusieurs fichiers .gns3 trouvés. Utilisation de : {os.path.basename(GNS3_FILE)}")
-
-    DYNAMIPS_DIR = os.path.join(PROJECT_DIR, "project-files", "dynamips")
+    if gns3_file is not None:
+        GNS3_FILE = gns3_file
+    else:
+        gns3_files = find_gns3_files(PROJECT_DIR)
+        if not gns3_files:
+            print(f"[ERREUR] Aucun fichier .gns3 trouvé dans le dossier : {PROJECT_DIR}")
+            return
+
+        GNS3_FILE = gns3_files[0]
+        if len(gns3_files) > 1:
+            print(f"[ATTENTION] Plusieurs fichiers .gns3 trouvés. Utilisation de : {os.path.basename(GNS3_FILE)}")
+
+    DYNAMIPS_DIR = dynamips_dir(PROJECT_DIR)
     
     if not os.path.exists(DYNAMIPS_DIR):
          print(f"[ERREUR] Dossier 'project-files/dynamips' introuvable dans : {PROJECT_DIR}")
@@ -32,48 +140,63 @@ def injection_cfg(project_dir=None, configs_dir=None):
 
     CFG_DIR = configs_dir
 
-    # Charger le projet GNS3
-    with open(GNS3_FILE, "r", encoding="utf-8") as f:
-        project = json.load(f)
+    # Charger le projet GNS3 (lecture partagée avec get_topology si le fichier n'a pas changé)
+    project = load_project(GNS3_FILE)
 
     # Extraction des UUID par rapport au nom des noeuds (routeurs, switchs)
     nodes = project.get("topology", {}).get("nodes", [])
     name_to_id = {
         n["name"]: n["node_id"]
         for n in nodes
-        if n.get("node_type") == "dynamips"
+        if n.get("node_type") == "dynamips" and (routers is None or n["name"] in routers)
     }
 
     print("[INFO] Nodes dynamips détectés:", name_to_id)
 
+    summary = {"copied": [], "skipped": [], "missing": [], "errors": []}
+    buckets = {"copied": "copied", "skipped": "skipped", "missing": "missing", "error": "errors"}
+    t0 = time.perf_counter()
+
     # Insertion du fichier .cfg dans la config de chaque routeur
 
     #ATTENTION : Nom exacte dans le cfg et dans gns
-    for router, node_id in name_to_id.items():
-        src = os.path.join(CFG_DIR, f"{router}.cfg")
-        node_dir = os.path.join(DYNAMIPS_DIR, node_id, "configs")
-
-        if not os.path.exists(src):
-            print(f"[SKIP] {router}: fichier source absent ({src})")
-            continue
-
-        if not os.path.isdir(node_dir):
-            print(f"[ERREUR] {router}: dossier configs introuvable ({node_dir})")
-            continue
-
-        # GNS3 utilise iX_startup-config.cfg
-        candidates = glob.glob(os.path.join(node_dir, "i*_startup-config.cfg"))
-        if not candidates:
-            print(f"[ERREUR] {router}: aucun i*_startup-config.cfg trouvé dans {node_dir}")
-            continue
-
-        # Un seul fichier cfg attendu
-        dst = candidates[0]
-        
-        shutil.copy(src, dst)
-        print(f"[OK] {router}: {os.path.basename(src)} -> {os.path.relpath(dst, PROJECT_DIR)}")
-
-    print("[DONE] Injection exacte (fichier réellement utilisé par GNS3).")
+    total = len(name_to_id)
+    done = 0
+    with contextlib.ExitStack() as stack:
+        executor = None
+        if threads > 1:
+            executor = stack.enter_context(ThreadPoolExecutor(max_workers=threads, thread_name_prefix="injection"))
+
+        # Index des startup-configs partagé (en cache : seuls les dossiers modifiés sont relus)
+        startup_configs = startup_config_index(PROJECT_DIR, executor)
+        args = [
+            (router, node_id, CFG_DIR, DYNAMIPS_DIR, PROJECT_DIR, startup_configs, cancel)
+            for router, node_id in name_to_id.items()
+        ]
+        if executor is None:
+            results = (_inject_router(*a) for a in args)
+        else:
+            # Résultats dans l'ordre des routeurs (sortie et résumé reproductibles)
+            results = executor.map(lambda a: _inject_router(*a), args)
+
+        for router, status, message in results:
+            if status == "cancelled":
+                continue
+            done += 1
+            if message:
+                print(message)
+            summary[buckets[status]].append(router)
+            if progress is not None:
+                progress(done, total)
+
+    if cancel is not None and cancel.is_set() and done < total:
+        print(f"[ANNULÉ] Injection interrompue après {done}/{total} routeurs.")
+
+    mode = f"{threads} threads" if threads > 1 else "séquentielle"
+    print(f"[DONE] Injection exacte (fichier réellement utilisé par GNS3, {mode}, {time.perf_counter() - t0:.2f} s) : "
+          f"{len(summary['copied'])} copiés, {len(summary['skipped'])} inchangés, "
+          f"{len(summary['missing'])} sans configuration, {len(summary['errors'])} erreurs.")
+    return summary
 
 if __name__ == "__main__":
-    injection_cfg()
\ No newline at end of file
+    injection_cfg()
@@ -0,0 +1,96 @@
+"""
+Instrumentation du pipeline : chronométrage des étapes et compteurs.
+
+Un rapport est un simple dictionnaire :
+    {"meta": {...}, "stages": {nom: {"wall_s", "cpu_s", "calls"}},
+     "counters": {nom: valeur}, "events": [...]}
+Il est écrit en JSON à côté des configurations (pipeline_report.json) pour être
+comparé d'une exécution à l'autre. Les "events" permettent d'exporter une trace
+Chrome (chrome://tracing, Perfetto) ; cProfile est disponible en option.
+"""
+import cProfile
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+REPORT_NAME = "pipeline_report.json"
+TRACE_NAME = "pipeline_trace.json"
+PSTATS_NAME = "pipeline.pstats"
+
+# Valeurs acceptées pour l'option --profile
+PROFILE_MODES = ("cprofile", "chrome")
+
+
+def new_report(**meta):
+    """Crée un rapport vide ; meta (projet, options...) est recopié tel quel."""
+    return {
+        "meta": dict(meta, started_at=datetime.now(timezone.utc).isoformat(timespec="seconds")),
+        "stages": {},
+        "counters": {},
+        "events": [],
+        "_t0": time.perf_counter(),
+    }
+
+
+@contextmanager
+def stage(report, name):
+    """
+    Mesure le temps réel et le temps CPU (processus) d'une étape.
+    Une étape exécutée plusieurs fois cumule ses temps.
+    """
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        yield
+    finally:
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+        entry = report["stages"].setdefault(name, {"wall_s": 0.0, "cpu_s": 0.0, "calls": 0})
+        entry["wall_s"] += wall
+        entry["cpu_s"] += cpu
+        entry["calls"] += 1
+        report["events"].append({
+            "name": name,
+            "ph": "X",
+            "ts": round((wall_start - report["_t0"]) * 1e6),
+            "dur": round(wall * 1e6),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+        })
+
+
+def add_counters(report, **counters):
+    """Ajoute (cumule) des compteurs numériques au rapport."""
+    for name, value in counters.items():
+        report["counters"][name] = report["counters"].get(name, 0) + value
+
+
+def save_report(report, path):
+    """Écrit le rapport JSON (sans les événements de trace), de façon atomique."""
+    data = {k: v for k, v in report.items() if k not in ("events", "_t0")}
+    data["meta"]["total_wall_s"] = time.perf_counter() - report["_t0"]
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def save_chrome_trace(report, path):
+    """Écrit les étapes au format Chrome Trace Event (chrome://tracing, ui.perfetto.dev)."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": report["events"], "displayTimeUnit": "ms"}, f)
+
+
+@contextmanager
+def cprofiled(path):
+    """Profile le bloc avec cProfile (thread courant) et écrit les stats pstats dans path."""
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
@@ -0,0 +1,370 @@
+"""
+Envoi des configurations aux routeurs en cours d'exécution, par leur console telnet.
+
+Contrairement à injection_cfg (qui réécrit les startup-configs, routeurs éteints),
+chaque routeur démarré reçoit sa configuration complète (<routeur>.cfg) ou un
+delta (<routeur>.delta.cfg, voir gen_config_bgp/config_delta.py) en mode
+"configure terminal", puis "write memory".
+
+Le port console de chaque nœud dynamips est lu dans le .gns3 (champ "console").
+Les routeurs sont configurés en parallèle (asyncio, au plus `concurrency`
+consoles ouvertes à la fois). Chaque commande attend le prompt suivant : la
+console n'est jamais saturée et les erreurs IOS ("% Invalid input...") sont
+rattachées à leur commande. Une console injoignable ou muette (timeout) avant
+"configure terminal" est retentée `retries` fois ; après, le routeur est
+marqué "partial" (les commandes ne sont pas renvoyées, un delta n'étant pas
+rejouable). Le prompt final doit porter le nom du routeur.
+"""
+import asyncio
+import os
+import re
+import sys
+import time
+
+# Add root directory to sys.path to allow importing gns3_project
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from gns3_project import load_project
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_CONCURRENCY = 64
+# Délai maximal d'attente d'un prompt (s)
+DEFAULT_TIMEOUT_S = 10.0
+DEFAULT_RETRIES = 2
+# Attente avant une nouvelle tentative (multipliée par le numéro de tentative, s)
+RETRY_DELAY_S = 0.5
+
+# Nom par défaut d'un routeur IOS jamais configuré
+DEFAULT_HOSTNAME = "Router"
+
+# Telnet (RFC 854) : négociation minimale, on accepte l'écho et SGA du routeur
+IAC, DONT, DO, WONT, WILL, SB, SE = 255, 254, 253, 252, 251, 250, 240
+ACCEPTED_OPTIONS = {1, 3}  # ECHO, SUPPRESS-GO-AHEAD
+
+PROMPT_RE = re.compile(rb"(?:^|[\r\n])([A-Za-z0-9_.\-]+)(\([A-Za-z0-9_\-]+\))?([>#]) ?$")
+DIALOG_RE = re.compile(rb"\[yes/no\]:? ?$")
+PRESS_RETURN_RE = re.compile(rb"Press RETURN to get started")
+ERROR_RE = re.compile(rb"^% .*$", re.MULTILINE)
+
+# Caractères de l'écho d'une commande attendus avant son prompt
+ECHO_MATCH_LEN = 20
+
+# Lignes des fichiers de configuration qui ne sont pas envoyées telles quelles
+SESSION_LINES = ("configure terminal", "end", "write memory")
+
+
+def console_targets(gns3_file, host=DEFAULT_HOST):
+    """
+    {routeur: (hôte, port)} des nœuds dynamips ayant une console telnet.
+    L'hôte est celui du nœud (console_host) s'il est précis, sinon `host`.
+    """
+    project = load_project(gns3_file)
+    nodes = project.get("topology", {}).get("nodes", project.get("nodes", []))
+    targets = {}
+    for node in nodes:
+        if node.get("node_type") != "dynamips" or not node.get("console"):
+            continue
+        if node.get("console_type", "telnet") != "telnet":
+            continue
+        node_host = node.get("console_host")
+        if not node_host or node_host in ("0.0.0.0", "::"):
+            node_host = host
+        targets[node["name"]] = (node_host, int(node["console"]))
+    return targets
+
+
+def config_commands(text):
+    """
+    Commandes à envoyer d'une configuration rendue ou d'un delta : sans les
+    commentaires, les lignes vides ni configure terminal / end / write memory
+    (ajoutés par la session).
+    """
+    commands = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith("!") or stripped in SESSION_LINES:
+            continue
+        commands.append(line.rstrip())
+    return commands
+
+
+def expected_hostname(commands):
+    """Dernier "hostname X" des commandes (None si la configuration ne le change pas)."""
+    hostname = None
+    for command in commands:
+        parts = command.split()
+        if len(parts) == 2 and parts[0] == "hostname":
+            hostname = parts[1]
+    return hostname
+
+
+def accepted_hostnames(router, commands):
+    """
+    Noms attendus au prompt avant configuration : le routeur, le nom IOS par
+    défaut, et l'ancien nom retiré par un delta ("no hostname X" d'un renommage).
+    """
+    names = {router, DEFAULT_HOSTNAME}
+    for command in commands:
+        parts = command.split()
+        if len(parts) == 3 and parts[:2] == ["no", "hostname"]:
+            names.add(parts[2])
+    return names
+
+
+def _telnet_filter(data, session):
+    """Retire les séquences telnet de data et répond aux négociations."""
+    if session["pending"]:
+        data = session["pending"] + data
+        session["pending"] = b""
+    if IAC not in data:
+        return data
+    out = bytearray()
+    replies = bytearray()
+    i = 0
+    while i < len(data):
+        byte = data[i]
+        if byte != IAC:
+            out.append(byte)
+            i += 1
+            continue
+        if i + 1 >= len(data):
+            session["pending"] = data[i:]
+            break
+        command = data[i + 1]
+        if command == IAC:  # 0xFF littéral
+            out.append(IAC)
+            i += 2
+        elif command in (DO, DONT, WILL, WONT):
+            if i + 2 >= len(data):
+                session["pending"] = data[i:]
+                break
+            option = data[i + 2]
+            if command == WILL:
+                replies += bytes((IAC, DO if option in ACCEPTED_OPTIONS else DONT, option))
+            elif command == DO:
+                replies += bytes((IAC, WILL if option == 3 else WONT, option))
+            i += 3
+        elif command == SB:
+            end = data.find(bytes((IAC, SE)), i + 2)
+            if end < 0:
+                session["pending"] = data[i:]
+                break
+            i = end + 2
+        else:
+            i += 2
+    if replies:
+        session["writer"].write(bytes(replies))
+    return bytes(out)
+
+
+async def _read_prompt(session, timeout, echo=b""):
+    """
+    Lit jusqu'au prompt suivant (répond au dialogue de configuration initiale et
+    à "Press RETURN"). Avec echo, seul un prompt reçu après l'écho de la commande
+    compte : un prompt en retard (ligne vide en trop) n'est pas pris pour la réponse.
+    Renvoie (sortie, nom d'hôte, mode, caractère du prompt).
+    """
+    buffer = b""
+    deadline = time.monotonic() + timeout
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise asyncio.TimeoutError(f"pas de prompt après {timeout} s")
+        data = await asyncio.wait_for(session["reader"].read(4096), remaining)
+        if not data:
+            raise ConnectionError("console fermée par le routeur")
+        buffer += _telnet_filter(data, session)
+        tail = buffer[-256:]
+        if DIALOG_RE.search(tail):
+            session["writer"].write(b"no\r")
+            buffer = b""
+            continue
+        if PRESS_RETURN_RE.search(tail):
+            session["writer"].write(b"\r")
+            buffer = b""
+            continue
+        if echo:
+            start = buffer.find(echo)
+            if start < 0:
+                continue
+            buffer = buffer[start:]
+            echo = b""
+            tail = buffer[-256:]
+        match = PROMPT_RE.search(tail)
+        if match:
+            name, mode, char = (g.decode("ascii", "replace") if g else "" for g in match.groups())
+            return buffer, name, mode, char
+
+
+async def _send(session, command, timeout):
+    raw = command.encode("ascii", "replace")
+    session["writer"].write(raw + b"\r")
+    await session["writer"].drain()
+    # IOS fait défiler les lignes longues à l'écho : seul le début est comparé
+    return await _read_prompt(session, timeout, echo=raw.strip()[:ECHO_MATCH_LEN])
+
+
+async def _push_once(router, host, port, commands, timeout, cancel, progress):
+    """
+    Une tentative de configuration : renvoie la liste des erreurs IOS.
+    progress["configuring"] passe à True juste avant "configure terminal" et
+    progress["acked"] compte les commandes acquittées par un prompt.
+    """
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    session = {"reader": reader, "writer": writer, "pending": b""}
+    try:
+        # Réveil de la console (une ligne vide affiche le prompt courant)
+        _, name, mode, char = await _send(session, "", timeout)
+        if name not in accepted_hostnames(router, commands):
+            raise ValueError(f"la console {host}:{port} répond '{name}', pas '{router}' (mauvais port ?)")
+        if mode:
+            _, name, mode, char = await _send(session, "end", timeout)
+        if char == ">":
+            _, name, mode, char = await _send(session, "enable", timeout)
+            if char != "#":
+                raise ValueError("passage en mode privilégié refusé (mot de passe enable ?)")
+
+        progress["configuring"] = True
+        _, name, mode, char = await _send(session, "configure terminal", timeout)
+        if not mode:
+            raise ValueError("mode configuration refusé")
+
+        errors = []
+        for command in commands:
+            if cancel is not None and cancel.is_set():
+                errors.append("annulé")
+                break
+            output, name, mode, char = await _send(session, command, timeout)
+            for error in ERROR_RE.findall(output):
+                errors.append(f"{command.strip()} -> {error.decode('ascii', 'replace').strip()}")
+            progress["acked"] += 1
+
+        _, name, mode, char = await _send(session, "end", timeout)
+        expected = expected_hostname(commands) or router
+        if char != "#" or mode or name != expected:
+            errors.append(f"prompt final inattendu : {name}{mode}{char} (attendu : {expected}#)")
+        elif not errors:
+            await _send(session, "write memory", max(timeout, 30.0))
+        return errors
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except (OSError, ConnectionError):
+            pass
+
+
+async def _push_router(router, target, commands, semaphore, timeout, retries, cancel):
+    result = {"router": router, "console": f"{target[0]}:{target[1]}", "status": "error",
+              "attempts": 0, "commands": len(commands), "last_acked": None, "errors": [], "elapsed_s": 0.0}
+    async with semaphore:
+        t0 = time.perf_counter()
+        for attempt in range(1, retries + 2):
+            if cancel is not None and cancel.is_set():
+                result["status"] = "cancelled"
+                break
+            result["attempts"] = attempt
+            progress = {"configuring": False, "acked": 0}
+            try:
+                errors = await _push_once(router, target[0], target[1], commands, timeout, cancel, progress)
+            except (OSError, ConnectionError, asyncio.TimeoutError) as e:
+                result["errors"] = [f"{type(e).__name__}: {e}"]
+                if progress["configuring"]:
+                    # Une partie des commandes a pu être appliquée : les renvoyer n'est pas
+                    # sûr (un "no neighbor" déjà passé serait refusé), le routeur reste partiel
+                    acked = progress["acked"]
+                    result["status"] = "partial"
+                    result["last_acked"] = acked - 1
+                    last = f" (dernière : '{commands[acked - 1].strip()}')" if acked else ""
+                    result["errors"].append(f"{acked}/{len(commands)} commandes acquittées{last}")
+                    break
+                # Console injoignable ou muette avant "configure terminal" : rien n'a été
+                # appliqué, nouvelle tentative
+                if attempt <= retries:
+                    await asyncio.sleep(RETRY_DELAY_S * attempt)
+                continue
+            except ValueError as e:
+                result["errors"] = [str(e)]
+                break
+            result["errors"] = errors
+            result["status"] = "ok" if not errors else "error"
+            break
+        result["elapsed_s"] = time.perf_counter() - t0
+    return result
+
+
+async def push_all(jobs, concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT_S, retries=DEFAULT_RETRIES,
+                   progress=None, cancel=None):
+    """
+    Configure les routeurs de jobs [(routeur, (hôte, port), commandes)] en parallèle.
+    Renvoie les résultats dans l'ordre des jobs.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    tasks = [
+        asyncio.ensure_future(_push_router(router, target, commands, semaphore, timeout, retries, cancel))
+        for router, target, commands in jobs
+    ]
+    done = 0
+    for finished in asyncio.as_completed(tasks):
+        result = await finished
+        done += 1
+        status = {"ok": "OK", "cancelled": "ANNULÉ", "partial": "PARTIEL"}.get(result["status"], "ERREUR")
+        detail = f" : {'; '.join(result['errors'])}" if result["errors"] else ""
+        print(f"[{status}] {result['router']} ({result['console']}, {result['commands']} commandes, "
+              f"{result['attempts']} tentative(s), {result['elapsed_s']:.2f} s){detail}")
+        if progress is not None:
+            progress(done, len(tasks))
+    return [task.result() for task in tasks]
+
+
+def push_configs(gns3_file, configs_dir, routers=None, deltas=False, host=DEFAULT_HOST,
+                 concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT_S, retries=DEFAULT_RETRIES,
+                 progress=None, cancel=None):
+    """
+    Envoie les configurations de configs_dir aux routeurs démarrés du projet.
+
+    Args:
+        gns3_file (str): Projet .gns3 (ports console des nœuds)
+        configs_dir (str): Dossier des <routeur>.cfg, ou des <routeur>.delta.cfg avec deltas=True
+        routers: noms des routeurs à configurer (défaut : tous ceux qui ont un fichier)
+        deltas (bool): Envoyer les deltas de config_delta au lieu des configurations complètes
+        concurrency (int): Consoles ouvertes simultanément
+        timeout (float): Attente maximale d'un prompt, en secondes
+        retries (int): Nouvelles tentatives si la console est injoignable ou muette
+        progress: callable progress(fait, total) optionnel
+        cancel: threading.Event optionnel ; arrête les envois entre deux commandes
+
+    Returns:
+        dict: {"ok": [...], "errors": [...], "partial": [...], "missing": [...], "results": [résultat par routeur]}
+        Un routeur "partial" a perdu sa console après "configure terminal" : seules les
+        commandes jusqu'à results[i]["last_acked"] sont sûres d'avoir été appliquées.
+    """
+    targets = console_targets(gns3_file, host)
+    suffix = ".delta.cfg" if deltas else ".cfg"
+    names = list(targets) if routers is None else list(routers)
+
+    jobs = []
+    summary = {"ok": [], "errors": [], "partial": [], "missing": [], "results": []}
+    for router in names:
+        path = os.path.join(configs_dir, f"{router}{suffix}")
+        if router not in targets or not os.path.exists(path):
+            # Sans delta, le routeur est déjà à jour ; sans console, il n'est pas joignable
+            if router not in targets:
+                print(f"[SKIP] {router}: pas de console telnet dans le projet")
+                summary["missing"].append(router)
+            elif routers is not None:
+                print(f"[SKIP] {router}: fichier absent ({path})")
+                summary["missing"].append(router)
+            continue
+        with open(path, "r") as f:
+            jobs.append((router, targets[router], config_commands(f.read())))
+
+    print(f"[INFO] {len(jobs)} routeur(s) à configurer, {concurrency} console(s) en parallèle.")
+    t0 = time.perf_counter()
+    results = asyncio.run(push_all(jobs, concurrency, timeout, retries, progress, cancel))
+    for result in results:
+        summary[result["status"] if result["status"] in ("ok", "partial") else "errors"].append(result["router"])
+    summary["results"] = results
+
+    print(f"[DONE] Envoi en direct : {len(summary['ok'])} configurés, {len(summary['errors'])} en erreur, "
+          f"{len(summary['partial'])} partiels, {len(summary['missing'])} ignorés ({time.perf_counter() - t0:.2f} s).")
+    return summary
@@ -3,85 +3,66 @@
 Orchestrateur Principal (GUI Version):
 1. Sélection du projet GNS3 via Interface Graphique.
 2. Configuration du préfixe IPv6 via Dialogue.
-3. Exécution séquentielle de l'automatisation.
+3. Exécution de l'automatisation dans un thread, avec progression et annulation.
 """
 
-import json
+import csv
 import os
-import shutil
+import queue
+import sys
+import threading
 import tkinter as tk
 from tkinter import filedialog, simpledialog, messagebox, ttk
 from pathlib import Path
 
 # Imports des modules
-from get_topology.get_topology import get_topology
-from gen_config_bgp_rip.bgp_rip_gen import generate_bgp_configs as gen_rip
-from gen_config_bgp_ospf.bgp_ospf_gen import generate_bgp_configs as gen_ospf
-from injection_cfgs.injection_cfgs import injection_cfg
+from get_topology.get_topology import extract_structure
+from pipeline import run_automation, STAGES
 
+# Rafraîchissement de la fenêtre de progression (~60 images/s)
+POLL_INTERVAL_MS = 16
+# Nombre maximal de lignes conservées dans le journal affiché
+MAX_LOG_LINES = 5000
+# Coût OSPF par défaut (IOS) affiché dans l'éditeur de métriques
+DEFAULT_OSPF_COST = 10
+# Colonnes du fichier CSV d'import/export des coûts OSPF
+COSTS_CSV_FIELDS = ("router_a", "iface_a", "router_b", "iface_b", "cost")
 
-def run_automation(gns3_file_path, ip_prefix, loopback_format="simple", advanced_options={}):
-    """
-    Exécute la logique d'automatisation avec les paramètres fournis.
-    """
 
-    gns3_file = Path(gns3_file_path)
-    project_dir = gns3_file.parent
-    
-    # Dossiers de travail
-    ROOT_DIR = Path(__file__).parent.absolute()
-    OUTPUT_CONFIGS_DIR = ROOT_DIR / "configs"
-    TOPOLOGY_JSON = ROOT_DIR / "topology.json"
-    
-    print("\n" + "="*60)
-    print(f"      DEMARRAGE AUTOMATISATION")
-    print(f"      Projet: {gns3_file.name}")
-    print(f"      Préfixe IP: {ip_prefix}")
-    print(f"      Format Loopback: {loopback_format}")
-    print("="*60)
-
-    # 1. EXTRACTION DE LA TOPOLOGIE
-    print(f"\n[1/4] Extraction de la topologie...")
-    topo_data = get_topology(
-        gns3_file, 
-        ip_base=ip_prefix, 
-        output_dir=ROOT_DIR, 
-        output_name="topology.json",
-        loopback_format=loopback_format
-    )
-    
-    if topo_data is None:
-        if TOPOLOGY_JSON.exists():
-            print("  ! Rechargement depuis topology.json existant...")
-            with open(TOPOLOGY_JSON, 'r', encoding='utf-8') as f:
-                topo_data = json.load(f)
-        else:
-            return False, "Impossible de charger la topologie."
+def export_costs_csv(path, links, costs):
+    """Écrit un coût par lien (liens de topology.json, coûts dans le même ordre)."""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(COSTS_CSV_FIELDS)
+        for link, cost in zip(links, costs):
+            writer.writerow((link["a"], link["a_iface"], link["b"], link["b_iface"], cost))
 
-    # 2. GENERATION DES CONFIGURATIONS
-    print("\n[2/4] Génération des configurations...")
-    if OUTPUT_CONFIGS_DIR.exists(): shutil.rmtree(OUTPUT_CONFIGS_DIR) 
-    OUTPUT_CONFIGS_DIR.mkdir(exist_ok=True)
 
-    print("  -> Génération RIP...")
-    gen_rip(TOPOLOGY_JSON, output_dir=OUTPUT_CONFIGS_DIR, options=advanced_options)
-    
-    print("  -> Génération OSPF...")
-    gen_ospf(TOPOLOGY_JSON, output_dir=OUTPUT_CONFIGS_DIR, options=advanced_options)
-    
-    # 3. VERIFICATION DU NOMBRE DE CONFIGURATIONS
-    print("\n[3/4] Vérification du nombre de configurations...")
-    count = len(list(OUTPUT_CONFIGS_DIR.glob("*.cfg")))
-    if count != len(topo_data.get("routers", [])):
-        print(f"  [AVERTISSEMENT] Nombre de configurations générées ({count}) ne correspond pas au nombre de routeurs dans la topologie ({len(topo_data.get('routers', []))}).")
-    else:
-        print(f"  Nombre de configurations générées : {count}")
-    
-    # 4. INJECTION DANS GNS3
-    print("\n[4/4] Injection dans le projet GNS3...")
-    injection_cfg(project_dir=str(project_dir), configs_dir=str(OUTPUT_CONFIGS_DIR))
-    
-    return True, f"Succès ! {count} configurations générées et injectées."
+def import_costs_csv(path, links):
+    """
+    Lit un CSV produit par export_costs_csv. Un lien est reconnu dans les deux sens.
+
+    Returns:
+        tuple: ({index du lien: coût}, nombre de lignes ne correspondant à aucun lien)
+    """
+    link_index = {}
+    for i, link in enumerate(links):
+        link_index[(link["a"], link["a_iface"], link["b"], link["b_iface"])] = i
+        link_index[(link["b"], link["b_iface"], link["a"], link["a_iface"])] = i
+
+    imported = {}
+    unknown = 0
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            i = link_index.get((row["router_a"], row["iface_a"], row["router_b"], row["iface_b"]))
+            if i is None:
+                unknown += 1
+                continue
+            cost = int(row["cost"])
+            if cost < 1:
+                raise ValueError(f"coût invalide ({cost}) pour {row['router_a']} {row['iface_a']}")
+            imported[i] = cost
+    return imported, unknown
 
 
 def show_tutorial(root):
@@ -169,6 +150,143 @@ def show_tutorial(root):
     root.wait_window(tuto)
 
 
+class ThreadLogStdout:
+    """
+    Remplaçant de sys.stdout, installé une seule fois : tout est écrit dans la
+    console d'origine, et les écritures d'un thread enregistré (register) sont
+    en plus recopiées vers sa fonction de journal. Les autres threads (Tk...)
+    ne sont pas concernés, contrairement à un redirect_stdout par exécution.
+    """
+
+    def __init__(self, console):
+        self.console = console
+        self.sinks = {}
+
+    def write(self, text):
+        written = self.console.write(text)
+        sink = self.sinks.get(threading.current_thread())
+        if sink is not None:
+            sink(text)
+        return written
+
+    def register(self, sink):
+        self.sinks[threading.current_thread()] = sink
+
+    def unregister(self):
+        self.sinks.pop(threading.current_thread(), None)
+
+    def __getattr__(self, name):
+        return getattr(self.console, name)
+
+
+def thread_log_stdout():
+    """Installe ThreadLogStdout comme sys.stdout au premier appel, puis le renvoie."""
+    if not isinstance(sys.stdout, ThreadLogStdout):
+        sys.stdout = ThreadLogStdout(sys.stdout)
+    return sys.stdout
+
+
+def run_with_progress(root, *args, **kwargs):
+    """
+    Lance run_automation(*args, **kwargs) dans un thread de travail et affiche
+    une fenêtre de progression (étape, routeurs traités, journal, annulation).
+    Le thread ne touche jamais Tk : il communique par une file que la boucle
+    Tk vide toutes les POLL_INTERVAL_MS millisecondes.
+
+    Returns:
+        tuple: (succès, message) de run_automation
+    """
+    events = queue.Queue()
+    cancel = threading.Event()
+    result = {}
+
+    stdout = thread_log_stdout()
+
+    def worker():
+        # Les print du pipeline sont recopiés dans la console et dans le journal de la fenêtre
+        stdout.register(lambda text: events.put(("log", text)))
+        try:
+            outcome = run_automation(
+                *args, **kwargs,
+                progress=lambda stage, done, total: events.put(("progress", stage, done, total)),
+                cancel=cancel
+            )
+        except BaseException as e:  # get_topology peut appeler exit()
+            outcome = (False, f"Erreur : {type(e).__name__}: {e}")
+        finally:
+            stdout.unregister()
+        events.put(("done",) + tuple(outcome))
+
+    win = tk.Toplevel(root)
+    win.title("Automatisation en cours")
+    win.geometry("700x450")
+    win.grab_set()
+
+    lbl_stage = ttk.Label(win, text="Démarrage...", font=("Arial", 10, "bold"))
+    lbl_stage.pack(anchor="w", padx=10, pady=(10, 2))
+    bar = ttk.Progressbar(win, mode="determinate", maximum=100)
+    bar.pack(fill="x", padx=10, pady=5)
+
+    frame_log = ttk.Frame(win)
+    frame_log.pack(fill="both", expand=True, padx=10, pady=5)
+    txt_log = tk.Text(frame_log, height=15, font=("Consolas", 9), state="disabled", wrap="none")
+    scroll_log = ttk.Scrollbar(frame_log, orient="vertical", command=txt_log.yview)
+    txt_log.configure(yscrollcommand=scroll_log.set)
+    txt_log.pack(side="left", fill="both", expand=True)
+    scroll_log.pack(side="right", fill="y")
+
+    def request_cancel():
+        cancel.set()
+        btn_cancel.config(state="disabled")
+        lbl_stage.config(text="Annulation en cours...")
+
+    btn_cancel = ttk.Button(win, text="Annuler", command=request_cancel)
+    btn_cancel.pack(pady=10)
+    win.protocol("WM_DELETE_WINDOW", request_cancel)
+
+    def poll():
+        # On vide toute la file, mais on ne redessine qu'une fois par tick
+        log_chunks = []
+        last_progress = None
+        try:
+            while True:
+                event = events.get_nowait()
+                if event[0] == "log":
+                    log_chunks.append(event[1])
+                elif event[0] == "progress":
+                    last_progress = event[1:]
+                else:
+                    result["outcome"] = event[1:]
+        except queue.Empty:
+            pass
+
+        if log_chunks:
+            txt_log.config(state="normal")
+            txt_log.insert("end", "".join(log_chunks))
+            extra = int(txt_log.index("end-1c").split(".")[0]) - MAX_LOG_LINES
+            if extra > 0:
+                txt_log.delete("1.0", f"{extra + 1}.0")
+            txt_log.see("end")
+            txt_log.config(state="disabled")
+
+        if last_progress is not None and not cancel.is_set():
+            stage, done, total = last_progress
+            index = STAGES.index(stage)
+            bar["value"] = 100 * (index + (done / total if total else 1)) / len(STAGES)
+            detail = f" ({done}/{total})" if total > 1 else ""
+            lbl_stage.config(text=f"[{index + 1}/{len(STAGES)}] {stage.capitalize()}{detail}")
+
+        if "outcome" in result:
+            win.destroy()
+        else:
+            win.after(POLL_INTERVAL_MS, poll)
+
+    threading.Thread(target=worker, name="automation-pipeline", daemon=True).start()
+    win.after(POLL_INTERVAL_MS, poll)
+    root.wait_window(win)
+    return result.get("outcome", (False, "Interrompu."))
+
+
 def main_gui():
     root = tk.Tk()
     root.withdraw() # Cacher la fenêtre principale vide
@@ -189,15 +307,11 @@ def main_gui():
 
     # --- ANALYSE PRELIMINAIRE DE LA STRUCTURE (AS/Routeurs) ---
     print("Analyse de la topologie pour détection des AS...")
-    # On utilise le répertoire racine du script
-    ROOT_DIR = Path(__file__).parent.absolute()
     
-    # On lance une extraction pour récupérer la liste des AS et on sauvegarde
-    # directement dans topology.json à la racine
+    # Seule la structure (AS, routeurs, liens) est extraite ici : elle est mise
+    # en cache et réutilisée par run_automation, qui ne calcule plus que l'adressage
     try:
-        topo_preview = get_topology(
-            file_path, ip_base="2000:1::/64", output_dir=ROOT_DIR, output_name="topology.json"
-        )
+        topo_preview = extract_structure(file_path)
         detected_as = set()
         router_as_map = []
         for r in topo_preview.get("routers", []):
@@ -222,6 +336,7 @@ def main_gui():
         config_results["enable_policies"] = var_policies.get()
         config_results["enable_metrics"] = var_metrics.get()
         config_results["secure_redist"] = var_redist.get()
+        config_results["route_reflectors"] = var_rr.get()
         config_results["bgp_policies"] = bgp_relations # On passe le dictionnaire des relations
         config_results["ospf_costs"] = ospf_costs
         config_win.destroy()
@@ -255,6 +370,12 @@ def main_gui():
     check_redist.pack(anchor="w", pady=5)
     ttk.Label(lf_advanced, text="   (Filtre les routes redistribuées pour éviter les boucles)", font=("Arial", 8, "italic"), foreground="gray").pack(anchor="w")
 
+    # 2a bis. iBGP par Route Reflectors (au lieu du full mesh)
+    var_rr = tk.BooleanVar(value=False)
+    check_rr = ttk.Checkbutton(lf_advanced, text="iBGP par Route Reflectors (au lieu du full mesh)", variable=var_rr)
+    check_rr.pack(anchor="w", pady=5)
+    ttk.Label(lf_advanced, text="   (RR élu par AS : routeur ayant le plus de liens internes)", font=("Arial", 8, "italic"), foreground="gray").pack(anchor="w")
+
     # 2b. BGP Policies (Gao-Rexford)
     var_policies = tk.BooleanVar(value=False)
     # Store relations: "100-200": "peer", "100-300": "customer" (from 100 pov)
@@ -428,76 +549,156 @@ def main_gui():
     def open_metrics_window():
         met_win = tk.Toplevel(config_win)
         met_win.title("Métriques OSPF - Tableau des Coûts")
-        met_win.geometry("700x500")
+        met_win.geometry("750x550")
         met_win.transient(config_win)
         met_win.grab_set()
 
-        ttk.Label(met_win, text="Tableau des Coûts OSPF (Défaut: 10)", font=("Arial", 10, "bold")).pack(pady=10)
+        ttk.Label(met_win, text="Tableau des Coûts OSPF (Défaut: 10) - double-clic pour modifier", font=("Arial", 10, "bold")).pack(pady=10)
 
-        # Container for the canvas and scrollbar
+        # Data : un coût par lien (index dans links_data), appliqué symétriquement à l'enregistrement
+        links_data = topo_preview.get("links", []) if topo_preview else []
+        router_as = {r["name"]: r.get("as_number") for r in (topo_preview.get("routers", []) if topo_preview else [])}
+        costs = []
+        labels = []
+        for link in links_data:
+            rA, ifA = link["a"], link["a_iface"]
+            rB, ifB = link["b"], link["b_iface"]
+            costs.append(ospf_costs.get(rA, {}).get(ifA, DEFAULT_OSPF_COST))
+            asA, asB = router_as.get(rA), router_as.get(rB)
+            as_text = str(asA or "?") if asA == asB else f"{asA or '?'}-{asB or '?'}"
+            labels.append((f"{rA} <--> {rB} ({ifA}) ({ifB})", as_text))
+
+        # Filtre (routeur, interface ou AS)
+        frame_filter = ttk.Frame(met_win)
+        frame_filter.pack(fill="x", padx=10)
+        ttk.Label(frame_filter, text="Filtre (routeur / AS) :").pack(side="left")
+        var_filter = tk.StringVar()
+        ttk.Entry(frame_filter, textvariable=var_filter).pack(side="left", fill="x", expand=True, padx=5)
+        lbl_count = ttk.Label(frame_filter, text="")
+        lbl_count.pack(side="left")
+
+        # Treeview : une ligne légère par lien, aucun widget par ligne
         container = ttk.Frame(met_win)
         container.pack(fill="both", expand=True, padx=10, pady=5)
-        
-        canvas = tk.Canvas(container)
-        scrollbar = ttk.Scrollbar(container, orient="vertical", command=canvas.yview)
-        scrollable_frame = ttk.Frame(canvas)
+        tree = ttk.Treeview(container, columns=("link", "as", "cost"), show="headings", selectmode="extended")
+        tree.heading("link", text="Lien (Connexion)")
+        tree.heading("as", text="AS")
+        tree.heading("cost", text="Coût")
+        tree.column("link", width=480)
+        tree.column("as", width=90, anchor="center")
+        tree.column("cost", width=80, anchor="center")
+        scrollbar = ttk.Scrollbar(container, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        tree.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
 
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
+        def refresh_rows():
+            tree.delete(*tree.get_children())
+            needle = var_filter.get().strip().lower()
+            for i, (label, as_text) in enumerate(labels):
+                if needle and needle not in label.lower() and needle not in as_text:
+                    continue
+                tree.insert("", "end", iid=str(i), values=(label, as_text, costs[i]))
+            lbl_count.config(text=f"{len(tree.get_children())}/{len(labels)} liens")
+
+        filter_job = []
+        def on_filter_change(*_):
+            # Anti-rebond : on ne refiltre qu'après une courte pause de frappe
+            if filter_job:
+                met_win.after_cancel(filter_job.pop())
+            filter_job.append(met_win.after(150, refresh_rows))
+        var_filter.trace_add("write", on_filter_change)
+
+        def set_cost(iid, val):
+            costs[int(iid)] = val
+            tree.set(iid, "cost", val)
+
+        def parse_cost(text):
+            try:
+                val = int(text)
+            except ValueError:
+                val = 0
+            if val < 1:
+                messagebox.showerror("Erreur", "Le coût doit être un entier positif.", parent=met_win)
+                return None
+            return val
+
+        # Edition en place : un seul Entry, posé sur la cellule double-cliquée
+        def on_double_click(event):
+            iid = tree.identify_row(event.y)
+            if not iid or tree.identify_column(event.x) != "#3":
+                return
+            bbox = tree.bbox(iid, "cost")
+            if not bbox:
+                return
+            x, y, w, h = bbox
+            editor = ttk.Entry(tree, justify="center")
+            editor.insert(0, str(costs[int(iid)]))
+            editor.select_range(0, "end")
+            editor.place(x=x, y=y, width=w, height=h)
+            editor.focus_set()
+
+            def commit(_event=None):
+                # <Return> puis <FocusOut> : l'éditeur peut déjà être détruit
+                if not editor.winfo_exists():
+                    return
+                val = parse_cost(editor.get())
+                if val is not None:
+                    set_cost(iid, val)
+                editor.destroy()
+
+            editor.bind("<Return>", commit)
+            editor.bind("<FocusOut>", commit)
+            editor.bind("<Escape>", lambda e: editor.destroy())
+        tree.bind("<Double-1>", on_double_click)
+        tree.bind("<Control-a>", lambda e: tree.selection_set(tree.get_children()))
+
+        # Modification groupée
+        frame_bulk = ttk.Frame(met_win)
+        frame_bulk.pack(fill="x", padx=10, pady=5)
+        ttk.Label(frame_bulk, text="Coût :").pack(side="left")
+        entry_bulk = ttk.Entry(frame_bulk, width=8)
+        entry_bulk.insert(0, str(DEFAULT_OSPF_COST))
+        entry_bulk.pack(side="left", padx=5)
+
+        def apply_bulk(iids):
+            val = parse_cost(entry_bulk.get())
+            if val is None:
+                return
+            for iid in iids:
+                set_cost(iid, val)
 
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
+        ttk.Button(frame_bulk, text="Appliquer à la sélection", command=lambda: apply_bulk(tree.selection())).pack(side="left", padx=2)
+        ttk.Button(frame_bulk, text="Appliquer aux liens affichés", command=lambda: apply_bulk(tree.get_children())).pack(side="left", padx=2)
 
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
-        
-        # Pour activer le scroll avec la molette souris
-        def on_mousewheel(event):
-            canvas.yview_scroll(int(-1*(event.delta/120)), "units")
-        canvas.bind_all("<MouseWheel>", on_mousewheel)
+        # Import / export CSV
+        def do_export():
+            path = filedialog.asksaveasfilename(parent=met_win, defaultextension=".csv", filetypes=[("CSV", "*.csv")])
+            if path:
+                export_costs_csv(path, links_data, costs)
 
-        # Headers
-        ttk.Label(scrollable_frame, text="Lien (Connexion)", font=("Arial", 9, "bold")).grid(row=0, column=0, padx=5, pady=5, sticky="w")
-        ttk.Label(scrollable_frame, text="Coût", font=("Arial", 9, "bold")).grid(row=0, column=1, padx=5, pady=5, sticky="w")
+        def do_import():
+            path = filedialog.askopenfilename(parent=met_win, filetypes=[("CSV", "*.csv"), ("All Files", "*.*")])
+            if not path:
+                return
+            try:
+                imported, unknown = import_costs_csv(path, links_data)
+            except (OSError, ValueError, KeyError) as e:
+                messagebox.showerror("Erreur", f"Import impossible : {e}", parent=met_win)
+                return
+            for i, val in imported.items():
+                costs[i] = val
+            refresh_rows()
+            messagebox.showinfo("Import CSV", f"{len(imported)} coûts importés, {unknown} lignes ignorées (lien inconnu).", parent=met_win)
 
-        # Data
-        links_data = topo_preview.get("links", []) if topo_preview else []
-        link_entries = [] # To store (link_obj, entry_widget)
+        ttk.Button(frame_bulk, text="Exporter CSV...", command=do_export).pack(side="right", padx=2)
+        ttk.Button(frame_bulk, text="Importer CSV...", command=do_import).pack(side="right", padx=2)
 
-        for i, link in enumerate(links_data):
-            rA, ifA = link["a"], link["a_iface"]
-            rB, ifB = link["b"], link["b_iface"]
-            
-            label_text = f"{rA} <--> {rB} ({ifA}) ({ifB})"
-            
-            # Check if there is already a cost defined in ospf_costs for rA side
-            current_cost = 10
-            if rA in ospf_costs and ifA in ospf_costs[rA]:
-                current_cost = ospf_costs[rA][ifA]
-            
-            lbl = ttk.Label(scrollable_frame, text=label_text)
-            lbl.grid(row=i+1, column=0, padx=5, pady=2, sticky="w")
-            
-            ent = ttk.Entry(scrollable_frame, width=10)
-            ent.insert(0, str(current_cost))
-            ent.grid(row=i+1, column=1, padx=5, pady=2)
-            
-            link_entries.append((link, ent))
-            
         def save_metrics():
             # Reset
             ospf_costs.clear()
             
-            error_flag = False
-            for link, ent in link_entries:
-                try:
-                    val = int(ent.get())
-                except ValueError:
-                    error_flag = True
-                    break
-                
+            for link, val in zip(links_data, costs):
                 # Apply symmetry
                 rA, ifA = link["a"], link["a_iface"]
                 rB, ifB = link["b"], link["b_iface"]
@@ -509,15 +710,10 @@ def main_gui():
                 # Storing everything is safer for the generator logic.
                 ospf_costs[rA][ifA] = val
                 ospf_costs[rB][ifB] = val
-            
-            if error_flag:
-                messagebox.showerror("Erreur", "Tous les coûts doivent être des entiers valides.")
-                return
 
-            # Cleanup bindings
-            canvas.unbind_all("<MouseWheel>")
             met_win.destroy()
 
+        refresh_rows()
         ttk.Button(met_win, text="Enregistrer & Fermer", command=save_metrics).pack(pady=10)
 
     def toggle_metrics_options():
@@ -556,12 +752,13 @@ def main_gui():
     # Construction du dictionnaire d'options
     advanced_options = {
         "secure_redist": config_results["secure_redist"],
+        "ibgp_mode": "route_reflector" if config_results["route_reflectors"] else "full_mesh",
         "policies_enabled": config_results["enable_policies"],
         "bgp_relations": config_results.get("bgp_policies", {}),
         "ospf_costs": config_results.get("ospf_costs", {})
     }
     
-    success, message = run_automation(file_path, ip_base, loopback_choice, advanced_options)
+    success, message = run_with_progress(root, file_path, ip_base, loopback_choice, advanced_options)
     
     if success:
         messagebox.showinfo("Terminé", message)
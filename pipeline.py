@@ -0,0 +1,231 @@
+"""
+Pipeline d'automatisation, sans interface graphique :
+extraction de la topologie -> génération des configurations -> injection GNS3.
+Utilisé par la GUI (main.py) et par la ligne de commande (cli.py).
+"""
+
+import contextlib
+import shutil
+from pathlib import Path
+
+# Imports des modules
+from get_topology.get_topology import get_topology, save_topology
+from gen_config_bgp.bgp_gen import generate_bgp_configs, MANIFEST_NAME
+from injection_cfgs.injection_cfgs import injection_cfg
+from gns3_project import missing_startup_configs
+from topology_model import topology_from_dict
+from serialization import load_file, check_format, EXTENSIONS
+from instrumentation import (
+    new_report, stage, add_counters, save_report, save_chrome_trace, cprofiled,
+    REPORT_NAME, TRACE_NAME, PSTATS_NAME
+)
+
+
+# Étapes signalées au callback de progression, dans l'ordre
+STAGES = ("topologie", "generation", "verification", "injection")
+
+
+def run_automation(gns3_file_path, ip_prefix, loopback_format="simple", advanced_options={}, workers=1,
+                   output_dir=None, inject=True, progress=None, cancel=None, profile=None,
+                   topology_format="pretty", dirty_routers=None, inject_threads=1, write_topology=True):
+    """
+    Exécute la logique d'automatisation avec les paramètres fournis.
+    workers : nombre de processus utilisés pour le rendu des configurations.
+    output_dir : dossier recevant configs/ et topology.json (défaut : racine du dépôt).
+    inject : si False, les configurations sont générées sans être injectées dans GNS3.
+    progress : callable progress(etape, fait, total) optionnel (etape parmi STAGES),
+        appelé depuis le thread qui exécute le pipeline.
+    cancel : threading.Event optionnel ; vérifié entre les étapes et entre deux routeurs.
+    profile : None, "cprofile" (pipeline.pstats) ou "chrome" (pipeline_trace.json).
+    topology_format : "pretty" (défaut), "compact" ou "msgpack" (topology.msgpack).
+    dirty_routers : None (tout injecter) ou ensemble de routeurs à réinjecter en plus de
+        ceux dont la configuration vient d'être régénérée (mode watch, voir watch.py).
+    inject_threads : threads d'E/S de l'injection (1 = séquentielle, voir injection_cfg).
+    write_topology : si False, topology.json (sortie annexe) n'est pas écrit.
+
+    Un rapport (temps par étape, compteurs) est toujours écrit dans
+    <output_dir>/pipeline_report.json, même en cas d'échec ou d'annulation.
+    """
+    ROOT_DIR = Path(output_dir) if output_dir is not None else Path(__file__).parent.absolute()
+    ROOT_DIR.mkdir(parents=True, exist_ok=True)
+
+    metrics = new_report(
+        project=str(Path(gns3_file_path)), ip_base=ip_prefix, loopback_format=loopback_format,
+        workers=workers, inject=inject, inject_threads=inject_threads, write_topology=write_topology
+    )
+    success, message = False, "Interrompu."
+    try:
+        with contextlib.ExitStack() as stack:
+            if profile == "cprofile":
+                stack.enter_context(cprofiled(str(ROOT_DIR / PSTATS_NAME)))
+            success, message = _run_stages(
+                gns3_file_path, ip_prefix, loopback_format, advanced_options, workers,
+                ROOT_DIR, inject, progress, cancel, metrics, topology_format, dirty_routers, inject_threads,
+                write_topology
+            )
+    finally:
+        metrics["meta"]["success"] = success
+        metrics["meta"]["message"] = message
+        save_report(metrics, ROOT_DIR / REPORT_NAME)
+        if profile == "chrome":
+            save_chrome_trace(metrics, ROOT_DIR / TRACE_NAME)
+
+        print("\nTemps par étape (réel / CPU) :")
+        for name, timing in metrics["stages"].items():
+            print(f"  {name:<24} {timing['wall_s']:8.3f} s / {timing['cpu_s']:8.3f} s")
+        print(f"Rapport : {ROOT_DIR / REPORT_NAME}")
+    return success, message
+
+
+def _run_stages(gns3_file_path, ip_prefix, loopback_format, advanced_options, workers,
+                ROOT_DIR, inject, progress, cancel, metrics, topology_format="pretty", dirty_routers=None,
+                inject_threads=1, write_topology=True):
+    """Étapes du pipeline (voir run_automation), chronométrées dans metrics."""
+
+    def notify(stage, done=0, total=1):
+        if progress is not None:
+            progress(stage, done, total)
+
+    def cancelled():
+        return cancel is not None and cancel.is_set()
+
+    gns3_file = Path(gns3_file_path)
+    project_dir = gns3_file.parent
+    
+    try:
+        check_format(topology_format)
+    except ValueError as e:
+        return False, f"Format de topologie invalide : {e}"
+
+    # Dossiers de travail
+    OUTPUT_CONFIGS_DIR = ROOT_DIR / "configs"
+    TOPOLOGY_JSON = (ROOT_DIR / "topology").with_suffix(EXTENSIONS[topology_format])
+    
+    print("\n" + "="*60)
+    print(f"      DEMARRAGE AUTOMATISATION")
+    print(f"      Projet: {gns3_file.name}")
+    print(f"      Préfixe IP: {ip_prefix}")
+    print(f"      Format Loopback: {loopback_format}")
+    print("="*60)
+
+    # 1. EXTRACTION DE LA TOPOLOGIE
+    # La topologie reste en mémoire et est passée directement aux générateurs ;
+    # topology.json n'est qu'une sortie annexe, écrite en arrière-plan (sauf write_topology=False).
+    print(f"\n[1/4] Extraction de la topologie...")
+    notify("topologie")
+    with stage(metrics, "topologie"):
+        topo_data = get_topology(
+            gns3_file, 
+            ip_base=ip_prefix, 
+            loopback_format=loopback_format,
+            write_file=False
+        )
+    
+    topo_writer = None
+    if topo_data is not None:
+        if write_topology:
+            topo_writer = save_topology(topo_data, TOPOLOGY_JSON, background=True, fmt=topology_format)
+    else:
+        if TOPOLOGY_JSON.exists():
+            print(f"  ! Rechargement depuis {TOPOLOGY_JSON.name} existant...")
+            topo_data = topology_from_dict(load_file(TOPOLOGY_JSON))
+        else:
+            return False, "Impossible de charger la topologie."
+    notify("topologie", 1, 1)
+    add_counters(metrics, routers=len(topo_data.routers), links=len(topo_data.links))
+
+    if cancelled():
+        if topo_writer is not None:
+            topo_writer.join()
+        return False, "Annulé par l'utilisateur."
+
+    # 2. GENERATION DES CONFIGURATIONS
+    print("\n[2/4] Génération des configurations...")
+    # Régénération incrémentale : seuls les routeurs dont les entrées ont changé
+    # sont re-rendus. Sans manifeste (premier lancement), on repart d'un dossier propre.
+    if OUTPUT_CONFIGS_DIR.exists() and not (OUTPUT_CONFIGS_DIR / MANIFEST_NAME).exists():
+        shutil.rmtree(OUTPUT_CONFIGS_DIR)
+    OUTPUT_CONFIGS_DIR.mkdir(exist_ok=True)
+
+    # Un seul passage sur la topologie pour tous les IGP (RIP et OSPF)
+    print("  -> Génération RIP + OSPF...")
+    notify("generation")
+    with stage(metrics, "generation"):
+        summary = generate_bgp_configs(
+            topo_data, output_dir=OUTPUT_CONFIGS_DIR, options=advanced_options, workers=workers, incremental=True,
+            progress=lambda done, total: notify("generation", done, total), cancel=cancel
+        )
+    add_counters(
+        metrics,
+        ibgp_neighbors=summary["neighbors"]["ibgp"], ebgp_neighbors=summary["neighbors"]["ebgp"],
+        configs_rendered=len(summary["added"]) + len(summary["changed"]),
+        configs_unchanged=len(summary["unchanged"]), configs_removed=len(summary["removed"]),
+        bytes_written=summary["bytes_written"]
+    )
+    # Router IDs / loopbacks partagés : sessions BGP cassées, signalés dans le rapport
+    collisions = summary["identity_collisions"]
+    add_counters(
+        metrics, router_id_collisions=len(collisions["router_id"]), loopback_collisions=len(collisions["loopback"])
+    )
+    if collisions["router_id"] or collisions["loopback"]:
+        metrics["meta"]["identity_collisions"] = collisions
+    if summary["cancelled"]:
+        if topo_writer is not None:
+            topo_writer.join()
+        return False, "Annulé par l'utilisateur (génération interrompue)."
+    
+    # 3. VERIFICATION DU NOMBRE DE CONFIGURATIONS
+    print("\n[3/4] Vérification du nombre de configurations...")
+    notify("verification")
+    with stage(metrics, "verification"):
+        count = len(list(OUTPUT_CONFIGS_DIR.glob("*.cfg")))
+        # Index des startup-configs du projet, réutilisé (en cache) par l'injection
+        missing = missing_startup_configs(gns3_file, {r.name for r in topo_data.routers}) if inject else []
+    if count != len(topo_data.routers):
+        print(f"  [AVERTISSEMENT] Nombre de configurations générées ({count}) ne correspond pas au nombre de routeurs dans la topologie ({len(topo_data.routers)}).")
+    else:
+        print(f"  Nombre de configurations générées : {count}")
+    if collisions["router_id"] or collisions["loopback"]:
+        print(f"  [AVERTISSEMENT] {len(collisions['router_id'])} router-id et {len(collisions['loopback'])} loopback(s) "
+              f"partagés par plusieurs routeurs (détail dans {REPORT_NAME})")
+    if missing:
+        shown = ", ".join(sorted(missing)[:10]) + (", ..." if len(missing) > 10 else "")
+        print(f"  [AVERTISSEMENT] {len(missing)} routeur(s) sans iX_startup-config.cfg dans le projet "
+              f"(nœud jamais démarré ?) : {shown}")
+    notify("verification", 1, 1)
+    
+    # 4. INJECTION DANS GNS3
+    if inject:
+        print("\n[4/4] Injection dans le projet GNS3...")
+        notify("injection")
+        # Mode watch : seuls les routeurs régénérés, ajoutés ou renommés sont réinjectés
+        routers = None
+        if dirty_routers is not None:
+            routers = set(dirty_routers) | set(summary["added"]) | set(summary["changed"])
+        with stage(metrics, "injection"):
+            injected = injection_cfg(
+                project_dir=str(project_dir), configs_dir=str(OUTPUT_CONFIGS_DIR), gns3_file=str(gns3_file),
+                progress=lambda done, total: notify("injection", done, total), cancel=cancel,
+                routers=routers, threads=inject_threads
+            )
+        if injected is not None:
+            add_counters(
+                metrics, files_copied=len(injected["copied"]),
+                files_skipped=len(injected["skipped"]), injection_errors=len(injected["errors"])
+            )
+    else:
+        print("\n[4/4] Injection ignorée.")
+        notify("injection", 1, 1)
+
+    if topo_writer is not None:
+        with stage(metrics, "ecriture_topology_json"):
+            topo_writer.join()
+
+    if cancelled():
+        return False, "Annulé par l'utilisateur (injection interrompue)."
+    
+    n_collisions = len(collisions["router_id"]) + len(collisions["loopback"])
+    warning = f" {n_collisions} collision(s) de router-id/loopback, voir le journal." if n_collisions else ""
+    if not inject:
+        return True, f"Succès ! {count} configurations générées dans {OUTPUT_CONFIGS_DIR}.{warning}"
+    return True, f"Succès ! {count} configurations générées et injectées.{warning}"
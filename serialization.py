@@ -0,0 +1,136 @@
+"""
+Sérialisation de topology.json (et des autres fichiers JSON du pipeline).
+
+Le backend JSON est choisi à l'import : orjson, sinon msgspec, sinon le module
+json standard. Deux modes texte sont proposés :
+  - "pretty"  : indentation de 2 espaces (le format historique de topology.json),
+  - "compact" : sans indentation ni espaces, plus rapide à écrire et à relire.
+Un format binaire MessagePack ("msgpack", via msgspec ou msgpack) est
+disponible pour les échanges entre machines ; il n'a pas de repli standard.
+
+Tous les backends produisent le même JSON pour les données du pipeline
+(chaînes UTF-8 non échappées, pas de flottants).
+"""
+import json
+import os
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:  # Dépendance optionnelle
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # Dépendance optionnelle
+    msgspec = None
+
+try:
+    import msgpack
+except ImportError:  # Dépendance optionnelle
+    msgpack = None
+
+if orjson is not None:
+    JSON_BACKEND = "orjson"
+elif msgspec is not None:
+    JSON_BACKEND = "msgspec"
+else:
+    JSON_BACKEND = "json"
+
+if msgspec is not None:
+    MSGPACK_BACKEND = "msgspec"
+elif msgpack is not None:
+    MSGPACK_BACKEND = "msgpack"
+else:
+    MSGPACK_BACKEND = None
+
+FORMATS = ("pretty", "compact", "msgpack")
+
+# Extension de fichier par format
+EXTENSIONS = {"pretty": ".json", "compact": ".json", "msgpack": ".msgpack"}
+
+
+def dumps(data, fmt="pretty", backend=None):
+    """
+    Sérialise data en octets.
+
+    Args:
+        fmt (str): "pretty", "compact" ou "msgpack"
+        backend (str): Forcer un backend JSON ("orjson", "msgspec", "json") ;
+            par défaut le plus rapide disponible
+    """
+    check_format(fmt)
+    if fmt == "msgpack":
+        return _msgpack_dumps(data)
+
+    backend = backend or JSON_BACKEND
+    pretty = fmt == "pretty"
+    if backend == "orjson":
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if backend == "msgspec":
+        raw = msgspec.json.encode(data)
+        return msgspec.json.format(raw, indent=2) if pretty else raw
+    if backend == "json":
+        if pretty:
+            text = json.dumps(data, indent=2, ensure_ascii=False)
+        else:
+            text = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+        return text.encode("utf-8")
+    raise ValueError(f"backend JSON inconnu : {backend}")
+
+
+def loads(raw, fmt="json", backend=None):
+    """Désérialise des octets (ou une chaîne JSON) ; fmt = "json" ou "msgpack"."""
+    if fmt == "msgpack":
+        return _msgpack_loads(raw)
+
+    backend = backend or JSON_BACKEND
+    if backend == "orjson":
+        return orjson.loads(raw)
+    if backend == "msgspec":
+        return msgspec.json.decode(raw)
+    if backend == "json":
+        return json.loads(raw)
+    raise ValueError(f"backend JSON inconnu : {backend}")
+
+
+def check_format(fmt):
+    """Lève ValueError si le format est inconnu ou si son backend n'est pas installé."""
+    if fmt not in FORMATS:
+        raise ValueError(f"format inconnu : {fmt} (attendu : {', '.join(FORMATS)})")
+    if fmt == "msgpack" and MSGPACK_BACKEND is None:
+        raise ValueError("MessagePack indisponible : installez msgspec ou msgpack")
+
+
+def _msgpack_dumps(data):
+    check_format("msgpack")
+    if MSGPACK_BACKEND == "msgspec":
+        return msgspec.msgpack.encode(data)
+    return msgpack.packb(data, use_bin_type=True)
+
+
+def _msgpack_loads(raw):
+    check_format("msgpack")
+    if MSGPACK_BACKEND == "msgspec":
+        return msgspec.msgpack.decode(raw)
+    return msgpack.unpackb(raw, raw=False)
+
+
+def format_of(path):
+    """Format de lecture déduit de l'extension (.msgpack/.mpk -> "msgpack", sinon "json")."""
+    return "msgpack" if Path(path).suffix.lower() in (".msgpack", ".mpk") else "json"
+
+
+def dump_file(data, path, fmt="pretty"):
+    """Écrit data dans path de façon atomique (fichier temporaire + rename)."""
+    raw = dumps(data, fmt)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(raw)
+    os.replace(tmp_path, path)
+
+
+def load_file(path):
+    """Lit un fichier JSON ou MessagePack (format déduit de l'extension)."""
+    with open(path, "rb") as f:
+        return loads(f.read(), format_of(path))
@@ -0,0 +1,50 @@
+"""
+ip_allocator.allocate_links : adresses du plan mnémotechnique, et liens hors
+plan (AS ou ID > 9999, base trop longue) signalés sans interrompre l'adressage.
+"""
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from get_topology.ip_allocator import allocate_links
+
+NODE_TO_ID = {"R1": 1, "R2": 2, "R3": 3, "R12345": 12345}
+
+
+def link(a, b):
+    return {"a": a, "a_iface": "GigabitEthernet1/0", "b": b, "b_iface": "GigabitEthernet2/0"}
+
+
+def test_plan_addresses():
+    router_to_as = {"R1": {"as_number": 100}, "R2": {"as_number": 100}, "R3": {"as_number": 200}}
+    allocations, collisions, overflows = allocate_links(
+        [link("R1", "R2"), link("R2", "R3")], NODE_TO_ID, router_to_as, "2000:1::/64"
+    )
+    assert allocations == [
+        ("2000:1:100:1:2::1", "2000:1:100:1:2::2", 80, "2000:1:100:1:2::/80"),
+        ("2000:1:0:100:200:2:3:2", "2000:1:0:100:200:2:3:3", 112, "2000:1:0:100:200:2:3::/112"),
+    ]
+    assert collisions == [] and overflows == []
+
+
+def test_intra_as_overflow_is_reported():
+    router_to_as = {"R1": {"as_number": 10000}, "R2": {"as_number": 10000}, "R3": {"as_number": 200}}
+    links = [link("R1", "R2"), link("R2", "R3")]
+    allocations, _, overflows = allocate_links(links, NODE_TO_ID, router_to_as, "2000:1::/64")
+    # Intra-AS : pas de repli, le lien reste non adressé ; inter-AS : repli 2001:FFFF:
+    assert allocations[0] is None
+    assert allocations[1][3] == "2001:FFFF:200:10000::/64"
+    assert [(l, fallback) for l, _, fallback in overflows] == [
+        (links[0], None), (links[1], "2001:FFFF:200:10000::/64")
+    ]
+    assert "AS10000" in overflows[0][1]
+
+
+def test_inter_as_overflow_falls_back_and_is_reported():
+    router_to_as = {"R1": {"as_number": 100}, "R3": {"as_number": 200}, "R12345": {"as_number": 200}}
+    allocations, _, overflows = allocate_links(
+        [link("R1", "R3"), link("R1", "R12345")], NODE_TO_ID, router_to_as, "2000:1:2::/48"
+    )
+    assert allocations[0] == ("2001:FFFF:100:200::1", "2001:FFFF:100:200::3", 112, "2001:FFFF:100:200::/64")
+    assert [fallback for _, _, fallback in overflows] == ["2001:FFFF:100:200::/64"] * 2
+    assert "2 blocs" in overflows[0][1]
@@ -0,0 +1,110 @@
+"""
+live_push.push_configs contre les consoles factices de benchmarks/fake_console.py :
+résultat par routeur pour un envoi réussi, une console muette puis reprise,
+une commande refusée ("% Invalid input") et une console perdue en cours de
+configuration (routeur partiel, commandes non renvoyées).
+"""
+import json
+import socket
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent.parent / "benchmarks"))
+from live_push.live_push import push_configs, config_commands
+from fake_console import new_state, run_in_thread
+
+TIMEOUT_S = 1.0
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def router_config(name):
+    return (
+        f"hostname {name}\n"
+        "!\n"
+        "interface GigabitEthernet1/0\n"
+        " ipv6 address 2001:DB8::1/64\n"
+        " ipv6 enable\n"
+        "!\n"
+        "router bgp 100\n"
+        " neighbor 2001:DB8::2 remote-as 200\n"
+        "!\n"
+        "end\n"
+    )
+
+
+@pytest.fixture
+def project(tmp_path):
+    """Projet .gns3 à une console par routeur, configurations dans configs/."""
+    names = ["R1", "R2", "R3", "R4"]
+    ports = {name: free_port() for name in names}
+    nodes = [
+        {"name": name, "node_id": f"id-{name}", "node_type": "dynamips", "console": port, "console_type": "telnet"}
+        for name, port in ports.items()
+    ]
+    gns3_file = tmp_path / "test.gns3"
+    gns3_file.write_text(json.dumps({"name": "test", "topology": {"nodes": nodes, "links": []}}))
+    configs_dir = tmp_path / "configs"
+    configs_dir.mkdir()
+    for name in names:
+        text = router_config(name)
+        if name == "R3":
+            text = text.replace(" ipv6 enable\n", " ipv6 enable\n bogus command\n")
+        (configs_dir / f"{name}.cfg").write_text(text)
+    return gns3_file, configs_dir, ports
+
+
+def test_push_configs_results(project):
+    gns3_file, configs_dir, ports = project
+    states = {
+        ports["R1"]: new_state(),
+        ports["R2"]: new_state(silent_connections=1),
+        ports["R3"]: new_state(invalid=("bogus",)),
+        ports["R4"]: new_state(stall_after=2),
+    }
+    stop = run_in_thread(states)
+    try:
+        summary = push_configs(str(gns3_file), str(configs_dir), timeout=TIMEOUT_S, retries=1)
+    finally:
+        stop()
+    results = {r["router"]: r for r in summary["results"]}
+    expected = config_commands(router_config("R1"))
+
+    # Envoi normal
+    r1 = states[ports["R1"]]
+    assert results["R1"]["status"] == "ok"
+    assert results["R1"]["attempts"] == 1
+    assert r1["received"] == expected and r1["saved"]
+
+    # Console muette avant "configure terminal" : reprise, configuration envoyée une fois
+    r2 = states[ports["R2"]]
+    assert results["R2"]["status"] == "ok"
+    assert results["R2"]["attempts"] == 2
+    assert r2["connections"] == 2
+    assert r2["received"] == config_commands(router_config("R2")) and r2["saved"]
+
+    # Commande refusée : erreur rattachée à la commande, pas de write memory
+    r3 = states[ports["R3"]]
+    assert results["R3"]["status"] == "error"
+    assert results["R3"]["attempts"] == 1
+    assert any(e.startswith("bogus command -> % Invalid input") for e in results["R3"]["errors"])
+    assert not r3["saved"]
+
+    # Console perdue après la 2e commande : partiel, la 1re seule est acquittée, pas de reprise
+    r4 = states[ports["R4"]]
+    assert results["R4"]["status"] == "partial"
+    assert results["R4"]["attempts"] == 1
+    assert results["R4"]["last_acked"] == 0
+    assert r4["connections"] == 1 and not r4["saved"]
+
+    assert summary["ok"] == ["R1", "R2"]
+    assert summary["errors"] == ["R3"]
+    assert summary["partial"] == ["R4"]
+    assert summary["missing"] == []
@@ -0,0 +1,97 @@
+"""
+serialization : aller-retour dict -> octets -> dict pour chaque backend JSON
+installé et chaque format, Topology -> fichier -> Topology, et erreur propre
+quand MessagePack n'est pas installé (pas de repli standard).
+"""
+import io
+import sys
+from contextlib import redirect_stdout
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent.parent / "benchmarks"))
+import serialization
+from serialization import dumps, loads, dump_file, load_file, check_format, EXTENSIONS
+from get_topology.get_topology import get_topology
+from topology_model import topology_from_dict, topology_to_dict
+from synthetic_gns3 import generate_project
+
+JSON_BACKENDS = [
+    pytest.param(name, marks=pytest.mark.skipif(
+        name != "json" and getattr(serialization, name) is None, reason=f"{name} non installé"
+    ))
+    for name in ("json", "orjson", "msgspec")
+]
+MSGPACK_BACKENDS = [
+    pytest.param(name, marks=pytest.mark.skipif(getattr(serialization, name) is None, reason=f"{name} non installé"))
+    for name in ("msgspec", "msgpack")
+]
+
+DATA = {
+    "routers": {"R1": {"asn": 65001, "loopback": "2001:DB8::1/128", "rr": True, "cluster": None}},
+    "links": [["R1", "GigabitEthernet1/0", "R2", "GigabitEthernet1/0"]],
+    "description": "réseau d'essai",
+    "empty": {},
+}
+
+
+@pytest.fixture(scope="module")
+def topology(tmp_path_factory):
+    tmp = tmp_path_factory.mktemp("topology")
+    with redirect_stdout(io.StringIO()):
+        gns3_file = generate_project(str(tmp), node_dirs=False, n_routers=30, n_as=3)
+        return get_topology(gns3_file, loopback_format="with_as", write_file=False)
+
+
+@pytest.mark.parametrize("fmt", ["pretty", "compact"])
+@pytest.mark.parametrize("backend", JSON_BACKENDS)
+def test_json_round_trip(backend, fmt):
+    raw = dumps(DATA, fmt, backend=backend)
+    assert isinstance(raw, bytes)
+    assert loads(raw, "json", backend=backend) == DATA
+    # Tous les backends produisent les mêmes octets (UTF-8 non échappé)
+    assert raw == dumps(DATA, fmt, backend="json")
+
+
+@pytest.mark.parametrize("backend", MSGPACK_BACKENDS)
+def test_msgpack_round_trip(backend, monkeypatch):
+    monkeypatch.setattr(serialization, "MSGPACK_BACKEND", backend)
+    raw = dumps(DATA, "msgpack")
+    assert loads(raw, "msgpack") == DATA
+
+
+@pytest.mark.parametrize("fmt", serialization.FORMATS)
+def test_topology_file_round_trip(topology, fmt, tmp_path):
+    if fmt == "msgpack" and serialization.MSGPACK_BACKEND is None:
+        pytest.skip("MessagePack non installé")
+    data = topology_to_dict(topology)
+    path = tmp_path / f"topology{EXTENSIONS[fmt]}"
+    dump_file(data, path, fmt)
+    reloaded = topology_from_dict(load_file(path))
+    assert topology_to_dict(reloaded) == data
+    assert [r.name for r in reloaded.routers] == [r.name for r in topology.routers]
+    assert len(reloaded.links) == len(topology.links)
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_msgpack_unavailable(monkeypatch, tmp_path):
+    monkeypatch.setattr(serialization, "MSGPACK_BACKEND", None)
+    with pytest.raises(ValueError, match="MessagePack indisponible"):
+        check_format("msgpack")
+    with pytest.raises(ValueError, match="MessagePack indisponible"):
+        dumps(DATA, "msgpack")
+    with pytest.raises(ValueError, match="MessagePack indisponible"):
+        dump_file(DATA, tmp_path / "topology.msgpack", "msgpack")
+    assert not list(tmp_path.iterdir())
+    # Les formats texte restent disponibles
+    check_format("pretty")
+    check_format("compact")
+
+
+def test_unknown_format_and_backend():
+    with pytest.raises(ValueError, match="format inconnu"):
+        check_format("yaml")
+    with pytest.raises(ValueError, match="backend JSON inconnu"):
+        dumps(DATA, "compact", backend="simplejson")
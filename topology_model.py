@@ -0,0 +1,207 @@
+"""
+Typed, slotted topology model shared by get_topology and the generators.
+
+Routers, interfaces and BGP neighbors are __slots__ dataclasses (no per-object
+__dict__) and router/interface names are interned, so that the same name
+string is shared by the router, its interfaces and every link endpoint.
+Links are stored column-wise in a LinkTable: four arrays of indexes into an
+interned name table instead of one dict per link.
+
+topology_from_dict / topology_to_dict convert from/to the topology.json schema:
+    {"ip_base", "loopback_format",
+     "routers": [{"name", "protocol", "as_number", "ebgp", "interfaces": [{"name", "ip", "prefix"}], "networks"}],
+     "links": [{"a", "a_iface", "b", "b_iface"}]}
+"""
+import sys
+from array import array
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+
+@dataclass(slots=True)
+class Interface:
+    name: str
+    ip: str
+    prefix: int
+    # Set by the generators (None = not set, left out of topology.json)
+    ospf_cost: Optional[int] = None
+    rip_enabled: Optional[bool] = None
+    ospf_enabled: Optional[bool] = None
+
+
+@dataclass(slots=True)
+class BgpNeighbor:
+    name: str
+    ip: str
+    asn: int
+    is_ibgp: bool
+    relationship: str = "peer"
+    rr_client: bool = False
+
+
+@dataclass(slots=True)
+class Router:
+    name: str
+    protocol: str
+    as_number: Optional[int]
+    ebgp: bool = False
+    interfaces: List[Interface] = field(default_factory=list)
+    networks: List[str] = field(default_factory=list)
+    # Deduced by the generators
+    router_id: Optional[str] = None
+    loopback_ip: Optional[str] = None
+    bgp_neighbors: List[BgpNeighbor] = field(default_factory=list)
+    rr_cluster_id: Optional[str] = None
+
+
+@dataclass(slots=True)
+class Link:
+    a: str
+    a_iface: str
+    b: str
+    b_iface: str
+
+
+class LinkTable:
+    """
+    Array-backed link endpoints: (a, a_iface, b, b_iface) are stored as
+    indexes into a shared table of interned names.
+    Iterating yields Link objects; rows() yields plain tuples (hot loops).
+    """
+    __slots__ = ("_names", "_index", "_a", "_a_iface", "_b", "_b_iface")
+
+    def __init__(self, links=()):
+        self._names = []
+        self._index = {}
+        self._a = array("I")
+        self._a_iface = array("I")
+        self._b = array("I")
+        self._b_iface = array("I")
+        for link in links:
+            self.append(link["a"], link["a_iface"], link["b"], link["b_iface"])
+
+    def _id(self, name):
+        idx = self._index.get(name)
+        if idx is None:
+            idx = self._index[name] = len(self._names)
+            self._names.append(sys.intern(name))
+        return idx
+
+    def append(self, a, a_iface, b, b_iface):
+        self._a.append(self._id(a))
+        self._a_iface.append(self._id(a_iface))
+        self._b.append(self._id(b))
+        self._b_iface.append(self._id(b_iface))
+
+    def __len__(self):
+        return len(self._a)
+
+    def rows(self):
+        names = self._names
+        for a, a_iface, b, b_iface in zip(self._a, self._a_iface, self._b, self._b_iface):
+            yield names[a], names[a_iface], names[b], names[b_iface]
+
+    def __iter__(self):
+        for row in self.rows():
+            yield Link(*row)
+
+    def __getitem__(self, i):
+        names = self._names
+        return Link(names[self._a[i]], names[self._a_iface[i]], names[self._b[i]], names[self._b_iface[i]])
+
+
+@dataclass(slots=True)
+class Topology:
+    ip_base: str
+    loopback_format: str
+    routers: List[Router] = field(default_factory=list)
+    links: LinkTable = field(default_factory=LinkTable)
+
+
+_INTERFACE_OPTIONAL = ("ospf_cost", "rip_enabled", "ospf_enabled")
+
+
+def interface_from_dict(d):
+    iface = Interface(sys.intern(d["name"]), d["ip"], d["prefix"])
+    for key in _INTERFACE_OPTIONAL:
+        if key in d:
+            setattr(iface, key, d[key])
+    return iface
+
+
+def interface_to_dict(iface):
+    d = {"name": iface.name, "ip": iface.ip, "prefix": iface.prefix}
+    for key in _INTERFACE_OPTIONAL:
+        value = getattr(iface, key)
+        if value is not None:
+            d[key] = value
+    return d
+
+
+def router_from_dict(d):
+    return Router(
+        name=sys.intern(d["name"]),
+        protocol=d.get("protocol"),
+        as_number=d.get("as_number"),
+        ebgp=d.get("ebgp", False),
+        interfaces=[interface_from_dict(i) for i in d.get("interfaces", [])],
+        networks=list(d.get("networks", [])),
+    )
+
+
+def router_to_dict(r):
+    return {
+        "name": r.name,
+        "protocol": r.protocol,
+        "as_number": r.as_number,
+        "ebgp": r.ebgp,
+        "interfaces": [interface_to_dict(i) for i in r.interfaces],
+        "networks": list(r.networks),
+    }
+
+
+def topology_from_dict(data):
+    """Builds a Topology from a topology.json dict."""
+    return Topology(
+        ip_base=data.get("ip_base", "2000:1::/64"),
+        loopback_format=data.get("loopback_format", "simple"),
+        routers=[router_from_dict(r) for r in data.get("routers", [])],
+        links=LinkTable(data.get("links", [])),
+    )
+
+
+def topology_to_dict(topo):
+    """Returns the topology.json dict of a Topology (generator-only fields are left out)."""
+    return {
+        "ip_base": topo.ip_base,
+        "loopback_format": topo.loopback_format,
+        "routers": [router_to_dict(r) for r in topo.routers],
+        "links": [
+            {"a": a, "a_iface": a_iface, "b": b, "b_iface": b_iface}
+            for a, a_iface, b, b_iface in topo.links.rows()
+        ],
+    }
+
+
+def copy_topology(topo):
+    """
+    Copy of the routers and interfaces of a Topology (the generators enrich
+    them in place); the link table is immutable in practice and is shared.
+    """
+    routers = [
+        Router(
+            name=r.name, protocol=r.protocol, as_number=r.as_number, ebgp=r.ebgp,
+            interfaces=[
+                Interface(i.name, i.ip, i.prefix, i.ospf_cost, i.rip_enabled, i.ospf_enabled)
+                for i in r.interfaces
+            ],
+            networks=list(r.networks),
+        )
+        for r in topo.routers
+    ]
+    return Topology(topo.ip_base, topo.loopback_format, routers, topo.links)
+
+
+def slots_dict(obj):
+    """{field: value} of a slotted model object (e.g. as json.dumps default)."""
+    return {name: getattr(obj, name) for name in obj.__slots__}
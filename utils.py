@@ -1,5 +1,19 @@
 import re
+from functools import lru_cache
 
+from topology_model import Topology, topology_from_dict, copy_topology
+from serialization import load_file
+
+# Compiled once: router names are parsed for every link, neighbor and template
+_DIGITS_RE = re.compile(r'\d+')
+
+# Router identity helpers are memoized: each (name, format, AS) is computed once
+# and shared by get_topology and the generators. The caches are bounded so that a
+# long-lived process (watch mode, GUI) rebuilding many projects does not keep
+# every name it has ever seen.
+IDENTITY_CACHE_SIZE = 1 << 16
+
+@lru_cache(maxsize=IDENTITY_CACHE_SIZE)
 def get_router_number(router_name):
     """
     Extracts the router index from its name.
@@ -8,7 +22,7 @@ def get_router_number(router_name):
     Returns 1 if no digits are found.
     """
     # Find all digit sequences
-    numbers = re.findall(r'\d+', router_name)
+    numbers = _DIGITS_RE.findall(router_name)
     
     if not numbers:
         return 1
@@ -16,6 +30,7 @@ def get_router_number(router_name):
     # Return the last number found (assuming "AS100_R2" -> we want 2, not 100)
     return int(numbers[-1])
 
+@lru_cache(maxsize=IDENTITY_CACHE_SIZE)
 def get_router_id(router_name):
     """
     Generates a standard BGP Router ID (IPv4 format) based on the router name.
@@ -33,6 +48,7 @@ def get_router_id(router_name):
         
     return f"{num}.{num}.{num}.{num}"
 
+@lru_cache(maxsize=IDENTITY_CACHE_SIZE)
 def get_loopback_ip(router_name, fmt="simple", as_number=None):
     """
     Generates an IPv6 Loopback address based on the selected format.
@@ -58,3 +74,40 @@ def get_loopback_ip(router_name, fmt="simple", as_number=None):
             return f"2000::2:{num}"
     
     return f"2000::{num}"
+
+def find_identity_collisions(routers, loopback_format="simple"):
+    """
+    Detects routers that would share the same identity.
+    routers: list of topology_model.Router.
+    Returns {"router_id": {id: [names]}, "loopback": {ip: [names]}} with only
+    the duplicated values, e.g. "AS100_R2" and "R2" (same number, hence same
+    router ID), or "R1" and "R256" (router ID wraparound: num % 255).
+    """
+    by_id = {}
+    by_loopback = {}
+    for r in routers:
+        name = r.name
+        by_id.setdefault(get_router_id(name), []).append(name)
+        loopback = get_loopback_ip(name, fmt=loopback_format, as_number=r.as_number)
+        by_loopback.setdefault(loopback, []).append(name)
+
+    return {
+        "router_id": {k: v for k, v in by_id.items() if len(v) > 1},
+        "loopback": {k: v for k, v in by_loopback.items() if len(v) > 1},
+    }
+
+def load_topology(topology):
+    """
+    Returns the topology as a topology_model.Topology, without touching the
+    caller's data. Accepts the Topology returned by get_topology, a
+    topology.json dict, or a path to a topology.json (or .msgpack) file.
+    Routers and interfaces are copied because the generators enrich them in
+    place (router_id, bgp_neighbors, *_enabled flags...).
+    """
+    if isinstance(topology, Topology):
+        return copy_topology(topology)
+    if isinstance(topology, dict):
+        return topology_from_dict(topology)
+
+    print(f"Loading topology from {topology}...")
+    return topology_from_dict(load_file(topology))
@@ -0,0 +1,271 @@
+"""
+Mode surveillance : régénère les configurations à chaque sauvegarde du projet .gns3.
+
+Le fichier est surveillé avec inotify (paquet optionnel inotify_simple, Linux)
+ou, à défaut, par scrutation de sa date de modification et de sa taille. Une
+rafale de sauvegardes ne déclenche qu'une régénération (attente de DEBOUNCE_S
+sans nouvel événement).
+
+À chaque changement, les sections nodes/links/drawings sont comparées à la
+lecture précédente pour ne relancer que ce qui est touché :
+  - rien d'utile (ex : un libellé déplacé)      -> aucune étape ;
+  - structure AS/liens identique (ex : routeur
+    déplacé dans son rectangle)                 -> aucune étape ;
+  - sinon                                       -> pipeline complet, mais la génération
+    est incrémentale (seuls les routeurs dont les entrées ont changé sont re-rendus)
+    et l'injection est limitée à ces routeurs et aux nœuds ajoutés ou renommés.
+
+Les routeurs dont le nœud n'a pas encore de startup-config (jamais démarré)
+sont retenus et injectés à la première sauvegarde qui suit la création du
+fichier par GNS3 (index des startup-configs en cache, voir gns3_project.py).
+"""
+import os
+import time
+from pathlib import Path
+
+try:
+    from inotify_simple import INotify, flags
+except ImportError:  # Dépendance optionnelle
+    INotify = None
+
+from gns3_project import load_project, missing_startup_configs
+from get_topology.get_topology import extract_structure
+from pipeline import run_automation
+
+# Délai sans nouvel événement avant de considérer une sauvegarde comme terminée (s)
+DEBOUNCE_S = 0.3
+# Intervalle de scrutation sans inotify (s)
+POLL_INTERVAL_S = 0.2
+# Intervalle de vérification de l'arrêt demandé avec inotify (s)
+STOP_CHECK_S = 0.5
+
+# Champs comparés par section (le reste : libellés, z, symboles... n'influe pas sur les configs)
+DIFF_FIELDS = {
+    "nodes": ("name", "node_type", "x", "y"),
+    "drawings": ("svg", "x", "y"),
+}
+DIFF_IDS = {"nodes": "node_id", "links": "link_id", "drawings": "drawing_id"}
+
+
+def _file_key(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _watch_polling(path, debounce, poll_interval, stopped):
+    last = _file_key(path)
+    while not stopped():
+        time.sleep(poll_interval)
+        key = _file_key(path)
+        if key is None or key == last:
+            continue
+        # Rafale de sauvegardes : attendre que le fichier ne bouge plus
+        while not stopped():
+            time.sleep(debounce)
+            settled = _file_key(path)
+            if settled == key:
+                break
+            key = settled
+        if key is None or stopped():
+            continue
+        last = key
+        yield path
+
+
+def _watch_inotify(path, debounce, stopped):
+    # GNS3 enregistre dans un fichier temporaire puis le renomme : on surveille
+    # le dossier (CLOSE_WRITE pour une écriture directe, MOVED_TO pour un renommage)
+    inotify = INotify()
+    try:
+        inotify.add_watch(str(path.parent), flags.CLOSE_WRITE | flags.MOVED_TO)
+
+        def touched(events):
+            return any(e.name == path.name for e in events)
+
+        while not stopped():
+            if not touched(inotify.read(timeout=int(STOP_CHECK_S * 1000))):
+                continue
+            # Rafale : attendre debounce après le dernier événement concernant le fichier
+            # (les événements d'autres fichiers du dossier ne prolongent pas l'attente)
+            deadline = time.monotonic() + debounce
+            while (remaining := deadline - time.monotonic()) > 0:
+                if touched(inotify.read(timeout=max(1, int(remaining * 1000)))):
+                    deadline = time.monotonic() + debounce
+            if path.exists() and not stopped():
+                yield path
+    finally:
+        inotify.close()
+
+
+def watch_changes(gns3_file, debounce=DEBOUNCE_S, poll_interval=POLL_INTERVAL_S, stop=None, use_inotify=True):
+    """
+    Générateur : renvoie le chemin du projet après chaque sauvegarde (rafales regroupées).
+    Les changements survenus pendant le traitement du précédent ne sont pas perdus.
+
+    Args:
+        stop: threading.Event optionnel ; s'il est levé, le générateur se termine
+        use_inotify (bool): False pour forcer la scrutation
+    """
+    path = Path(gns3_file).resolve()
+
+    def stopped():
+        return stop is not None and stop.is_set()
+
+    if use_inotify and INotify is not None:
+        yield from _watch_inotify(path, debounce, stopped)
+    else:
+        yield from _watch_polling(path, debounce, poll_interval, stopped)
+
+
+def _section(project, name):
+    return project.get("topology", {}).get(name, project.get(name, []))
+
+
+def _signature(section, item):
+    if section == "links":
+        return tuple(
+            (end.get("node_id"), end.get("adapter_number"), end.get("port_number"))
+            for end in item.get("nodes", [])
+        )
+    return tuple(item.get(field) for field in DIFF_FIELDS[section])
+
+
+def diff_projects(old, new):
+    """
+    Compare les sections utiles de deux lectures (load_project).
+
+    Returns:
+        dict: {section: {"added": [...], "removed": [...], "changed": [...]}} (identifiants),
+        seules les sections modifiées sont présentes (dict vide : aucun changement utile)
+    """
+    changes = {}
+    for section, id_key in DIFF_IDS.items():
+        before = {item.get(id_key): _signature(section, item) for item in _section(old, section)}
+        after = {item.get(id_key): _signature(section, item) for item in _section(new, section)}
+        delta = {
+            "added": [i for i in after if i not in before],
+            "removed": [i for i in before if i not in after],
+            "changed": [i for i in after if i in before and after[i] != before[i]],
+        }
+        if any(delta.values()):
+            changes[section] = delta
+    return changes
+
+
+def dirty_routers(old, new, changes):
+    """Routeurs à réinjecter même si leur configuration n'a pas changé : nœuds ajoutés ou renommés."""
+    delta = changes.get("nodes")
+    if not delta:
+        return set()
+    old_names = {n.get("node_id"): n.get("name") for n in _section(old, "nodes")}
+    new_nodes = {n.get("node_id"): n for n in _section(new, "nodes")}
+    dirty = set()
+    for node_id in delta["added"] + delta["changed"]:
+        node = new_nodes[node_id]
+        if node.get("node_type") == "dynamips" and node.get("name") != old_names.get(node_id):
+            dirty.add(node["name"])
+    return dirty
+
+
+def _describe(changes):
+    parts = []
+    for section, delta in changes.items():
+        counts = ", ".join(f"{len(ids)} {kind}" for kind, ids in delta.items() if ids)
+        parts.append(f"{section} ({counts})")
+    return "; ".join(parts)
+
+
+def _pending_routers(gns3_file, inject):
+    """Routeurs en attente d'injection : nœud sans startup-config (jamais démarré)."""
+    if not inject:
+        return set()
+    pending = set(missing_startup_configs(gns3_file))
+    if pending:
+        print(f"[WATCH] {len(pending)} routeur(s) sans startup-config, injecté(s) dès que GNS3 l'aura créée : "
+              f"{', '.join(sorted(pending))}")
+    return pending
+
+
+def watch_project(gns3_file, ip_prefix, loopback_format="simple", advanced_options={}, output_dir=None,
+                  workers=1, inject=True, topology_format="pretty", debounce=DEBOUNCE_S,
+                  poll_interval=POLL_INTERVAL_S, use_inotify=True, stop=None, inject_threads=1,
+                  write_topology=True):
+    """
+    Construit le projet (run_automation) puis le reconstruit à chaque sauvegarde
+    du .gns3, jusqu'à Ctrl+C ou stop. Une erreur (fichier en cours d'écriture,
+    projet invalide) est affichée et la surveillance continue.
+
+    Returns:
+        int: nombre de régénérations effectuées après la construction initiale
+    """
+    gns3_file = Path(gns3_file).resolve()
+    run_args = (str(gns3_file), ip_prefix, loopback_format, advanced_options)
+    run_kwargs = dict(workers=workers, output_dir=output_dir, inject=inject, topology_format=topology_format,
+                      inject_threads=inject_threads, write_topology=write_topology)
+
+    # Sans construction réussie (previous None), la prochaine sauvegarde relance tout
+    previous = structure = None
+    pending = set()
+    try:
+        success, message = run_automation(*run_args, **run_kwargs)
+        if success:
+            previous = load_project(gns3_file)
+            structure = extract_structure(gns3_file)
+            pending = _pending_routers(gns3_file, inject)
+    except (Exception, SystemExit) as e:  # fichier en cours d'écriture, get_topology peut appeler exit()
+        print(f"[ERREUR] {type(e).__name__}: {e}")
+        success, message = False, f"Échec : {type(e).__name__}: {e}"
+    print(f"\n[{'OK' if success else 'ECHEC'}] {message}")
+
+    mode = "inotify" if use_inotify and INotify is not None else f"scrutation toutes les {poll_interval} s"
+    print(f"\n[WATCH] Surveillance de {gns3_file.name} ({mode}), Ctrl+C pour arrêter.")
+
+    rebuilds = 0
+    try:
+        for _ in watch_changes(gns3_file, debounce, poll_interval, stop, use_inotify):
+            t0 = time.perf_counter()
+            try:
+                current = load_project(gns3_file)
+            except Exception as e:  # Sauvegarde incomplète : le prochain événement relira le fichier
+                print(f"[WATCH] Lecture impossible ({type(e).__name__}: {e}), en attente d'une nouvelle sauvegarde.")
+                continue
+
+            if previous is None:
+                print("\n[WATCH] Aucune construction réussie jusqu'ici : reconstruction complète.")
+                changes = None
+            else:
+                changes = diff_projects(previous, current)
+            ready = pending - set(missing_startup_configs(gns3_file, pending)) if pending else set()
+            if changes is not None and not changes and not ready:
+                print("[WATCH] Sauvegarde sans changement de nœuds, liens ou dessins : rien à faire.")
+                previous = current
+                continue
+            if changes:
+                print(f"\n[WATCH] Changements : {_describe(changes)}")
+            if ready:
+                print(f"\n[WATCH] startup-config créée par GNS3 : {', '.join(sorted(ready))}")
+
+            try:
+                new_structure = extract_structure(gns3_file)
+                if previous is not None and new_structure == structure and not ready:
+                    print("[WATCH] Structure AS/liens inchangée : configurations à jour.")
+                    success, message = True, "Aucune régénération nécessaire."
+                else:
+                    dirty = None if previous is None else dirty_routers(previous, current, changes) | ready
+                    success, message = run_automation(*run_args, **run_kwargs, dirty_routers=dirty)
+                    rebuilds += 1
+            except (Exception, SystemExit) as e:  # get_topology peut appeler exit()
+                print(f"[ERREUR] {type(e).__name__}: {e}")
+                continue
+
+            if success:
+                # En cas d'échec, la prochaine sauvegarde est comparée à la dernière version construite
+                previous, structure = current, new_structure
+                pending = _pending_routers(gns3_file, inject)
+            print(f"[{'OK' if success else 'ECHEC'}] {message} ({(time.perf_counter() - t0) * 1000:.0f} ms)")
+    except KeyboardInterrupt:
+        print("\n[WATCH] Arrêt de la surveillance.")
+    return rebuilds